@@ -1,15 +1,27 @@
 #!/usr/bin/env python3
 
-import subprocess
+import argparse
+import io
+import json
+import sys
+import threading
+from contextlib import redirect_stdout
 import os
 import re
-from collections import Counter
+from collections import Counter, OrderedDict
 import random
-import joblib
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.naive_bayes import MultinomialNB
-from sklearn.pipeline import Pipeline
 from pathlib import Path  
+from . import git_runner, profiling
+from .status import RepoStatus
+from .diff_reader import iter_staged_diff
+from .classifier import get_classifier
+from .components import component_scope, load_component_index
+from .selection import (LazyEntries, SelectionError, count_untracked_files, display_path, iter_untracked,
+                        select_entries)
+from .taxonomy import TYPES, get_taxonomy
+from .analysis_cache import AnalysisCache, staged_blob_changes, staged_blob_triples
+from .history import history_model_dir, history_model_identity, load_history_model, train_from_history
+from .model import CompactModel, ModelFormatError, load_model, model_dir, model_key, prune_stale_models
 
 def print_ascii_logo():
     print(r"""
@@ -26,116 +38,183 @@ def print_ascii_logo():
  (_________________)
     """)
 
-TYPES = {
-    'feat': ['add', 'create', 'implement', 'new', 'feature'],
-    'fix': ['fix', 'bug', 'error', 'issue', 'resolve', 'solve'],
-    'refactor': ['refactor', 'restructure', 'clean', 'improve', 'simplify'],
-    'chore': ['update', 'upgrade', 'bump', 'maintain', 'setup'],
-    'test': ['test', 'assert', 'coverage', 'spec', 'validate'],
-    'docs': ['document', 'comment', 'readme', 'guide', 'wiki'],
-    'style': ['style', 'format', 'indent', 'css', 'layout'],
-    'perf': ['performance', 'optimize', 'speed', 'efficiency', 'faster']
-}
 
-MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'model.pkl')
-
-def find_git_root():
+def find_git_root(path=None):
     try:
-        git_root = subprocess.check_output(
-            ["git", "rev-parse", "--show-toplevel"],
-            stderr=subprocess.DEVNULL,
-            text=True
-        ).strip()
-        return Path(git_root)
-    except subprocess.CalledProcessError:
+        result = git_runner.run(["git", "rev-parse", "--show-toplevel"], cwd=path)
+    except OSError:
         return None
+    if result.returncode != 0:
+        return None
+    return Path(result.stdout.strip())
 
-def run_git_command(args):
-    result = subprocess.run(args, capture_output=True, text=True)
+def run_git_command(args, cwd=None):
+    result = git_runner.run(args, cwd=cwd)
     return result.stdout.strip().splitlines() if result.stdout.strip() else []
 
+async def current_branch_async(cwd=None):
+    result = await git_runner.get_runner().run_async(["git", "rev-parse", "--abbrev-ref", "HEAD"], cwd)
+    return result.stdout.strip() or 'HEAD'
+
 def resolve_file_path(file_path):
+    profiling.count('stat_calls')
     if os.path.exists(file_path):
         return os.path.abspath(file_path)
     
     script_dir = os.path.dirname(os.path.abspath(__file__))
     possible_path = os.path.join(script_dir, file_path)
+    profiling.count('stat_calls')
     if os.path.exists(possible_path):
         return possible_path
     
     basename = os.path.basename(file_path)
+    profiling.count('stat_calls')
     if os.path.exists(basename):
         return os.path.abspath(basename)
     
     return None
 
+_repo_status = None
+_repo_status_future = None
+_repo_status_untracked = 'all'
+
+def prefetch_repo_status(root=None, untracked='all'):
+    global _repo_status_future, _repo_status_untracked
+    _repo_status_untracked = untracked
+    _repo_status_future = git_runner.submit(RepoStatus.load_async(root, untracked))
+
+def get_repo_status(refresh=False):
+    global _repo_status, _repo_status_future
+    if _repo_status_future is not None:
+        if not refresh:
+            _repo_status = _repo_status_future.result()
+        _repo_status_future = None
+    if _repo_status is None or refresh:
+        _repo_status = RepoStatus.load(untracked=_repo_status_untracked)
+    return _repo_status
+
+def invalidate_repo_status():
+    global _repo_status, _repo_status_future
+    _repo_status = None
+    _repo_status_future = None
+
 def git_status_info():
-    def get_files(command):
-        try:
-            result = subprocess.run(command, capture_output=True, text=True, check=True)
-            return [resolve_file_path(f) for f in result.stdout.splitlines() if f]
-        except subprocess.CalledProcessError:
-            return []
-    
-    return {
-        "staged": [f for f in get_files(["git", "diff", "--cached", "--name-only"]) if f],
-        "unstaged": [f for f in get_files(["git", "diff", "--name-only"]) if f],
-        "untracked": [f for f in get_files(["git", "ls-files", "--others", "--exclude-standard"]) if f]
-    }
+    return get_repo_status().as_dict()
 
-def create_branch():
+def create_branch(current_branch=None):
     new_branch = input('¿Quieres crear una nueva rama? (S/s): ')
     if new_branch.lower() == 's':
         name = input('Ingresa el nombre de tu nueva rama: ')
-        result = subprocess.run(["git", "checkout", "-b", name])
+        git_runner.run(["git", "checkout", "-b", name], capture_output=False)
         return name
     else:
-        current_branch = run_git_command(["git", "rev-parse", "--abbrev-ref", "HEAD"])
-        print(f'ℹ️ Continuarás trabajando en la rama actual: {current_branch[0]}')
-        return current_branch[0]
+        current_branch = current_branch or git_runner.submit(current_branch_async())
+        branch_name = current_branch.result()
+        print(f'ℹ️ Continuarás trabajando en la rama actual: {branch_name}')
+        return branch_name
+
+ADD_CHUNK_SIZE = 500
+ADD_REPORT_LIMIT = 50
+
+def parse_rejected_paths(stderr):
+    rejected = set(re.findall(r"pathspec '(.+?)' did not match any files", stderr))
+    rejected.update(re.findall(r"fatal: (.+?): '.+?' is outside repository", stderr))
+    ignored_block = False
+    for line in stderr.splitlines():
+        if line.startswith("The following paths are ignored"):
+            ignored_block = True
+        elif line.startswith(("hint:", "fatal:", "error:")):
+            ignored_block = False
+        elif ignored_block and line.strip():
+            rejected.add(line.strip())
+    return rejected
+
+def stage_batch(paths):
+    # Las rutas elegidas son literales: 'a[1].txt' no debe agregar también 'a1.txt'
+    args = ["git", "--literal-pathspecs", "add", "--pathspec-from-file=-", "--pathspec-file-nul"]
+    result = git_runner.run(args, input="\0".join(paths))
+    return result.returncode == 0, result.stderr
+
+def stage_paths(paths):
+    staged = []
+    failed = []
+    pending = list(paths)
+    
+    while pending:
+        ok, stderr = stage_batch(pending)
+        if ok:
+            staged += pending
+            break
+        
+        rejected = parse_rejected_paths(stderr)
+        bad = {p for p in pending if p in rejected or os.path.relpath(p) in rejected}
+        if bad:
+            failed += [p for p in pending if p in bad]
+            pending = [p for p in pending if p not in bad]
+            continue
+        
+        if len(pending) == 1:
+            failed += pending
+            break
+        
+        chunk_size = min(ADD_CHUNK_SIZE, (len(pending) + 1) // 2)
+        for start in range(0, len(pending), chunk_size):
+            chunk_staged, chunk_failed = stage_paths(pending[start:start + chunk_size])
+            staged += chunk_staged
+            failed += chunk_failed
+        break
+    
+    return staged, failed
 
 def add_files(files):
     if not files:
         print("No hay archivos para agregar.")
         return 0
     
-    success = 0
+    paths = []
     for file_path in files:
-        resolved_path = resolve_file_path(file_path)
+        resolved_path = file_path if os.path.isabs(file_path) else resolve_file_path(file_path)
         if not resolved_path:
             print(f"✗ No se pudo encontrar: {file_path}")
             continue
-        
-        try:
-            subprocess.run(["git", "add", resolved_path], check=True)
-            print(f"✓ Agregado: {resolved_path}")
-            success += 1
-        except subprocess.CalledProcessError:
-            print(f"✗ Error al agregar: {resolved_path}")
+        paths.append(resolved_path)
     
-    return success
+    if not paths:
+        return 0
+    
+    staged, failed = stage_paths(paths)
+    for path in failed:
+        print(f"✗ Error al agregar: {path}")
+    if len(staged) <= ADD_REPORT_LIMIT:
+        for path in staged:
+            print(f"✓ Agregado: {path}")
+    else:
+        print(f"✓ Agregados {len(staged)} archivos")
+    
+    if staged:
+        invalidate_repo_status()
+    return len(staged)
+
+def iter_untracked_by_extension(extension, root=None):
+    root = str(root or os.getcwd())
+    args = ["git", "-c", "core.quotepath=off", "ls-files", "-z", "--others", "--exclude-standard",
+            "--", f":(glob,icase)**/*{extension}"]
+    for path in git_runner.iter_records(args, root):
+        if path:
+            yield os.path.join(root, path)
 
 def detect_files_by_extension(extension):
     status = git_status_info()
-    all_files = status["staged"] + status["unstaged"] + status["untracked"]
+    # El estado puede agrupar directorios sin seguimiento; los archivos sueltos se buscan con un pathspec
+    all_files = status["staged"] + status["unstaged"] + list(iter_untracked_by_extension(extension))
     return [f for f in all_files if f and f.lower().endswith(extension)]
 
-def get_file_diff(file_path):
-    try:
-        result = subprocess.run(["git", "diff", "--cached", file_path], 
-                              capture_output=True, text=True)
-        return result.stdout
-    except:
-        return ""
-
-def extract_changes(diff_text):
-    relevant_lines = []
-    for line in diff_text.split('\n'):
-        if line.startswith('+') and not line.startswith('+++'):
-            relevant_lines.append(line[1:].strip())
-    return ' '.join(relevant_lines)
-
+@profiling.profiled('train_model')
 def train_model():
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.naive_bayes import MultinomialNB
+    from sklearn.pipeline import Pipeline
+    
     X = []
     y = []
     
@@ -157,73 +236,263 @@ def train_model():
     ])
     
     pipeline.fit(X, y)
-    joblib.dump(pipeline, MODEL_PATH)
-    return pipeline
+    model = CompactModel.from_pipeline(pipeline)
+    
+    directory = model_dir(TYPES)
+    try:
+        model.save(directory, model_key(TYPES))
+        prune_stale_models(directory)
+    except OSError as e:
+        print(f"⚠️ No se pudo guardar el modelo en caché: {e}")
+    return model
 
-def load_or_train_model():
-    if os.path.exists(MODEL_PATH):
+@profiling.profiled('load_or_train_model')
+def load_or_train_model(root=None):
+    history_model = load_history_model(root or os.getcwd(), TYPES)
+    if history_model is not None:
+        return history_model
+    return load_default_model()
+
+def load_default_model():
+    directory = model_dir(TYPES)
+    if os.path.isdir(directory):
         try:
-            return joblib.load(MODEL_PATH)
-        except:
+            return load_model(directory, model_key(TYPES))
+        except (OSError, ValueError, KeyError, ModelFormatError):
             print("Error al cargar el modelo existente. Entrenando uno nuevo...")
             return train_model()
     else:
         print("Entrenando modelo nuevo...")
         return train_model()
 
-def get_file_type(file_path):
-    _, ext = os.path.splitext(file_path)
-    ext = ext.lower()
-    
-    if ext in ['.py', '.js', '.java', '.cpp', '.c', '.h', '.ts', '.go', '.rb']:
-        return 'code'
-    elif ext in ['.md', '.txt', '.rst', '.pdf', '.doc', '.docx']:
-        return 'docs'
-    elif ext in ['.css', '.scss', '.less', '.html', '.xml']:
-        return 'style'
-    elif ext in ['.json', '.yaml', '.yml', '.toml', '.ini', '.conf']:
-        return 'config'
-    elif ext in ['.test.js', '.spec.py', '.test.py', '.test.ts']:
-        return 'test'
-    else:
-        return 'other'
+def get_file_type(file_path, root=None):
+    return get_classifier(root).file_type(file_path)
+
+def sampled_counts(file_diff, quota):
+    if quota is None and not file_diff.truncated:
+        return None
+    return (len(file_diff.added_lines), quota[1] if quota else file_diff.added_count)
+
+@profiling.profiled('analyze_changes')
+def sample_changes(files, root=None, budget_ms=None):
+    from .sampling import ChangeSample, analysis_settings, plan_sample
 
-def analyze_changes(files):
-    changes_text = ""
-    file_types = Counter()
+    root = str(root or os.getcwd())
+    settings = analysis_settings(root, budget_ms)
+    plan = plan_sample(root, [os.path.relpath(os.path.join(root, f), root) for f in files],
+                       settings['budget_ms'], settings['skip'])
+    sample = ChangeSample()
+    for path in plan.deleted:
+        sample.add(path, plan.file_types[path])
+    for path, reason in sorted(plan.skipped.items()):
+        sample.add(path, plan.file_types[path], skipped=reason)
     
-    for file in files:
-        if os.path.exists(file):
-            file_types[get_file_type(file)] += 1
-            diff = get_file_diff(file)
-            changes_text += extract_changes(diff) + " "
-    
-    predominant_type = file_types.most_common(1)[0][0] if file_types else 'other'
-    return changes_text.strip(), predominant_type
-
-def generate_commit_message(branch, files, changes_text, predominant_file_type, model):
-    approaches = [
-        lambda: generate_ml_based_message(branch, files, changes_text, predominant_file_type, model),
-        lambda: generate_file_type_message(files, predominant_file_type),
-        lambda: generate_thematic_message(changes_text, files),
-        lambda: generate_descriptive_message(changes_text, files, predominant_file_type),
-        lambda: generate_action_message(changes_text, files)
+    pending = set(plan.read)
+    for paths in plan.pathspec_chunks():
+        if plan.expired():
+            break
+        for file_diff in iter_staged_diff(root, paths, quotas=plan.quotas, deadline=plan.deadline):
+            if file_diff.path not in pending:
+                continue
+            pending.discard(file_diff.path)
+            skipped = plan.binary_skip(file_diff)
+            if skipped:
+                sample.add(file_diff.path, plan.file_types[file_diff.path], skipped=skipped)
+                continue
+            text = ' '.join(line.strip() for line in file_diff.added_lines)
+            sample.add(file_diff.path, plan.file_types[file_diff.path], text,
+                       sampled_counts(file_diff, plan.quotas.get(file_diff.path)))
+    # Lo que no se alcanzó a leer antes del límite se reporta como omitido
+    for path in sorted(pending) if plan.expired() else ():
+        sample.add(path, plan.file_types[path], skipped='deadline')
+    return sample
+
+def analyze_changes(files, root=None, budget_ms=None):
+    sample = sample_changes(files, root, budget_ms)
+    return sample.text, sample.predominant_type
+
+SPECULATIVE_PATHSPEC_LIMIT = 200
+
+class SpeculativeAnalyzer:
+    def __init__(self, root, budget_ms=None):
+        from concurrent.futures import ThreadPoolExecutor
+
+        self.root = str(root)
+        self.budget_ms = budget_ms
+        self.analyzed = {}
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='ai-git-assistant-speculative')
+        self.model_future = self.executor.submit(load_or_train_model, self.root)
+        self.refresh()
+    
+    def refresh(self):
+        self.analysis_future = self.executor.submit(self.update)
+    
+    @profiling.profiled('speculative_update')
+    def update(self):
+        from .sampling import analysis_settings, plan_sample
+
+        with self.lock:
+            changes = staged_blob_changes(self.root) or []
+            pending = [c for c in changes if self.analyzed.get(c[0], (None,))[0] != c[3]]
+            if not pending:
+                return changes
+            
+            oids = {path: new_oid for path, _, _, new_oid in pending}
+            settings = analysis_settings(self.root, self.budget_ms)
+            plan = plan_sample(self.root, list(oids), settings['budget_ms'], settings['skip'], pending)
+            for path in plan.deleted:
+                self.analyzed[path] = (oids[path], plan.file_types[path], None, None, None)
+            for path, reason in plan.skipped.items():
+                self.analyzed[path] = (oids[path], plan.file_types[path], None, None, reason)
+            
+            unread = set(plan.read)
+            paths = None
+            if len(pending) <= SPECULATIVE_PATHSPEC_LIMIT:
+                paths = [p for path, old_path, _, _ in pending for p in (path, old_path)
+                         if p and (p in unread or p == old_path)]
+            
+            if paths is None or paths:
+                for file_diff in iter_staged_diff(self.root, paths, quotas=plan.quotas, deadline=plan.deadline):
+                    if file_diff.path not in unread:
+                        continue
+                    unread.discard(file_diff.path)
+                    skipped = plan.binary_skip(file_diff)
+                    if skipped:
+                        self.analyzed[file_diff.path] = (oids[file_diff.path], plan.file_types[file_diff.path],
+                                                         None, None, skipped)
+                        continue
+                    text = ' '.join(line.strip() for line in file_diff.added_lines)
+                    sampled = sampled_counts(file_diff, plan.quotas.get(file_diff.path))
+                    self.analyzed[file_diff.path] = (oids[file_diff.path], plan.file_types[file_diff.path], text,
+                                                     sampled, None)
+            if plan.expired():
+                for path in unread:
+                    self.analyzed[path] = (oids[path], plan.file_types[path], None, None, 'deadline')
+            profiling.count('speculative_files', len(pending))
+            return changes
+    
+    def model(self):
+        return self.model_future.result()
+    
+    def sample(self, files):
+        from .sampling import ChangeSample
+
+        changes = self.analysis_future.result()
+        wanted = {os.path.relpath(f, self.root) for f in files}
+        sample = ChangeSample()
+        for path, _, _, new_oid in changes:
+            oid, file_type, text, sampled, skipped = self.analyzed.get(path, (None,) * 5)
+            if path not in wanted or oid != new_oid:
+                continue
+            sample.add(path, file_type, text, sampled, skipped)
+        return sample
+    
+    def close(self):
+        self.executor.shutdown(wait=False)
+
+COMMIT_TYPE_RE = re.compile(r'^(\w+)(?:\([^)]*\))?!?:')
+UNSCOPED_TYPE_RE = re.compile(r'^(\w+)(!?):')
+
+class ChangeAnalysis:
+    def __init__(self, changes_text, taxonomy=None):
+        self.changes_text = changes_text
+        self.taxonomy = taxonomy or get_taxonomy()
+        lowered = changes_text.lower()
+        self.words = re.findall(r'\b\w+\b', lowered)
+        self.word_set = set(self.words)
+        self.word_counts = Counter(self.words)
+        self.thematic_counts = Counter({
+            w: c for w, c in self.word_counts.items()
+            if w not in self.taxonomy.stop_words and len(w) > 3
+        })
+        self.type_scores, self.action_scores = self.taxonomy.score(self.word_set, lowered)
+        self.type_probabilities = {}
+        self.predicted_type = None
+
+    def score_types(self, model):
+        probabilities = model.predict_proba([self.changes_text])[0]
+        self.type_probabilities = dict(zip(model.classes_, (float(p) for p in probabilities)))
+        self.predicted_type = max(self.type_probabilities, key=self.type_probabilities.get)
+
+    def confidence(self, message):
+        match = COMMIT_TYPE_RE.match(message)
+        return self.type_probabilities.get(match.group(1), 0.0) if match else 0.0
+
+def with_scope(message, scope):
+    if not scope:
+        return message
+    return UNSCOPED_TYPE_RE.sub(lambda m: f"{m.group(1)}({scope}){m.group(2)}:", message, count=1)
+
+def suggest_commit_messages(branch, files, changes_text, predominant_file_type, model, analysis=None, scope=None):
+    analysis = analysis or ChangeAnalysis(changes_text)
+    if analysis.predicted_type is None:
+        analysis.score_types(model)
+    
+    candidates = [
+        generate_ml_based_message(branch, files, changes_text, predominant_file_type, model, analysis),
+        generate_file_type_message(files, predominant_file_type),
+        generate_thematic_message(changes_text, files, analysis),
+        generate_descriptive_message(changes_text, files, predominant_file_type, analysis),
+        generate_action_message(changes_text, files, scope)
     ]
     
-    previous_suggestions = []
+    unique = list(dict.fromkeys(with_scope(message, scope) for message in candidates))
+    ranked = sorted(unique, key=analysis.confidence, reverse=True)
+    return [(message, analysis.confidence(message)) for message in ranked]
+
+def model_identity(root):
+    return history_model_identity(root, TYPES) or f"default-{model_key(TYPES)}"
+
+def compute_suggestions(branch, files, root=None, model=None, analyzer=None, budget_ms=None):
+    from .sampling import analysis_settings
+
+    root = str(root or os.getcwd())
+    scope = component_scope(root, files)
+    taxonomy = get_taxonomy(root)
+    settings = analysis_settings(root, analyzer.budget_ms if analyzer is not None else budget_ms)
+    cache = AnalysisCache.for_repo(root)
+    triples = staged_blob_triples(root) if cache else None
+    key = None
+    if triples is not None:
+        wanted = {os.path.relpath(f, root) for f in files}
+        triples = [t for t in triples if t[0] in wanted]
+        key = cache.key(triples, branch, model_identity(root), scope, taxonomy.key,
+                        settings['budget_ms'], settings['skip'])
+        entry = cache.get(key)
+        if entry is not None:
+            return [tuple(s) for s in entry["suggestions"]], entry["predominant_file_type"], entry.get("coverage")
+    
+    if analyzer is not None:
+        model = model or analyzer.model()
+        sample = analyzer.sample(files)
+    else:
+        model = model or load_or_train_model(root)
+        sample = sample_changes(files, root, settings['budget_ms'])
+    changes_text, predominant_file_type = sample.text, sample.predominant_type
+    analysis = ChangeAnalysis(changes_text, taxonomy)
+    suggestions = suggest_commit_messages(branch, files, changes_text, predominant_file_type, model, analysis, scope)
+    
+    if key is not None:
+        cache.put(key, {
+            "predominant_file_type": predominant_file_type,
+            "predicted_type": analysis.predicted_type,
+            "type_probabilities": analysis.type_probabilities,
+            "top_words": analysis.word_counts.most_common(50),
+            "suggestions": suggestions,
+            "coverage": sample.coverage(),
+        })
+    return suggestions, predominant_file_type, sample.coverage()
+
+def generate_commit_message(branch, files, changes_text, predominant_file_type, model, suggestions=None):
+    if suggestions is None:
+        suggestions = suggest_commit_messages(branch, files, changes_text, predominant_file_type, model)
     suggestion_index = 0
     
     while True:
-        actual_index = suggestion_index % len(approaches)
-        message = approaches[actual_index]()
+        message, confidence = suggestions[suggestion_index % len(suggestions)]
         
-        if message in previous_suggestions and len(previous_suggestions) < len(approaches):
-            suggestion_index += 1
-            continue
-            
-        previous_suggestions.append(message)
-        
-        print(f"\n💡 Sugerencia de commit #{suggestion_index + 1}:\n→ {message}")
+        print(f"\n💡 Sugerencia de commit #{suggestion_index + 1} (confianza {confidence:.0%}):\n→ {message}")
         
         confirm = input("\n¿Deseas usar este mensaje? (S/s), (O/o) para otra opción o enter para ingresar tu commit: ")
         if confirm.lower() == 's':
@@ -240,33 +509,18 @@ def generate_commit_message(branch, files, changes_text, predominant_file_type,
             print("✅ Commit realizado con éxito.")
             return custom_message
 
-def generate_ml_based_message(branch, files, changes_text, predominant_file_type, model):
+def generate_ml_based_message(branch, files, changes_text, predominant_file_type, model, analysis=None):
     if len(changes_text) < 10:
-        branch_lower = branch.lower()
-        commit_type = 'chore'
-        
-        for type_, keywords in TYPES.items():
-            if any(keyword in branch_lower for keyword in keywords):
-                commit_type = type_
-                break
-        
-        if commit_type == 'chore':
-            if predominant_file_type == 'code':
-                commit_type = 'feat'
-            elif predominant_file_type == 'docs':
-                commit_type = 'docs'
-            elif predominant_file_type == 'test':
-                commit_type = 'test'
-            elif predominant_file_type == 'style':
-                commit_type = 'style'
+        taxonomy = analysis.taxonomy if analysis else get_taxonomy()
+        commit_type = taxonomy.fallback_type(branch, predominant_file_type)
         
         filename = os.path.basename(files[0]) if files else "cambios"
         return f"{commit_type}: cambios relacionados con {filename}"
     else:
-        predicted_type = model.predict([changes_text])[0]
+        analysis = analysis or ChangeAnalysis(changes_text)
+        predicted_type = analysis.predicted_type or model.predict([changes_text])[0]
         
-        words = re.findall(r'\b\w+\b', changes_text.lower())
-        common_words = [w for w in Counter(words).most_common(3) if w[0] not in ['the', 'a', 'an', 'in', 'to', 'of']]
+        common_words = [w for w in analysis.word_counts.most_common(3) if w[0] not in analysis.taxonomy.stop_words]
         
         if common_words:
             keywords = ' y '.join([w[0] for w in common_words])
@@ -298,54 +552,25 @@ def generate_file_type_message(files, predominant_file_type):
         else:
             return f"{commit_type}: actualización de múltiples archivos ({num_files})"
 
-def generate_thematic_message(changes_text, files):
-    words = re.findall(r'\b\w+\b', changes_text.lower())
-    common_stop_words = ['the', 'a', 'an', 'in', 'to', 'of', 'and', 'or', 'for', 'with', 'on', 'at']
-    filtered_words = [w for w in words if w not in common_stop_words and len(w) > 3]
+def generate_thematic_message(changes_text, files, analysis=None):
+    analysis = analysis or ChangeAnalysis(changes_text)
+    word_count = analysis.thematic_counts
     
-    if filtered_words:
-        word_count = Counter(filtered_words)
+    if word_count:
         mid_common_words = [w[0] for w in word_count.most_common()[len(word_count)//3:2*len(word_count)//3]]
         
         if mid_common_words:
             keywords = ' con '.join(random.sample(mid_common_words, min(2, len(mid_common_words))))
-            commit_type = 'chore'
-            for type_, keywords_list in TYPES.items():
-                if any(kw in filtered_words for kw in keywords_list):
-                    commit_type = type_
-                    break
-                    
+            commit_type = analysis.taxonomy.best_type(analysis.type_scores)
             return f"{commit_type}: {keywords} en {os.path.basename(files[0]) if files else 'proyecto'}"
 
     commit_type = random.choice(['feat', 'refactor', 'chore'])
     return f"{commit_type}: mejoras en {os.path.basename(files[0]) if files else 'proyecto'}"
 
-def generate_descriptive_message(changes_text, files, predominant_file_type):
-    action_words = {
-        'add': ['agregar', 'añadir', 'crear', 'implementar', 'nuevo'],
-        'fix': ['arreglar', 'corregir', 'solucionar', 'reparar'],
-        'update': ['actualizar', 'mejorar', 'modificar', 'cambiar'],
-        'remove': ['eliminar', 'quitar', 'borrar', 'remover'],
-        'refactor': ['refactorizar', 'reestructurar', 'simplificar']
-    }
-    
-    words = re.findall(r'\b\w+\b', changes_text.lower())
-    
-    action = 'update'
-    for act, keywords in action_words.items():
-        if any(kw in words for kw in keywords):
-            action = act
-            break
-
-    action_to_type = {
-        'add': 'feat',
-        'fix': 'fix',
-        'update': 'chore',
-        'remove': 'refactor',
-        'refactor': 'refactor'
-    }
-    
-    commit_type = action_to_type.get(action, 'chore')
+def generate_descriptive_message(changes_text, files, predominant_file_type, analysis=None):
+    analysis = analysis or ChangeAnalysis(changes_text)
+    action = analysis.taxonomy.best_action(analysis.action_scores)
+    commit_type = analysis.taxonomy.action_types.get(action, 'chore')
 
     file_type_context = {
         'code': 'funcionalidad',
@@ -358,9 +583,11 @@ def generate_descriptive_message(changes_text, files, predominant_file_type):
     context = file_type_context.get(predominant_file_type, 'contenido')
     return f"{commit_type}: {action} {context} en {os.path.basename(files[0]) if files else 'proyecto'}"
 
-def generate_action_message(changes_text, files):
+def generate_action_message(changes_text, files, component=None):
     verbs = ['actualiza', 'mejora', 'modifica', 'optimiza', 'implementa', 'refactoriza']
     verb = random.choice(verbs)
+    if component:
+        return f"{verb} {component} en {os.path.basename(files[0]) if files else 'proyecto'}"
     
     components = []
     for file in files:
@@ -371,35 +598,60 @@ def generate_action_message(changes_text, files):
     most_common_component = Counter(components).most_common(1)[0][0] if components else "componente"
     return f"{verb} {most_common_component} en {os.path.basename(files[0]) if files else 'proyecto'}"
 
-def handle_files_selection(files, message):
-    if not files:
+def review_staged_content(root=None):
+    from .scanner import format_scan_report, scan_staged_changes
+
+    scan = scan_staged_changes(root)
+    if not scan.findings and not scan.unscanned:
+        print(f"\n🔎 Contenido revisado: {scan.scanned} archivos sin hallazgos ({scan.elapsed_ms:.0f} ms)")
+        return scan
+    
+    print(f"\n🔎 Revisión del contenido preparado ({scan.elapsed_ms:.0f} ms):")
+    print(format_scan_report(scan))
+    if scan.secrets():
+        proceed = input("\n⚠️ Hay posibles secretos en los archivos preparados. ¿Hacer commit de todos modos? (S/s): ")
+        if proceed.lower() != 's':
+            print("❌ Commit cancelado. Quita los archivos con `git restore --staged <archivo>`.")
+            return None
+    return scan
+
+def handle_files_selection(files, message, root=None, count_files=None):
+    entries = files if isinstance(files, LazyEntries) else LazyEntries(files)
+    if not entries:
         return []
     
     print(f"\n{message}")
-    for idx, file_path in enumerate(files):
-        print(f" [{idx}] {file_path}")
-    
-    selection = input(
-        "Ingresa los números (ej: 0,2,4)\n"
-        "'t' para todos\n"
-        "'n' para ninguno\n"
-        "Opción: "
-    ).strip().lower()
-    
-    if selection == 't':
-        return files
-    elif selection == 'n':
-        return []
-    else:
+    shown = 0
+    while True:
+        page = entries.page(shown)
+        labels = [display_path(file_path, root) for file_path in page]
+        sizes = count_files(root, [l for l in labels if l.endswith('/')]) if count_files else {}
+        for idx, label in enumerate(labels, shown):
+            size = f" ({sizes[label]} archivos)" if label in sizes else ""
+            print(f" [{idx}] {label}{size}")
+        shown += len(page)
+        more = entries.has_more(shown)
+        
+        selection = input(
+            "Ingresa los números (ej: 0,2,4), rangos (ej: 3-10), un glob (ej: *.py) o re:<regex>\n"
+            "'t' para todos\n"
+            "'n' para ninguno\n"
+            + ("'m' para ver más\n" if more else "") +
+            "Opción: "
+        ).strip()
+        
+        if selection.lower() == 'm':
+            if not more:
+                print("ℹ️ No hay más archivos.")
+            continue
+        if selection.lower() == 't':
+            return list(entries)
+        if selection.lower() == 'n':
+            return []
         try:
-            selected_indices = [int(i) for i in selection.split(',')]
-            return [
-                files[i] 
-                for i in selected_indices 
-                if 0 <= i < len(files)
-            ]
-        except ValueError:
-            print("⚠️ Entrada inválida. Usando ninguno.")
+            return select_entries(entries, selection, root)
+        except SelectionError as e:
+            print(f"⚠️ Entrada inválida ({e}). Usando ninguno.")
             return []
 
 def prompt_testing_notes():
@@ -433,6 +685,9 @@ def prompt_compatible_apps():
         apps.append((app_name, version))
         app_count += 1
     
+    return format_apps_table(apps)
+
+def format_apps_table(apps):
     table_lines = [
         "| Aplicación  | Versión |",
         "|-------------|---------|"
@@ -443,36 +698,51 @@ def prompt_compatible_apps():
     
     return '\n'.join(table_lines)
 
-def generate_pr_template(branch_name, all_files, commit_msg):
-    db_files = [f for f in all_files if f.lower().endswith('.sql')]
+def format_db_section(root, db_files, blob_changes=None):
+    from .sql_summary import format_schema_summary, summarize_sql_changes
+
+    root = str(root or os.getcwd())
+    wanted = {os.path.relpath(os.path.join(root, f), root): f for f in db_files}
+    changes = (staged_blob_changes(root) if blob_changes is None else blob_changes) or []
+    schema = summarize_sql_changes(root, [(p, old, new) for p, _, old, new in changes if p in wanted])
+    summarized = {wanted[summary.path] for summary in schema.files}
+    lines = [format_schema_summary(schema)] if schema.files else []
+    lines += [f"- {f}" for f in db_files if f not in summarized]
+    return "**Se modificaron estos archivos SQL:**\n" + "\n".join(lines)
+
+def write_pr_template(out, branch_name, all_files, commit_msg, testing_notes='N/A', compatible_apps=None, bugs='N/A',
+                      root=None, scan=None, blob_changes=None):
+    from .scanner import format_scan_report
+
+    file_types = get_classifier(root).group_by_category(all_files)
+    db_files = file_types['SQL']
+    if db_files:
+        db_section = format_db_section(root, db_files, blob_changes)
+    else:
+        db_section = "No hay cambios en base de datos"
     
-    testing_notes = prompt_testing_notes()
-    compatible_apps = prompt_compatible_apps()
-    bugs = prompt_bugs()
+    if compatible_apps is None:
+        compatible_apps = format_apps_table([])
 
-    content = f"""## Descripción
+    out.write(f"""## Descripción
 
 **Rama:** `{branch_name}`  
 **Commit:** `{commit_msg or 'Sin mensaje'}`
 
 ## Configuraciones
-{"**Se modificaron estos archivos SQL:**\n" + "\n".join(f"- {f}" for f in db_files) if db_files else "No hay cambios en base de datos"}
+{db_section}
 
 ## Archivos Modificados
-"""
+""")
     
-    file_types = {
-        'SQL': [f for f in all_files if f.lower().endswith('.sql')],
-        'Código': [f for f in all_files if f.lower().endswith(('.py', '.js', '.java', '.cpp', '.c', '.h', '.ts'))],
-        'Documentación': [f for f in all_files if f.lower().endswith(('.md', '.txt', '.rst'))],
-        'Otros': [f for f in all_files if not f.lower().endswith(('.sql', '.py', '.js', '.java', '.cpp', '.c', '.h', '.ts', '.md', '.txt', '.rst'))]
-    }
-
     for category, files in file_types.items():
         if files:
-            content += f"\n### {category}\n" + "\n".join(f"- {f}" for f in files) + "\n"
+            out.write(f"\n### {category}\n" + "\n".join(f"- {f}" for f in files) + "\n")
+
+    if scan is not None:
+        out.write(f"\n## Revisión de contenido\n{format_scan_report(scan)}\n")
 
-    content += f"""
+    out.write(f"""
 
 ## Aplicaciones Compatibles
 {compatible_apps}
@@ -481,30 +751,423 @@ def generate_pr_template(branch_name, all_files, commit_msg):
 {testing_notes}
 
 ## Bugs
-{bugs}
-"""
+{bugs}""")
+    return db_files
+
+def build_pr_template(branch_name, all_files, commit_msg, **sections):
+    out = io.StringIO()
+    write_pr_template(out, branch_name, all_files, commit_msg, **sections)
+    return out.getvalue()
+
+@profiling.profiled('generate_pr_template')
+def generate_pr_template(branch_name, all_files, commit_msg, scan=None, blob_changes=None):
+    testing_notes = prompt_testing_notes()
+    compatible_apps = prompt_compatible_apps()
+    bugs = prompt_bugs()
 
     with open("PR_suggest.md", "w", encoding="utf-8") as f:
-        f.write(content.strip())
+        db_files = write_pr_template(f, branch_name, all_files, commit_msg,
+                                     testing_notes, compatible_apps, bugs, scan=scan, blob_changes=blob_changes)
         
     
     print(f"\n✅ Archivo PR_suggest.md generado con {len(all_files)} archivos listados")
     print(f"📌 Archivos SQL incluidos: {len(db_files)}")
 
-def main():
+_worker_model = None
+
+def init_batch_worker():
+    global _worker_model
+    with redirect_stdout(sys.stderr):
+        _worker_model = load_default_model()
+
+def suggest_for_repo(git_root, model, budget_ms=None):
+    status, branch_name = git_runner.gather(RepoStatus.load_async(git_root), current_branch_async(git_root))
+    
+    staged = status.staged
+    if not staged:
+        return branch_name, status, None, [], None
+    
+    suggestions, predominant_file_type, coverage = compute_suggestions(branch_name, staged, git_root, model,
+                                                                       budget_ms=budget_ms)
+    return branch_name, status, predominant_file_type, suggestions, coverage
+
+def collect_report(repo_path, budget_ms=None):
+    from .scanner import scan_staged_changes
+
+    git_root = find_git_root(repo_path)
+    if not git_root:
+        return {"repo": str(repo_path), "error": "No es un repositorio Git"}
+    
+    model = load_history_model(git_root, TYPES) or _worker_model
+    if model is None:
+        init_batch_worker()
+        model = _worker_model
+    branch_name, status, predominant_file_type, suggestions, coverage = suggest_for_repo(git_root, model, budget_ms)
+    scan = scan_staged_changes(git_root) if status.staged else None
+    
+    return {
+        "repo": str(git_root),
+        "branch": branch_name,
+        "files": {
+            kind: [{"path": f, "type": get_file_type(f, git_root)} for f in files]
+            for kind, files in status.as_dict().items()
+        },
+        "predominant_file_type": predominant_file_type,
+        "suggestions": [{"message": m, "confidence": round(c, 4)} for m, c in suggestions],
+        "coverage": coverage,
+        "scan": scan.as_dict() if scan else None,
+        "pr_template": build_pr_template(branch_name, status.staged, suggestions[0][0], root=git_root, scan=scan)
+                       if suggestions else None,
+    }
+
+def run_batch(repos, jobs=None, as_json=False, budget_ms=None):
+    from concurrent.futures import ProcessPoolExecutor
+    from .sampling import format_coverage
+
+    repos = repos or [os.getcwd()]
+    init_batch_worker()
+    if len(repos) == 1:
+        reports = [collect_report(repos[0], budget_ms)]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=init_batch_worker) as executor:
+            reports = list(executor.map(collect_report, repos, [budget_ms] * len(repos)))
+    
+    if as_json:
+        json.dump(reports if len(reports) > 1 else reports[0], sys.stdout, ensure_ascii=False, indent=2)
+        sys.stdout.write("\n")
+        return reports
+    
+    for report in reports:
+        print(f"\n📁 {report['repo']}")
+        if "error" in report:
+            print(f"❌ {report['error']}")
+            continue
+        print(f"🌿 Rama: {report['branch']}")
+        for kind, files in report["files"].items():
+            print(f"- {kind.capitalize()}: {len(files)} archivos")
+        for index, suggestion in enumerate(report["suggestions"], 1):
+            print(f"💡 #{index} ({suggestion['confidence']:.0%}) {suggestion['message']}")
+        if report["coverage"]:
+            print(f"ℹ️ Análisis parcial: {format_coverage(report['coverage'])}")
+    return reports
+
+SNAPSHOT_CACHE_SIZE = 32
+
+def repo_signature(git_root):
+    git_dir = os.path.join(git_root, '.git')
+    try:
+        index_stat = os.stat(os.path.join(git_dir, 'index'))
+        with open(os.path.join(git_dir, 'HEAD'), encoding='utf-8') as f:
+            head = f.read().strip()
+    except OSError:
+        return None
+    return index_stat.st_mtime_ns, index_stat.st_size, head
+
+class SuggestionService:
+    def __init__(self):
+        self.default_model = load_default_model()
+        self.history_models = {}
+        self.snapshots = OrderedDict()
+        self.lock = threading.Lock()
+    
+    def model_for(self, git_root):
+        meta_path = os.path.join(history_model_dir(git_root), 'meta.json')
+        try:
+            mtime = os.stat(meta_path).st_mtime_ns
+        except OSError:
+            return self.default_model
+        
+        with self.lock:
+            cached = self.history_models.get(git_root)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        
+        model = load_history_model(git_root, TYPES) or self.default_model
+        with self.lock:
+            self.history_models[git_root] = (mtime, model)
+        return model
+    
+    def handle(self, request):
+        git_root = find_git_root(request.get("repo"))
+        if not git_root:
+            return {"error": "No es un repositorio Git"}
+        git_root = str(git_root)
+        get_classifier(git_root, refresh=True)
+        get_taxonomy(git_root, refresh=True)
+        
+        signature = repo_signature(git_root)
+        key = (git_root, signature)
+        with self.lock:
+            response = self.snapshots.get(key) if signature else None
+            if response is not None:
+                self.snapshots.move_to_end(key)
+                return response
+        
+        branch_name, _, _, suggestions, coverage = suggest_for_repo(git_root, self.model_for(git_root))
+        response = {
+            "repo": git_root,
+            "branch": branch_name,
+            "message": suggestions[0][0] if suggestions else None,
+            "suggestions": [{"message": m, "confidence": round(c, 4)} for m, c in suggestions],
+            "coverage": coverage,
+        }
+        
+        if signature:
+            with self.lock:
+                self.snapshots[key] = response
+                while len(self.snapshots) > SNAPSHOT_CACHE_SIZE:
+                    self.snapshots.popitem(last=False)
+        return response
+
+def plan_command(args):
+    from .planner import plan_commits, planned_files
+
+    git_root = find_git_root(args.repo[0] if args.repo else None)
+    if not git_root:
+        print("❌ Error: No estás dentro de un repositorio Git.")
+        return None
+    root = str(git_root)
+    
+    files = planned_files(iter_staged_diff(root))
+    if not files:
+        print("No hay archivos preparados para commit")
+        return []
+    
+    branch_name = git_runner.get_runner().call(current_branch_async(root))
+    model = load_or_train_model(root)
+    components, _ = load_component_index(root, [f.path for f in files])
+    plan = []
+    for group in plan_commits(files, model):
+        paths = [os.path.join(root, f.path) for f in group.files]
+        analysis = ChangeAnalysis(group.changes_text, get_taxonomy(root))
+        analysis.type_probabilities = group.type_probabilities
+        analysis.predicted_type = group.commit_type
+        predominant_file_type = Counter(get_file_type(p, root) for p in paths).most_common(1)[0][0]
+        suggestions = suggest_commit_messages(
+            branch_name, paths, group.changes_text, predominant_file_type, model, analysis,
+            components.scope([f.path for f in group.files]))
+        plan.append({
+            "type": group.commit_type,
+            "message": suggestions[0][0],
+            "confidence": round(suggestions[0][1], 4),
+            "files": [f.path for f in group.files],
+            "lines": group.lines,
+        })
+    
+    if args.json:
+        json.dump(plan, sys.stdout, ensure_ascii=False, indent=2)
+        sys.stdout.write("\n")
+        return plan
+    
+    print(f"🧩 Plan de commits propuesto ({len(plan)} commits para {len(files)} archivos):")
+    for index, step in enumerate(plan, 1):
+        print(f"\n{index}. {step['message']} (confianza {step['confidence']:.0%})")
+        for path in step["files"][:ADD_REPORT_LIMIT]:
+            print(f"   + {path}")
+        if len(step["files"]) > ADD_REPORT_LIMIT:
+            print(f"   … y {len(step['files']) - ADD_REPORT_LIMIT} archivos más")
+    return plan
+
+def pr_command(args, git_root):
+    from .branch_report import collect_branch_report, write_branch_report_file
+
+    report = collect_branch_report(str(git_root), TYPES, args.base)
+    if report is None:
+        print(f"❌ No se encontró la rama base {args.base or '(origin/HEAD, main, master, develop)'}")
+        return None
+    
+    write_branch_report_file(args.output, report)
+    print(f"✅ Archivo {args.output} generado para {report.commits} commits desde {report.base}")
+    print(f"📌 Archivos modificados: {len(report.files)}")
+    return report
+
+def evaluate_command(args):
+    from .evaluation import DEFAULT_FOLDS, DEFAULT_MAX_COMMITS, evaluate_models, load_corpus
+
+    git_root = find_git_root(args.repo[0] if args.repo else None)
+    if not git_root:
+        print("❌ Error: No estás dentro de un repositorio Git.")
+        return None
+    
+    folds = DEFAULT_FOLDS if args.folds is None else args.folds
+    max_commits = DEFAULT_MAX_COMMITS if args.max_commits is None else args.max_commits
+    corpus = load_corpus(str(git_root), TYPES, max_commits)
+    branch = git_runner.get_runner().call(current_branch_async(str(git_root)))
+    report = evaluate_models(corpus, TYPES, str(git_root), branch, folds)
+    if report is None:
+        print(f"❌ Se necesitan más commits convencionales con al menos dos tipos distintos "
+              f"(hay {len(corpus)} para {folds} folds).")
+        return None
+    
+    if args.json:
+        json.dump(report, sys.stdout, ensure_ascii=False, indent=2)
+        sys.stdout.write("\n")
+        return report
+    
+    print(f"📈 Evaluación con {report['commits']} commits, {report['folds']} folds temporales "
+          f"({report['evaluated']} predicciones)\n")
+    print(f"{'Modelo':<14} {'Exactitud':>9} {'F1 macro':>9} {'Tamaño':>10} {'Carga':>10} {'Pred/s':>10}")
+    for result in report['results']:
+        rate = result['predictions_per_second']
+        print(f"{result['model']:<14} {result['accuracy']:>9.1%} {result['macro_f1']:>9.3f} "
+              f"{result['size_bytes'] / 1024:>8.1f}KB {result['load_ms']:>8.2f}ms {rate if rate else '-':>10}")
+    for result in report['results']:
+        scores = ", ".join(f"{label} {c['f1']:.2f} ({c['support']})" for label, c in result['per_class'].items())
+        print(f"\n{result['model']} F1 por tipo: {scores}")
+    return report
+
+def serve_command(args):
+    from .daemon import default_socket_path, serve
+
+    with redirect_stdout(sys.stderr):
+        service = SuggestionService()
+    socket_path = args.socket or default_socket_path()
+    print(f"🚀 Servidor de sugerencias escuchando en {socket_path}")
+    try:
+        serve(service.handle, socket_path)
+    except KeyboardInterrupt:
+        print("\n👋 Servidor detenido")
+
+HOOK_SCRIPT = """#!/bin/sh
+# Instalado por ai-git-assistant: sugiere el mensaje de commit
+exec ai-git-assistant-hook "$@"
+"""
+
+def install_hook_command(git_root):
+    hooks_dir = run_git_command(["git", "rev-parse", "--git-path", "hooks"], cwd=git_root)
+    hook_path = os.path.join(git_root, hooks_dir[0], 'prepare-commit-msg')
+    if os.path.exists(hook_path):
+        print(f"⚠️ Ya existe un hook en {hook_path}; no se modificó.")
+        return
+    os.makedirs(os.path.dirname(hook_path), exist_ok=True)
+    with open(hook_path, "w", encoding="utf-8") as f:
+        f.write(HOOK_SCRIPT)
+    os.chmod(hook_path, 0o755)
+    print(f"✅ Hook instalado en {hook_path}")
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='ai-git-assistant',
+        description='Asistente inteligente para commits semánticos y plantillas de PR'
+    )
+    subparsers = parser.add_subparsers(dest='command')
+    
+    train_parser = subparsers.add_parser('train', help='Entrena el modelo de sugerencias')
+    train_parser.add_argument(
+        '--from-history', action='store_true',
+        help='Entrena un modelo propio del repositorio con sus commits convencionales'
+    )
+    
+    serve_parser = subparsers.add_parser('serve', help='Mantiene el modelo cargado y atiende al hook prepare-commit-msg')
+    serve_parser.add_argument('--socket', default=None, help='Ruta del socket Unix')
+    
+    subparsers.add_parser('plan', help='Propone cómo dividir los cambios en staging en varios commits')
+    
+    pr_parser = subparsers.add_parser('pr', help='Genera la plantilla de PR con todos los commits de la rama')
+    pr_parser.add_argument('--base', default=None, help='Rama base (por defecto origin/HEAD, main o master)')
+    pr_parser.add_argument('--output', default='PR_suggest.md', help='Archivo de salida')
+    
+    subparsers.add_parser('install-hook', help='Instala el hook prepare-commit-msg en este repositorio')
+    
+    evaluate_parser = subparsers.add_parser(
+        'evaluate', help='Compara los clasificadores con validación temporal sobre el historial del repositorio')
+    evaluate_parser.add_argument('--folds', type=int, default=None, help='Número de folds temporales (por defecto 5)')
+    evaluate_parser.add_argument('--max-commits', type=int, default=None,
+                                 help='Usa solo los N commits convencionales más recientes (por defecto 5000; 0 = todos)')
+    
+    parser.add_argument('--non-interactive', action='store_true',
+                        help='No hace preguntas ni modifica el repositorio; solo reporta sugerencias')
+    parser.add_argument('--json', action='store_true',
+                        help='Imprime el reporte en JSON (implica --non-interactive)')
+    parser.add_argument('--repo', action='append', default=[], metavar='RUTA',
+                        help='Repositorio a analizar; se puede repetir para procesar varios en paralelo')
+    parser.add_argument('--jobs', type=int, default=None,
+                        help='Número de procesos para analizar varios repositorios')
+    parser.add_argument('--budget-ms', type=int, default=None, metavar='MS',
+                        help='Presupuesto de tiempo para leer el diff; en diffs grandes se muestrean líneas')
+    parser.add_argument('--git-jobs', type=int, default=None, metavar='N',
+                        help='Máximo de comandos git ejecutándose a la vez')
+    parser.add_argument('--profile', nargs='?', const=profiling.DEFAULT_TRACE_PATH, default=None, metavar='ARCHIVO',
+                        help='Registra tiempos por etapa y guarda una traza en formato Chrome trace-event')
+    return parser
+
+def train_command(args, git_root):
+    if not args.from_history:
+        train_model()
+        print(f"✅ Modelo entrenado en: {model_dir(TYPES)}")
+        return
+    
+    print("📚 Entrenando con el historial del repositorio...")
+    meta, trained = train_from_history(git_root, TYPES)
+    if meta is None:
+        print("ℹ️ El repositorio todavía no tiene commits.")
+        return
+    print(f"✅ {trained} commits nuevos procesados ({meta['commits_trained']} en total)")
+    print(f"📌 Último commit entrenado: {meta['last_commit']}")
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.git_jobs:
+        git_runner.set_concurrency(args.git_jobs)
+    
+    if not args.profile:
+        run_assistant(args)
+        return
+    
+    trace_path = os.path.abspath(args.profile)
+    profiling.enable()
+    try:
+        run_assistant(args)
+    finally:
+        data = profiling.write_trace(trace_path)
+        print("\n" + profiling.format_summary(data), file=sys.stderr)
+        print(f"📈 Traza guardada en {trace_path} (ábrela en chrome://tracing o Perfetto)", file=sys.stderr)
+
+def run_assistant(args):
+    from .sampling import format_coverage
+
+    if args.command == 'plan':
+        plan_command(args)
+        return
+    
+    if args.command == 'evaluate':
+        evaluate_command(args)
+        return
+    
+    if args.command == 'serve':
+        serve_command(args)
+        return
+    
+    if args.command is None and (args.non_interactive or args.json):
+        run_batch(args.repo, args.jobs, args.json, args.budget_ms)
+        return
     
     git_root = find_git_root()
     if not git_root:
         print("❌ Error: No estás dentro de un repositorio Git.")
         return
     
+    if args.command == 'train':
+        train_command(args, git_root)
+        return
+    
+    if args.command == 'install-hook':
+        install_hook_command(git_root)
+        return
+    
+    if args.command == 'pr':
+        pr_command(args, git_root)
+        return
+    
     print_ascii_logo()
     
     os.chdir(git_root)
     print(f"✅ Repositorio encontrado en: {git_root}")
     print(f"\n📂 Directorio de trabajo: {os.getcwd()}")
     
-    branch_name = create_branch()
+    prefetch_repo_status(git_root, untracked='normal')
+    analyzer = SpeculativeAnalyzer(git_root, args.budget_ms)
+    branch_name = create_branch(git_runner.submit(current_branch_async(git_root)))
     
     sql_files = detect_files_by_extension('.sql')
     if sql_files:
@@ -516,28 +1179,33 @@ def main():
         if proceed:
             added = add_files(sql_files)
             print(f"✅ {added}/{len(sql_files)} archivos SQL agregados")
+            if added:
+                analyzer.refresh()
     
     status = git_status_info()
     print("\n📊 Estado actual del repositorio:")
     print(f"- Staged: {len(status['staged'])} archivos")
     print(f"- Unstaged: {len(status['unstaged'])} archivos")
-    print(f"- Untracked: {len(status['untracked'])} archivos")
+    print(f"- Untracked: {len(status['untracked'])} archivos o directorios")
     
     if status['unstaged']:
         selected_unstaged = handle_files_selection(
             status['unstaged'], 
-            "Archivos con cambios sin agregar (unstaged):"
+            "Archivos con cambios sin agregar (unstaged):",
+            str(git_root)
         )
-        if selected_unstaged:
-            add_files(selected_unstaged)
+        if selected_unstaged and add_files(selected_unstaged):
+            analyzer.refresh()
     
     if status['untracked']:
         selected_untracked = handle_files_selection(
-            status['untracked'],
-            "Archivos sin seguimiento (untracked):"
+            LazyEntries(iter_untracked(str(git_root))),
+            "Archivos sin seguimiento (untracked):",
+            str(git_root),
+            count_untracked_files
         )
-        if selected_untracked:
-            add_files(selected_untracked)
+        if selected_untracked and add_files(selected_untracked):
+            analyzer.refresh()
     
     status = git_status_info()
     all_files = status["staged"]
@@ -547,15 +1215,26 @@ def main():
         for f in all_files:
             print(" +", f)
         
-        model = load_or_train_model()
-        changes_text, predominant_file_type = analyze_changes(all_files)
-        commit_msg = generate_commit_message(branch_name, all_files, changes_text, predominant_file_type, model)
+        suggestions, _, coverage = compute_suggestions(branch_name, all_files, analyzer=analyzer)
+        if coverage:
+            print(f"\nℹ️ Análisis parcial: {format_coverage(coverage)}")
+        scan = review_staged_content(git_root)
+        # Tras el commit el índice ya no difiere de HEAD: los blobs se guardan antes
+        blob_changes = staged_blob_changes(git_root)
+        if scan is None:
+            commit_msg = None
+        else:
+            commit_msg = generate_commit_message(branch_name, all_files, None, None, None, suggestions)
     else:
         print("\nNo hay archivos preparados para commit")
         commit_msg = None
+        scan = None
+        blob_changes = None
+    
+    analyzer.close()
     
     if commit_msg:
-        generate_pr_template(branch_name, all_files, commit_msg)
+        generate_pr_template(branch_name, all_files, commit_msg, scan, blob_changes)
     
     print("\n¡Proceso completado con éxito!")
 
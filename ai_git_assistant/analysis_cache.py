@@ -0,0 +1,115 @@
+import hashlib
+import json
+import os
+import tempfile
+
+from . import git_runner, profiling
+
+ANALYSIS_CACHE_VERSION = 2
+MAX_CACHE_BYTES = 8 * 1024 * 1024
+MAX_CACHE_ENTRIES = 256
+
+
+def diff_blob_changes(root, revisions):
+    args = ["git", "diff", *revisions, "--raw", "-z", "--no-abbrev", "--no-color"]
+    result = git_runner.run(args, root)
+    if result.returncode != 0:
+        return None
+
+    changes = []
+    records = result.stdout.split('\0')
+    i = 0
+    while i < len(records):
+        meta = records[i]
+        i += 1
+        if not meta.startswith(':'):
+            continue
+        fields = meta[1:].split(' ')
+        old_oid, new_oid, status = fields[2], fields[3], fields[4]
+        old_path = None
+        if status[0] in 'RC':
+            old_path = records[i]
+            i += 1
+        path = records[i] if i < len(records) else ''
+        i += 1
+        changes.append((path, old_path, old_oid, new_oid))
+    return sorted(changes)
+
+
+def staged_blob_changes(root):
+    return diff_blob_changes(root, ["--cached"])
+
+
+def staged_blob_triples(root):
+    changes = staged_blob_changes(root)
+    if changes is None:
+        return None
+    return [(path, old_oid, new_oid) for path, _, old_oid, new_oid in changes]
+
+
+def git_path(root, name):
+    args = ["git", "rev-parse", "--git-path", name]
+    result = git_runner.run(args, root)
+    path = result.stdout.strip()
+    if result.returncode != 0 or not path:
+        return None
+    return os.path.join(root, path)
+
+
+class AnalysisCache:
+    def __init__(self, directory, max_bytes=MAX_CACHE_BYTES, max_entries=MAX_CACHE_ENTRIES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+
+    @classmethod
+    def for_repo(cls, root):
+        directory = git_path(root, 'ai-git-assistant/analysis')
+        return cls(directory) if directory else None
+
+    @staticmethod
+    def key(triples, *context):
+        payload = json.dumps([ANALYSIS_CACHE_VERSION, triples, context], ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def entry_path(self, key):
+        return os.path.join(self.directory, f'{key}.json')
+
+    def get(self, key):
+        path = self.entry_path(key)
+        try:
+            with open(path, encoding='utf-8') as f:
+                entry = json.load(f)
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        profiling.count('analysis_cache_hits')
+        return entry
+
+    def put(self, key, entry):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(prefix='.tmp-', dir=self.directory)
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, self.entry_path(key))
+            self.evict()
+        except OSError:
+            pass
+
+    def evict(self):
+        entries = []
+        with os.scandir(self.directory) as it:
+            for item in it:
+                if item.name.endswith('.json'):
+                    stat = item.stat()
+                    entries.append((stat.st_mtime_ns, stat.st_size, item.path))
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        while entries and (total > self.max_bytes or len(entries) > self.max_entries):
+            _, size, path = entries.pop(0)
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+            total -= size
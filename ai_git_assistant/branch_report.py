@@ -0,0 +1,190 @@
+import os
+from collections import Counter
+
+from . import git_runner
+from .analysis_cache import diff_blob_changes
+from .classifier import get_classifier
+from .history import commit_type
+from .sql_summary import SQL_SUFFIXES, format_schema_summary, summarize_sql_changes
+
+COMMIT_MARKER = '\x1e'
+FIELD_SEPARATOR = '\x1f'
+RECENT_COMMITS = 30
+COMPONENT_DEPTH = 2
+DEFAULT_BASES = ('origin/HEAD', 'origin/main', 'origin/master', 'main', 'master', 'develop')
+
+def component_of(path, depth=COMPONENT_DEPTH):
+    parts = path.split('/')[:-1]
+    return '/'.join(parts[:depth]) if parts else '(raíz)'
+
+
+class FileStats:
+    __slots__ = ('added', 'removed', 'binary', 'old_path')
+
+    def __init__(self):
+        self.added = 0
+        self.removed = 0
+        self.binary = False
+        self.old_path = None
+
+
+class BranchReport:
+    def __init__(self, root, branch, base, merge_base):
+        self.root = root
+        self.branch = branch
+        self.base = base
+        self.merge_base = merge_base
+        self.commits = 0
+        self.commit_types = Counter()
+        self.components = Counter()
+        self.files = {}
+        self.recent = []
+        self.schema = None
+
+    def add_commit(self, sha, subject, types):
+        self.commits += 1
+        self.commit_types[commit_type(subject, types) or 'otros'] += 1
+        if len(self.recent) < RECENT_COMMITS:
+            self.recent.append((sha, subject))
+
+    def add_file(self, path, added, removed, old_path=None):
+        stats = self.files.get(path)
+        if stats is None:
+            stats = self.files[path] = FileStats()
+        if old_path is not None:
+            stats.old_path = old_path
+        if added == '-':
+            stats.binary = True
+            return
+        stats.added += int(added)
+        stats.removed += int(removed)
+        self.components[component_of(path)] += int(added) + int(removed)
+
+    def categories(self):
+        grouped = get_classifier(self.root).group_by_category(sorted(self.files))
+        return {category: [(path, self.files[path]) for path in paths] for category, paths in grouped.items()}
+
+
+def resolve_base(root, base=None):
+    candidates = [base] if base else DEFAULT_BASES
+    for candidate in candidates:
+        result = git_runner.run(["git", "rev-parse", "--verify", "-q", f"{candidate}^{{commit}}"], root)
+        if result.returncode == 0:
+            return candidate
+    return None
+
+
+def merge_base(root, base):
+    result = git_runner.run(["git", "merge-base", base, "HEAD"], root)
+    return result.stdout.strip() if result.returncode == 0 else None
+
+
+def iter_numstat_records(root, revision_range):
+    args = ["git", "-c", "core.quotepath=off", "log", "--no-merges", "--no-color", "--numstat", "-z",
+            f"--format={COMMIT_MARKER}%H{FIELD_SEPARATOR}%s", revision_range, "--"]
+    records = git_runner.iter_records(args, root)
+    for record in records:
+        record = record.lstrip('\n')
+        if not record:
+            continue
+        if record.startswith(COMMIT_MARKER):
+            sha, _, subject = record[1:].partition(FIELD_SEPARATOR)
+            yield 'commit', sha, subject
+            continue
+        added, removed, path = record.split('\t', 2)
+        old_path = None
+        if not path:
+            old_path = next(records, '')
+            path = next(records, '')
+        yield 'file', (added, removed, path), old_path
+
+
+def collect_branch_report(root, types, base=None):
+    base = resolve_base(root, base)
+    if base is None:
+        return None
+    fork_point = merge_base(root, base)
+    if fork_point is None:
+        return None
+    branch = git_runner.run(["git", "rev-parse", "--abbrev-ref", "HEAD"], root).stdout.strip() or 'HEAD'
+
+    report = BranchReport(root, branch, base, fork_point)
+    # git log va del commit más nuevo al más viejo: se recuerda el nombre final de cada renombre
+    current_names = {}
+    for kind, first, second in iter_numstat_records(root, f"{fork_point}..HEAD"):
+        if kind == 'commit':
+            report.add_commit(first, second, types)
+            continue
+        added, removed, path = first
+        path = current_names.get(path, path)
+        if second is not None:
+            current_names[second] = path
+        report.add_file(path, added, removed, second)
+
+    if any(path.lower().endswith(SQL_SUFFIXES) for path in report.files):
+        changes = diff_blob_changes(root, [fork_point, "HEAD"]) or []
+        report.schema = summarize_sql_changes(root, [(p, old, new) for p, _, old, new in changes])
+    return report
+
+
+def write_branch_report(out, report, testing_notes='N/A', compatible_apps='N/A', bugs='N/A'):
+    grouped = report.categories()
+    totals = {
+        category: (len(files), sum(s.added for _, s in files), sum(s.removed for _, s in files))
+        for category, files in grouped.items()
+    }
+    total_added = sum(t[1] for t in totals.values())
+    total_removed = sum(t[2] for t in totals.values())
+
+    out.write(f"## Descripción\n\n"
+              f"**Rama:** `{report.branch}`  \n"
+              f"**Base:** `{report.base}` (`{report.merge_base[:12]}`)  \n"
+              f"**Commits:** {report.commits}  \n"
+              f"**Líneas:** +{total_added} / -{total_removed} en {len(report.files)} archivos\n")
+
+    out.write("\n## Commits por tipo\n")
+    for name, count in report.commit_types.most_common():
+        out.write(f"- {name}: {count}\n")
+
+    out.write("\n## Componentes\n")
+    for name, lines in report.components.most_common(15):
+        out.write(f"- `{name}`: {lines} líneas\n")
+
+    out.write("\n## Configuraciones\n")
+    if grouped['SQL']:
+        out.write("**Se modificaron estos archivos SQL:**\n")
+        summarized = {summary.path for summary in report.schema.files} if report.schema else set()
+        if summarized:
+            out.write(format_schema_summary(report.schema) + "\n")
+        for path, _ in grouped['SQL']:
+            if path not in summarized:
+                out.write(f"- {path}\n")
+    else:
+        out.write("No hay cambios en base de datos\n")
+
+    out.write("\n## Archivos Modificados\n")
+    for category, files in grouped.items():
+        if not files:
+            continue
+        count, added, removed = totals[category]
+        out.write(f"\n### {category} ({count} archivos, +{added} / -{removed})\n")
+        for path, stats in files:
+            change = "binario" if stats.binary else f"+{stats.added} / -{stats.removed}"
+            renamed = f" (antes `{stats.old_path}`)" if stats.old_path else ""
+            out.write(f"- {path}{renamed}: {change}\n")
+
+    if report.recent:
+        out.write("\n## Commits recientes\n")
+        for sha, subject in report.recent:
+            out.write(f"- `{sha[:8]}` {subject}\n")
+
+    out.write(f"\n## Aplicaciones Compatibles\n{compatible_apps}\n"
+              f"\n## Consideraciones para Testing\n{testing_notes}\n"
+              f"\n## Bugs\n{bugs}\n")
+
+
+def write_branch_report_file(path, report, **sections):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        write_branch_report(f, report, **sections)
+    os.replace(tmp_path, path)
@@ -0,0 +1,126 @@
+import os
+import re
+
+from .config import config_section, config_signature
+
+FILE_TYPES = ('code', 'test', 'docs', 'style', 'config', 'db', 'lock', 'other')
+
+DEFAULT_SUFFIXES = {
+    **dict.fromkeys(['.py', '.js', '.jsx', '.java', '.cpp', '.c', '.h', '.hpp', '.ts', '.tsx', '.go', '.rb',
+                     '.rs', '.kt', '.swift', '.php', '.cs', '.sh'], 'code'),
+    **dict.fromkeys(['.test.js', '.spec.js', '.test.ts', '.spec.ts', '.test.tsx', '.spec.tsx',
+                     '.test.py', '.spec.py', '.test.jsx', '.spec.jsx'], 'test'),
+    **dict.fromkeys(['.md', '.txt', '.rst', '.pdf', '.doc', '.docx', '.adoc'], 'docs'),
+    **dict.fromkeys(['.css', '.scss', '.sass', '.less', '.html', '.xml'], 'style'),
+    **dict.fromkeys(['.json', '.yaml', '.yml', '.toml', '.ini', '.conf', '.cfg', '.env'], 'config'),
+    **dict.fromkeys(['.sql', '.ddl'], 'db'),
+    **dict.fromkeys(['.lock'], 'lock'),
+}
+
+DEFAULT_FILENAMES = {
+    'package-lock.json': 'lock',
+    'npm-shrinkwrap.json': 'lock',
+    'pnpm-lock.yaml': 'lock',
+    'go.sum': 'lock',
+    'dockerfile': 'config',
+    'makefile': 'config',
+    '.gitignore': 'config',
+    '.gitattributes': 'config',
+}
+
+DEFAULT_PATTERNS = [
+    (r'(?:^|/)(?:tests?|__tests__|specs?)/', 'test'),
+    (r'(?:^|/)test_[^/]*\.py$', 'test'),
+    (r'_test\.(?:py|go)$', 'test'),
+    (r'(?:^|/)(?:migrations?|db/migrate)/', 'db'),
+]
+
+PR_CATEGORY_BY_TYPE = {
+    'db': 'SQL',
+    'code': 'Código',
+    'test': 'Código',
+    'docs': 'Documentación',
+}
+PR_CATEGORIES = ('SQL', 'Código', 'Documentación', 'Otros')
+OTHER_CATEGORY = 'Otros'
+MAX_MEMOIZED_PATHS = 500_000
+
+
+class FileClassifier:
+    def __init__(self, suffixes=None, filenames=None, patterns=None, root=None):
+        self.root = os.path.join(str(root), '') if root else None
+        self.suffixes = {k.lower(): v for k, v in (suffixes or DEFAULT_SUFFIXES).items()}
+        self.filenames = {k.lower(): v for k, v in (filenames or DEFAULT_FILENAMES).items()}
+        self.max_suffix_dots = max((s.count('.') for s in self.suffixes), default=1)
+        patterns = list(patterns if patterns is not None else DEFAULT_PATTERNS)
+        self.pattern_types = [file_type for _, file_type in patterns]
+        alternation = '|'.join(f'(?P<p{i}>{pattern})' for i, (pattern, _) in enumerate(patterns))
+        self.matcher = re.compile(alternation).search if patterns else None
+        self.memo = {}
+
+    @classmethod
+    def from_config(cls, root=None):
+        section = config_section(root, 'classification')
+        suffixes = dict(DEFAULT_SUFFIXES)
+        suffixes.update(section.get('suffixes', {}))
+        filenames = dict(DEFAULT_FILENAMES)
+        filenames.update(section.get('filenames', {}))
+        patterns = [(p['pattern'], p['type']) for p in section.get('patterns', [])] + DEFAULT_PATTERNS
+        return cls(suffixes, filenames, patterns, root)
+
+    def relative(self, path):
+        path = path.replace(os.sep, '/') if os.sep != '/' else path
+        if self.root and path.startswith(self.root):
+            return path[len(self.root):]
+        return path
+
+    def classify_uncached(self, path):
+        path = self.relative(path)
+        if self.matcher is not None:
+            match = self.matcher(path)
+            if match:
+                return self.pattern_types[int(match.lastgroup[1:])]
+
+        name = path.rsplit('/', 1)[-1].lower()
+        file_type = self.filenames.get(name)
+        if file_type is not None:
+            return file_type
+
+        # Se prueba primero la extensión más larga: '.test.py' antes que '.py'
+        parts = name.split('.')
+        for dots in range(min(self.max_suffix_dots, len(parts) - 1), 0, -1):
+            file_type = self.suffixes.get('.' + '.'.join(parts[-dots:]))
+            if file_type is not None:
+                return file_type
+        return 'other'
+
+    def file_type(self, path):
+        file_type = self.memo.get(path)
+        if file_type is None:
+            if len(self.memo) >= MAX_MEMOIZED_PATHS:
+                self.memo.clear()
+            file_type = self.memo[path] = self.classify_uncached(path)
+        return file_type
+
+    def pr_category(self, path):
+        return PR_CATEGORY_BY_TYPE.get(self.file_type(path), OTHER_CATEGORY)
+
+    def group_by_category(self, paths):
+        grouped = {category: [] for category in PR_CATEGORIES}
+        for path in paths:
+            grouped[self.pr_category(path)].append(path)
+        return grouped
+
+
+_classifiers = {}
+
+
+def get_classifier(root=None, refresh=False):
+    root = os.path.abspath(str(root or os.getcwd()))
+    cached = _classifiers.get(root)
+    if cached is not None and not refresh:
+        return cached[1]
+    signature = config_signature(root)
+    if cached is None or cached[0] != signature:
+        cached = _classifiers[root] = (signature, FileClassifier.from_config(root))
+    return cached[1]
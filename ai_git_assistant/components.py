@@ -0,0 +1,152 @@
+import json
+import os
+import tempfile
+from collections import Counter
+
+from . import git_runner, profiling
+from .analysis_cache import git_path
+from .config import config_section, config_signature
+
+COMPONENT_INDEX_VERSION = 2
+MARKER_FILES = ('setup.py', 'pyproject.toml', 'package.json', 'go.mod', 'Cargo.toml')
+
+
+def normalize_prefix(path):
+    return '/'.join(part for part in path.replace(os.sep, '/').split('/') if part and part != '.')
+
+
+class ComponentIndex:
+    def __init__(self, components=None):
+        self.components = {}
+        self.trie = {}
+        for prefix, name in (components or {}).items():
+            self.add(prefix, name)
+
+    def add(self, prefix, name):
+        prefix = normalize_prefix(prefix)
+        if not prefix:
+            return
+        self.components[prefix] = name
+        node = self.trie
+        for part in prefix.split('/'):
+            node = node.setdefault(part, {})
+        node[None] = name
+
+    def lookup(self, path):
+        node = self.trie
+        found = None
+        for part in path.split('/')[:-1]:
+            node = node.get(part)
+            if node is None:
+                break
+            found = node.get(None, found)
+        return found
+
+    def scope(self, paths):
+        owners = Counter(self.lookup(path) for path in paths)
+        name, count = owners.most_common(1)[0] if owners else (None, 0)
+        # Solo se usa el scope si un componente es dueño de la mayoría de los archivos
+        return name if name and count * 2 > len(paths) else None
+
+
+def detect_package_roots(root):
+    args = ["git", "-c", "core.quotepath=off", "ls-files", "-z", "--"]
+    args += [f":(glob)**/{marker}" for marker in MARKER_FILES]
+    result = git_runner.run(args, root)
+    if result.returncode != 0:
+        return []
+    # Un marcador en la raíz describe todo el repositorio, no un componente
+    return [path for path in result.stdout.split('\0') if '/' in path]
+
+
+def marker_stats(root, markers):
+    stats = {}
+    for path in markers:
+        try:
+            st = os.stat(os.path.join(root, path))
+            stats[path] = [st.st_mtime_ns, st.st_size]
+        except OSError:
+            stats[path] = None
+    return stats
+
+
+def index_key(root):
+    # HEAD no forma parte de la llave: solo los marcadores y la configuración invalidan el índice
+    return [COMPONENT_INDEX_VERSION, json.loads(json.dumps(config_signature(root)))]
+
+
+def is_new_marker(path, markers):
+    return '/' in path and path.rsplit('/', 1)[1] in MARKER_FILES and path not in markers
+
+
+class ComponentIndexCache:
+    def __init__(self, path):
+        self.path = path
+
+    @classmethod
+    def for_repo(cls, root):
+        path = git_path(root, 'ai-git-assistant/components.json')
+        return cls(path) if path else None
+
+    def get(self, root, key, paths=()):
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        markers = entry.get("markers", {})
+        if entry.get("key") != key or marker_stats(root, markers) != markers:
+            return None
+        if entry.get("detected") and any(is_new_marker(path, markers) for path in paths):
+            return None
+        profiling.count('component_index_hits')
+        return ComponentIndex(entry.get("components"))
+
+    def put(self, key, markers, index, detected):
+        try:
+            directory = os.path.dirname(self.path)
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(prefix='.tmp-', dir=directory)
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({"key": key, "detected": detected, "markers": markers, "components": index.components},
+                          f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            pass
+
+
+@profiling.profiled('build_component_index')
+def build_component_index(root):
+    configured = config_section(root, 'components')
+    if configured:
+        return None, ComponentIndex({p: n for p, n in configured.items() if isinstance(n, str)})
+
+    markers = marker_stats(root, detect_package_roots(root))
+    index = ComponentIndex()
+    for path in markers:
+        directory = path.rsplit('/', 1)[0]
+        index.add(directory, directory.rsplit('/', 1)[-1])
+    return markers, index
+
+
+def load_component_index(root, paths=()):
+    root = str(root)
+    paths = [normalize_prefix(os.path.relpath(p, root) if os.path.isabs(p) else p) for p in paths]
+    cache = ComponentIndexCache.for_repo(root)
+    key = index_key(root)
+    if cache is not None:
+        index = cache.get(root, key, paths)
+        if index is not None:
+            return index, paths
+
+    markers, index = build_component_index(root)
+    if cache is not None:
+        cache.put(key, markers or {}, index, markers is not None)
+    return index, paths
+
+
+def component_scope(root, files):
+    if not files:
+        return None
+    index, paths = load_component_index(root, files)
+    return index.scope(paths)
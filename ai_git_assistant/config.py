@@ -0,0 +1,82 @@
+import json
+import os
+import sys
+
+REPO_CONFIG_NAME = '.ai-git-assistant.json'
+USER_CONFIG_NAME = 'config.json'
+
+_cache = {}
+
+
+def user_config_dir():
+    if sys.platform == 'darwin':
+        base = os.path.expanduser('~/Library/Application Support')
+    elif os.name == 'nt':
+        base = os.environ.get('APPDATA') or os.path.expanduser('~\\AppData\\Roaming')
+    else:
+        base = os.environ.get('XDG_CONFIG_HOME') or os.path.expanduser('~/.config')
+    return os.path.join(base, 'ai-git-assistant')
+
+
+def config_paths(root=None):
+    paths = [os.path.join(user_config_dir(), USER_CONFIG_NAME)]
+    if root:
+        paths.append(os.path.join(str(root), REPO_CONFIG_NAME))
+    return paths
+
+
+def merge(base, override):
+    merged = dict(base)
+    for key, value in override.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = merge(merged[key], value)
+        elif isinstance(value, list) and isinstance(merged.get(key), list):
+            merged[key] = value + merged[key]
+        else:
+            merged[key] = value
+    return merged
+
+
+def config_signature(root=None):
+    signature = []
+    for path in config_paths(root):
+        try:
+            stat = os.stat(path)
+            signature.append((path, stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            signature.append((path, None, None))
+    return tuple(signature)
+
+
+def read_config_file(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Se ignoró la configuración {path}: {e}", file=sys.stderr)
+        return {}
+    if not isinstance(data, dict):
+        print(f"⚠️ Se ignoró la configuración {path}: se esperaba un objeto JSON", file=sys.stderr)
+        return {}
+    return data
+
+
+def load_config(root=None):
+    signature = config_signature(root)
+    cached = _cache.get(signature)
+    if cached is not None:
+        return cached
+
+    config = {}
+    for path, mtime, _ in signature:
+        if mtime is not None:
+            config = merge(config, read_config_file(path))
+    _cache[signature] = config
+    return config
+
+
+def config_section(root, name):
+    section = load_config(root).get(name, {})
+    return section if isinstance(section, dict) else {}
@@ -0,0 +1,79 @@
+import json
+import os
+import socket
+
+from .model import user_cache_dir
+
+CLIENT_TIMEOUT = 2.0
+MAX_REQUEST_BYTES = 64 * 1024
+
+
+def default_socket_path():
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR')
+    if runtime_dir and os.path.isdir(runtime_dir):
+        return os.path.join(runtime_dir, 'ai-git-assistant.sock')
+    return os.path.join(user_cache_dir(), 'daemon.sock')
+
+
+def read_line(sock):
+    chunks = []
+    size = 0
+    while True:
+        chunk = sock.recv(4096)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        size += len(chunk)
+        if b'\n' in chunk or size > MAX_REQUEST_BYTES:
+            break
+    return b''.join(chunks).split(b'\n', 1)[0]
+
+
+def send_request(request, socket_path=None, timeout=CLIENT_TIMEOUT):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(socket_path or default_socket_path())
+        sock.sendall(json.dumps(request).encode('utf-8') + b'\n')
+        return json.loads(read_line(sock).decode('utf-8'))
+
+
+def make_server(handle_request, socket_path):
+    import socketserver
+
+    os.makedirs(os.path.dirname(socket_path), exist_ok=True)
+    try:
+        send_request({"op": "ping"}, socket_path, timeout=0.2)
+        raise RuntimeError(f"Ya hay un servidor escuchando en {socket_path}")
+    except (OSError, ValueError):
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+    class RequestHandler(socketserver.BaseRequestHandler):
+        def handle(self):
+            try:
+                request = json.loads(read_line(self.request).decode('utf-8'))
+                if request.get('op') == 'ping':
+                    response = {"ok": True, "pid": os.getpid()}
+                else:
+                    response = handle_request(request)
+            except Exception as e:
+                response = {"error": str(e)}
+            self.request.sendall(json.dumps(response, ensure_ascii=False).encode('utf-8') + b'\n')
+
+    class Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+
+    server = Server(socket_path, RequestHandler)
+    os.chmod(socket_path, 0o600)
+    return server
+
+
+def serve(handle_request, socket_path=None):
+    socket_path = socket_path or default_socket_path()
+    server = make_server(handle_request, socket_path)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
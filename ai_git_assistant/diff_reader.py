@@ -0,0 +1,133 @@
+import codecs
+import time
+
+from . import git_runner
+
+MAX_LINES_PER_FILE = 5000
+DEADLINE_CHECK_LINES = 4096
+
+
+class FileDiff:
+    __slots__ = ('path', 'old_path', 'added_lines', 'removed_lines', 'hunks',
+                 'added_count', 'removed_count', 'new_file', 'deleted', 'binary', 'quota', 'truncated')
+
+    def __init__(self, path, old_path=None):
+        self.path = path
+        self.old_path = old_path
+        self.added_lines = []
+        self.removed_lines = []
+        self.hunks = []
+        self.added_count = 0
+        self.removed_count = 0
+        self.new_file = False
+        self.deleted = False
+        self.binary = False
+        self.quota = None
+        self.truncated = False
+
+    def __repr__(self):
+        return f"FileDiff({self.path!r}, +{self.added_count}, -{self.removed_count})"
+
+
+def unquote_path(path):
+    if len(path) >= 2 and path[0] == '"' and path[-1] == '"':
+        raw = codecs.escape_decode(path[1:-1].encode('utf-8'))[0]
+        return raw.decode('utf-8', errors='replace')
+    return path
+
+
+def strip_prefix(path):
+    if path.endswith('\t'):
+        path = path[:-1]
+    path = unquote_path(path)
+    if path == '/dev/null':
+        return None
+    if path[:2] in ('a/', 'b/'):
+        return path[2:]
+    return path
+
+
+def parse_git_header(header):
+    rest = header[len('diff --git '):]
+    if rest.startswith('"'):
+        end = rest.index('"', 1)
+        return strip_prefix(rest[:end + 1]), strip_prefix(rest[end + 2:])
+    half = (len(rest) - 1) // 2
+    old, new = rest[:half], rest[half + 1:]
+    if old[2:] == new[2:]:
+        return old[2:], new[2:]
+    old, _, new = rest.partition(' b/')
+    return strip_prefix(old), new
+
+
+def keep_added_line(file_diff, max_lines):
+    if file_diff.quota is None:
+        return len(file_diff.added_lines) < max_lines
+    # Muestreo estratificado: una línea cada total/cuota, repartidas por todo el archivo
+    quota, total = file_diff.quota
+    index = file_diff.added_count
+    return len(file_diff.added_lines) < quota and index * quota // total > (index - 1) * quota // total
+
+
+def parse_diff_lines(lines, max_lines=MAX_LINES_PER_FILE, quotas=None, deadline=None):
+    current = None
+    in_hunk = False
+    checked = 0
+
+    for line in lines:
+        if deadline is not None:
+            checked += 1
+            if checked % DEADLINE_CHECK_LINES == 0 and time.monotonic() > deadline:
+                if current is not None:
+                    current.truncated = True
+                    yield current
+                return
+        line = line.rstrip('\n')
+        if line.startswith('diff --git '):
+            if current is not None:
+                yield current
+            old_path, new_path = parse_git_header(line)
+            current = FileDiff(new_path or old_path, old_path)
+            in_hunk = False
+        elif current is None:
+            continue
+        elif line.startswith('@@'):
+            if not in_hunk and quotas:
+                current.quota = quotas.get(current.path)
+            in_hunk = True
+            current.hunks.append(line)
+        elif in_hunk:
+            if line.startswith('+'):
+                current.added_count += 1
+                if keep_added_line(current, max_lines):
+                    current.added_lines.append(line[1:])
+            elif line.startswith('-'):
+                current.removed_count += 1
+                if len(current.removed_lines) < max_lines:
+                    current.removed_lines.append(line[1:])
+        elif line.startswith('--- '):
+            current.old_path = strip_prefix(line[4:])
+        elif line.startswith('+++ '):
+            new_path = strip_prefix(line[4:])
+            if new_path is not None:
+                current.path = new_path
+        elif line.startswith('new file mode'):
+            current.new_file = True
+        elif line.startswith('deleted file mode'):
+            current.deleted = True
+        elif line.startswith('rename from '):
+            current.old_path = unquote_path(line[len('rename from '):])
+        elif line.startswith('rename to '):
+            current.path = unquote_path(line[len('rename to '):])
+        elif line.startswith('Binary files '):
+            current.binary = True
+
+    if current is not None:
+        yield current
+
+
+def iter_staged_diff(root=None, paths=None, max_lines=MAX_LINES_PER_FILE, quotas=None, deadline=None):
+    args = ["git", "-c", "core.quotepath=off", "diff", "--cached", "--no-color", "--no-ext-diff"]
+    if paths:
+        args = ["git", "--literal-pathspecs"] + args[1:] + ["--"] + list(paths)
+    return parse_diff_lines(git_runner.iter_lines(args, root), max_lines, quotas, deadline)
@@ -0,0 +1,229 @@
+import os
+import tempfile
+import time
+from collections import Counter, deque
+
+from . import profiling
+from .classifier import get_classifier
+from .history import (HISTORY_FORMAT_VERSION, commit_type, hashed_matrix, iter_commit_files, iter_history_commits,
+                      load_history_state, save_history_state)
+from .model import HASHED_FEATURES, CompactModel, HashedModel, load_model
+from .taxonomy import get_taxonomy
+
+DEFAULT_FOLDS = 5
+DEFAULT_MAX_COMMITS = 5000
+MIN_COMMITS_PER_BLOCK = 2
+TFIDF_MAX_FEATURES = 1000
+EVALUATION_KEY = 'evaluation'
+
+
+def iter_corpus(root, types):
+    for (sha, timestamp, subject, text), (files_sha, files) in zip(iter_history_commits(root),
+                                                                    iter_commit_files(root)):
+        label = commit_type(subject, types)
+        if label is not None and text and sha == files_sha:
+            yield timestamp, label, text, files
+
+
+def load_corpus(root, types, max_commits=DEFAULT_MAX_COMMITS):
+    # git log --reverse va del más antiguo al más reciente: solo se retienen los últimos max_commits
+    corpus = deque(iter_corpus(root, types), maxlen=max_commits or None)
+    return sorted(corpus, key=lambda item: item[0])
+
+
+def time_split_folds(size, folds):
+    # Ventana creciente: cada fold entrena con todo lo anterior y prueba con el bloque siguiente
+    block = size // (folds + 1)
+    for fold in range(1, folds + 1):
+        test_end = size if fold == folds else block * (fold + 1)
+        yield range(0, block * fold), range(block * fold, test_end)
+
+
+def directory_size(directory):
+    return sum(entry.stat().st_size for entry in os.scandir(directory) if entry.is_file())
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+class BranchFileTypeFallback:
+    # El camino de generate_ml_based_message cuando el diff es demasiado corto para el modelo
+    name = 'fallback'
+    inputs = 'files'
+
+    def __init__(self, root, branch):
+        self.root = root
+        self.branch = branch
+
+    def fit(self, file_lists, labels):
+        return self
+
+    def predict(self, file_lists):
+        classifier = get_classifier(self.root)
+        taxonomy = get_taxonomy(self.root)
+        predictions = []
+        for files in file_lists:
+            file_types = Counter(classifier.file_type(os.path.join(self.root, path)) for path in files)
+            predominant = file_types.most_common(1)[0][0] if file_types else 'other'
+            predictions.append(taxonomy.fallback_type(self.branch, predominant))
+        return predictions
+
+    def save(self, directory):
+        return 0
+
+    def load(self, directory):
+        return self
+
+
+class TfidfNaiveBayes:
+    name = 'tfidf_nb'
+    inputs = 'texts'
+
+    def fit(self, texts, labels):
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from sklearn.naive_bayes import MultinomialNB
+        from sklearn.pipeline import Pipeline
+
+        pipeline = Pipeline([
+            ('tfidf', TfidfVectorizer(max_features=TFIDF_MAX_FEATURES)),
+            ('clf', MultinomialNB())
+        ])
+        pipeline.fit(texts, labels)
+        self.model = CompactModel.from_pipeline(pipeline)
+        return self
+
+    def predict(self, texts):
+        return self.model.predict(texts)
+
+    def save(self, directory):
+        self.model.save(directory, EVALUATION_KEY)
+        return directory_size(directory)
+
+    def load(self, directory):
+        return load_model(directory, EVALUATION_KEY)
+
+
+class TfidfLogisticRegression(TfidfNaiveBayes):
+    name = 'tfidf_logreg'
+
+    def fit(self, texts, labels):
+        import numpy as np
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from sklearn.linear_model import LogisticRegression
+
+        tfidf = TfidfVectorizer(max_features=TFIDF_MAX_FEATURES)
+        clf = LogisticRegression(max_iter=1000)
+        clf.fit(tfidf.fit_transform(texts), labels)
+        coef, intercept = clf.coef_, clf.intercept_
+        if len(clf.classes_) == 2:
+            coef, intercept = np.vstack([-coef, coef]) / 2, np.concatenate([-intercept, intercept]) / 2
+        # La función de decisión es lineal, así que se guarda en el mismo formato que el modelo NB
+        vocabulary = {token: int(index) for token, index in tfidf.vocabulary_.items()}
+        self.model = CompactModel(vocabulary, tfidf.idf_, coef, intercept, [str(c) for c in clf.classes_])
+        return self
+
+
+class HashedNaiveBayes:
+    name = 'hashed_nb'
+    inputs = 'texts'
+
+    def __init__(self, classes):
+        self.classes = classes
+
+    def fit(self, texts, labels):
+        from sklearn.naive_bayes import MultinomialNB
+
+        clf = MultinomialNB()
+        clf.partial_fit(hashed_matrix(texts), labels, classes=self.classes)
+        self.feature_count = clf.feature_count_
+        self.class_count = clf.class_count_
+        self.model = HashedModel(self.feature_count, self.class_count, self.classes)
+        return self
+
+    def predict(self, texts):
+        return self.model.predict(texts)
+
+    def save(self, directory):
+        meta = {'format_version': HISTORY_FORMAT_VERSION, 'classes': self.classes, 'n_features': HASHED_FEATURES}
+        save_history_state(directory, meta, self.feature_count, self.class_count)
+        return directory_size(directory)
+
+    def load(self, directory):
+        _, feature_count, class_count = load_history_state(directory, self.classes)
+        return HashedModel(feature_count, class_count, self.classes)
+
+
+def candidate_models(types, root, branch):
+    classes = sorted(types)
+    return [
+        lambda: TfidfNaiveBayes(),
+        lambda: BranchFileTypeFallback(root, branch),
+        lambda: TfidfLogisticRegression(),
+        lambda: HashedNaiveBayes(classes),
+    ]
+
+
+def classification_scores(expected, predicted, classes):
+    correct = sum(e == p for e, p in zip(expected, predicted))
+    per_class = {}
+    for label in classes:
+        tp = sum(e == label and p == label for e, p in zip(expected, predicted))
+        fp = sum(e != label and p == label for e, p in zip(expected, predicted))
+        fn = sum(e == label and p != label for e, p in zip(expected, predicted))
+        support = tp + fn
+        if support == 0 and fp == 0:
+            continue
+        f1 = 2 * tp / (2 * tp + fp + fn) if tp else 0.0
+        per_class[label] = {'f1': round(f1, 4), 'support': support}
+    macro = sum(c['f1'] for c in per_class.values()) / len(per_class) if per_class else 0.0
+    return {
+        'accuracy': round(correct / len(expected), 4) if expected else 0.0,
+        'macro_f1': round(macro, 4),
+        'per_class': per_class,
+    }
+
+
+@profiling.profiled('evaluate_models')
+def evaluate_models(corpus, types, root, branch, folds=DEFAULT_FOLDS):
+    if len(corpus) < (folds + 1) * MIN_COMMITS_PER_BLOCK:
+        return None
+
+    columns = {'texts': [text for _, _, text, _ in corpus], 'files': [files for _, _, _, files in corpus]}
+    labels = [label for _, label, _, _ in corpus]
+    # Un fold cuyo entrenamiento tiene un solo tipo no sirve para comparar clasificadores
+    splits = [(train, test) for train, test in time_split_folds(len(corpus), folds)
+              if len({labels[i] for i in train}) > 1]
+    if not splits:
+        return None
+    results = []
+    for factory in candidate_models(types, root, branch):
+        expected, predicted = [], []
+        predict_seconds = 0.0
+        model = None
+        for train, test in splits:
+            model = factory()
+            inputs = columns[model.inputs]
+            model.fit([inputs[i] for i in train], [labels[i] for i in train])
+            fold_predictions, seconds = timed(model.predict, [inputs[i] for i in test])
+            predict_seconds += seconds
+            expected += [labels[i] for i in test]
+            predicted += fold_predictions
+
+        with tempfile.TemporaryDirectory(prefix='ai-git-assistant-eval-') as tmp_dir:
+            directory = os.path.join(tmp_dir, model.name)
+            size = model.save(directory)
+            _, load_seconds = timed(model.load, directory)
+
+        result = {'model': model.name}
+        result.update(classification_scores(expected, predicted, sorted(types)))
+        result.update({
+            'size_bytes': size,
+            'load_ms': round(load_seconds * 1000, 3),
+            'predictions_per_second': round(len(expected) / predict_seconds) if predict_seconds else None,
+        })
+        results.append(result)
+    return {'commits': len(corpus), 'folds': len(splits), 'evaluated': sum(len(test) for _, test in splits),
+            'results': results}
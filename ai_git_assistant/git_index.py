@@ -0,0 +1,717 @@
+import hashlib
+import mmap
+import os
+import re
+import stat
+import struct
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+from . import profiling
+
+STAT_WORKERS = 8
+STAT_CHUNK_SIZE = 512
+OPTIONAL_EXTENSIONS = {b'TREE', b'REUC', b'UNTR', b'FSMN', b'EOIE', b'IEOT'}
+EMPTY_OID = '0' * 40
+OBJ_TYPES = {1: 'commit', 2: 'tree', 3: 'blob', 4: 'tag'}
+OFS_DELTA = 6
+REF_DELTA = 7
+# Errores de datos corruptos o inesperados al leer el índice u objetos
+CORRUPT_DATA_ERRORS = (zlib.error, ValueError, IndexError, struct.error)
+
+
+class UnsupportedIndex(Exception):
+    pass
+
+
+class IndexEntry:
+    __slots__ = ('path', 'ctime_s', 'ctime_ns', 'mtime_s', 'mtime_ns', 'dev', 'ino', 'mode', 'size', 'oid',
+                 'assume_unchanged')
+
+    def __init__(self, path, ctime_s, ctime_ns, mtime_s, mtime_ns, dev, ino, mode, size, oid,
+                 assume_unchanged=False):
+        self.path = path
+        self.ctime_s = ctime_s
+        self.ctime_ns = ctime_ns
+        self.mtime_s = mtime_s
+        self.mtime_ns = mtime_ns
+        self.dev = dev
+        self.ino = ino
+        self.mode = mode
+        self.size = size
+        self.oid = oid
+        self.assume_unchanged = assume_unchanged
+
+
+def read_varint_offset(data, pos):
+    byte = data[pos]
+    value = byte & 0x7f
+    pos += 1
+    while byte & 0x80:
+        byte = data[pos]
+        value = ((value + 1) << 7) | (byte & 0x7f)
+        pos += 1
+    return value, pos
+
+
+def find_nul(data, start):
+    end = data.find(b'\0', start)
+    if end == -1:
+        raise UnsupportedIndex("Entrada de índice truncada")
+    return end
+
+
+def parse_index(data):
+    if len(data) < 12 or data[:4] != b'DIRC':
+        raise UnsupportedIndex("Cabecera de índice desconocida")
+    version, count = struct.unpack('>II', data[4:12])
+    if version not in (2, 3, 4):
+        raise UnsupportedIndex(f"Versión de índice {version} no soportada")
+
+    entries = []
+    pos = 12
+    previous_path = b''
+    for _ in range(count):
+        (ctime_s, ctime_ns, mtime_s, mtime_ns, dev, ino, mode, _, _, size) = struct.unpack('>10I', data[pos:pos + 40])
+        oid = data[pos + 40:pos + 60].hex()
+        flags = struct.unpack('>H', data[pos + 60:pos + 62])[0]
+        header = 62
+        if flags & 0x4000:
+            if version < 3:
+                raise UnsupportedIndex("Flags extendidos en índice v2")
+            extended = struct.unpack('>H', data[pos + 62:pos + 64])[0]
+            if extended & 0x6000:
+                raise UnsupportedIndex("Entradas skip-worktree o intent-to-add")
+            header += 2
+        if flags & 0x3000:
+            raise UnsupportedIndex("Índice con conflictos sin resolver")
+        if stat.S_IFMT(mode) == 0o160000:
+            raise UnsupportedIndex("Submódulos no soportados")
+
+        if version == 4:
+            strip, name_start = read_varint_offset(data, pos + header)
+            name_end = find_nul(data, name_start)
+            path = previous_path[:len(previous_path) - strip] + bytes(data[name_start:name_end])
+            pos = name_end + 1
+        else:
+            name_start = pos + header
+            name_end = find_nul(data, name_start)
+            path = bytes(data[name_start:name_end])
+            pos += (header + len(path) + 8) & ~7
+        previous_path = path
+
+        # CE_VALID (assume-unchanged): git no compara estas entradas con el árbol de trabajo
+        entries.append(IndexEntry(path.decode('utf-8', errors='surrogateescape'),
+                                  ctime_s, ctime_ns, mtime_s, mtime_ns, dev, ino, mode, size, oid,
+                                  bool(flags & 0x8000)))
+
+    tree_cache = {}
+    end = len(data) - 20
+    while pos + 8 <= end:
+        signature = bytes(data[pos:pos + 4])
+        length = struct.unpack('>I', data[pos + 4:pos + 8])[0]
+        body = data[pos + 8:pos + 8 + length]
+        if signature == b'TREE':
+            parse_tree_extension(body, tree_cache)
+        elif signature not in OPTIONAL_EXTENSIONS and not (b'A' <= signature[:1] <= b'Z'):
+            raise UnsupportedIndex(f"Extensión de índice {signature!r} no soportada")
+        pos += 8 + length
+    return entries, tree_cache
+
+
+def parse_tree_extension(body, tree_cache):
+    def parse(pos, prefix):
+        name_end = body.index(b'\0', pos)
+        name = bytes(body[pos:name_end]).decode('utf-8', errors='surrogateescape')
+        line_end = body.index(b'\n', name_end)
+        entry_count, subtrees = bytes(body[name_end + 1:line_end]).split(b' ')
+        pos = line_end + 1
+        path = f"{prefix}{name}/" if name else prefix
+        if int(entry_count) >= 0:
+            tree_cache[path] = bytes(body[pos:pos + 20]).hex()
+            pos += 20
+        for _ in range(int(subtrees)):
+            pos = parse(pos, path)
+        return pos
+
+    if body:
+        parse(0, '')
+
+
+def apply_delta(base, delta):
+    def read_size(pos):
+        value = shift = 0
+        while True:
+            byte = delta[pos]
+            pos += 1
+            value |= (byte & 0x7f) << shift
+            shift += 7
+            if not byte & 0x80:
+                return value, pos
+
+    _, pos = read_size(0)
+    result_size, pos = read_size(pos)
+    out = bytearray()
+    while pos < len(delta):
+        opcode = delta[pos]
+        pos += 1
+        if opcode & 0x80:
+            offset = size = 0
+            for i in range(4):
+                if opcode & (1 << i):
+                    offset |= delta[pos] << (8 * i)
+                    pos += 1
+            for i in range(3):
+                if opcode & (1 << (4 + i)):
+                    size |= delta[pos] << (8 * i)
+                    pos += 1
+            out += base[offset:offset + (size or 0x10000)]
+        elif opcode:
+            out += delta[pos:pos + opcode]
+            pos += opcode
+        else:
+            raise UnsupportedIndex("Delta inválido")
+    if len(out) != result_size:
+        raise UnsupportedIndex("Delta con tamaño inesperado")
+    return bytes(out)
+
+
+class Pack:
+    def __init__(self, idx_path):
+        with open(idx_path, 'rb') as f:
+            self.idx = f.read()
+        if self.idx[:4] != b'\xfftOc' or struct.unpack('>I', self.idx[4:8])[0] != 2:
+            raise UnsupportedIndex("Índice de pack no soportado")
+        self.fanout = struct.unpack('>256I', self.idx[8:8 + 1024])
+        self.count = self.fanout[255]
+        self.names_offset = 8 + 1024
+        self.offsets_offset = self.names_offset + self.count * 20 + self.count * 4
+        self.large_offset = self.offsets_offset + self.count * 4
+        pack_file = open(idx_path[:-4] + '.pack', 'rb')
+        self.data = mmap.mmap(pack_file.fileno(), 0, access=mmap.ACCESS_READ)
+        pack_file.close()
+
+    def find(self, oid_bytes):
+        first = oid_bytes[0]
+        low = self.fanout[first - 1] if first else 0
+        high = self.fanout[first]
+        while low < high:
+            mid = (low + high) // 2
+            start = self.names_offset + mid * 20
+            name = self.idx[start:start + 20]
+            if name < oid_bytes:
+                low = mid + 1
+            elif name > oid_bytes:
+                high = mid
+            else:
+                offset = struct.unpack('>I', self.idx[self.offsets_offset + mid * 4:self.offsets_offset + mid * 4 + 4])[0]
+                if offset & 0x80000000:
+                    index = offset & 0x7fffffff
+                    offset = struct.unpack('>Q', self.idx[self.large_offset + index * 8:self.large_offset + index * 8 + 8])[0]
+                return offset
+        return None
+
+    def inflate(self, pos):
+        decompressor = zlib.decompressobj()
+        chunks = []
+        while not decompressor.eof:
+            chunk = self.data[pos:pos + 65536]
+            if not chunk:
+                break
+            chunks.append(decompressor.decompress(chunk))
+            pos += len(chunk)
+        return b''.join(chunks)
+
+    def read_at(self, offset, store):
+        byte = self.data[offset]
+        kind = (byte >> 4) & 7
+        pos = offset + 1
+        while byte & 0x80:
+            byte = self.data[pos]
+            pos += 1
+        if kind == OFS_DELTA:
+            byte = self.data[pos]
+            base_offset = byte & 0x7f
+            pos += 1
+            while byte & 0x80:
+                byte = self.data[pos]
+                pos += 1
+                base_offset = ((base_offset + 1) << 7) | (byte & 0x7f)
+            base_kind, base = self.read_at(offset - base_offset, store)
+            return base_kind, apply_delta(base, self.inflate(pos))
+        if kind == REF_DELTA:
+            base_kind, base = store.read(bytes(self.data[pos:pos + 20]).hex())
+            return base_kind, apply_delta(base, self.inflate(pos + 20))
+        if kind not in OBJ_TYPES:
+            raise UnsupportedIndex(f"Tipo de objeto {kind} desconocido en pack")
+        return OBJ_TYPES[kind], self.inflate(pos)
+
+
+class ObjectStore:
+    def __init__(self, git_dir):
+        self.objects_dir = os.path.join(git_dir, 'objects')
+        if os.path.exists(os.path.join(self.objects_dir, 'info', 'alternates')):
+            raise UnsupportedIndex("Repositorio con alternates")
+        self._packs = None
+
+    @property
+    def packs(self):
+        if self._packs is None:
+            pack_dir = os.path.join(self.objects_dir, 'pack')
+            try:
+                names = sorted(os.listdir(pack_dir))
+            except OSError:
+                names = []
+            self._packs = [Pack(os.path.join(pack_dir, name)) for name in names if name.endswith('.idx')]
+        return self._packs
+
+    def read(self, oid):
+        loose = os.path.join(self.objects_dir, oid[:2], oid[2:])
+        try:
+            with open(loose, 'rb') as f:
+                raw = zlib.decompress(f.read())
+        except FileNotFoundError:
+            oid_bytes = bytes.fromhex(oid)
+            for pack in self.packs:
+                offset = pack.find(oid_bytes)
+                if offset is not None:
+                    return pack.read_at(offset, self)
+            raise UnsupportedIndex(f"Objeto {oid} no encontrado")
+        header_end = raw.index(b'\0')
+        kind = raw[:header_end].split(b' ')[0].decode('ascii')
+        return kind, raw[header_end + 1:]
+
+    def read_tree(self, oid):
+        kind, body = self.read(oid)
+        if kind != 'tree':
+            raise UnsupportedIndex(f"{oid} no es un árbol")
+        entries = []
+        pos = 0
+        while pos < len(body):
+            space = body.index(b' ', pos)
+            nul = body.index(b'\0', space)
+            mode = int(body[pos:space], 8)
+            name = body[space + 1:nul].decode('utf-8', errors='surrogateescape')
+            entries.append((name, mode, body[nul + 1:nul + 21].hex()))
+            pos = nul + 21
+        return entries
+
+    def commit_tree(self, oid):
+        kind, body = self.read(oid)
+        if kind != 'commit' or not body.startswith(b'tree '):
+            raise UnsupportedIndex(f"{oid} no es un commit")
+        return body[5:45].decode('ascii')
+
+
+def read_git_config(paths):
+    config = {}
+    section = ''
+    for path in paths:
+        try:
+            with open(path, encoding='utf-8', errors='replace') as f:
+                lines = f.readlines()
+        except OSError:
+            continue
+        for line in lines:
+            line = line.strip()
+            if not line or line[0] in '#;':
+                continue
+            if line.startswith('['):
+                section = line[1:line.index(']')].split(' ')[0].lower()
+                continue
+            key, _, value = line.partition('=')
+            config[f"{section}.{key.strip().lower()}"] = value.split(' #')[0].split(' ;')[0].strip().strip('"')
+    return config
+
+
+def config_true(config, key):
+    return config.get(key, 'false').lower() in ('true', 'yes', 'on', '1', '')
+
+
+def glob_to_regex(pattern):
+    regex = []
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == '*':
+            if pattern[i:i + 3] == '**/':
+                regex.append('(?:.*/)?')
+                i += 3
+                continue
+            if pattern[i:i + 2] == '**':
+                regex.append('.*')
+                i += 2
+                continue
+            regex.append('[^/]*')
+        elif char == '?':
+            regex.append('[^/]')
+        elif char == '[':
+            end = pattern.find(']', i + 2 if pattern[i + 1:i + 2] in ('!', ']') else i + 1)
+            if end == -1:
+                regex.append(re.escape(char))
+            else:
+                body = pattern[i + 1:end]
+                if body.startswith('!'):
+                    body = '^' + body[1:]
+                regex.append(f"[{body.replace(chr(92), chr(92) * 2)}]")
+                i = end
+        elif char == '\\' and i + 1 < len(pattern):
+            i += 1
+            regex.append(re.escape(pattern[i]))
+        else:
+            regex.append(re.escape(char))
+        i += 1
+    return ''.join(regex)
+
+
+def parse_ignore_lines(lines, base):
+    rules = []
+    for line in lines:
+        line = line.rstrip('\n').rstrip('\r')
+        if not line or line.startswith('#'):
+            continue
+        while line.endswith(' ') and not line.endswith('\\ '):
+            line = line[:-1]
+        negate = line.startswith('!')
+        if negate:
+            line = line[1:]
+        elif line.startswith('\\!') or line.startswith('\\#'):
+            line = line[1:]
+        dir_only = line.endswith('/')
+        line = line.rstrip('/')
+        if not line:
+            continue
+        anchored = '/' in line
+        line = line.lstrip('/')
+        if anchored:
+            regex = re.compile(re.escape(base) + glob_to_regex(line) + r'\Z', re.DOTALL)
+            rules.append((regex, negate, dir_only, False))
+        else:
+            regex = re.compile(glob_to_regex(line) + r'\Z', re.DOTALL)
+            rules.append((regex, negate, dir_only, True))
+    return rules
+
+
+def read_ignore_file(path, base):
+    try:
+        with open(path, encoding='utf-8', errors='surrogateescape') as f:
+            return parse_ignore_lines(f.readlines(), base)
+    except OSError:
+        return []
+
+
+def is_ignored(rules, path, name, is_dir):
+    for regex, negate, dir_only, basename_only in reversed(rules):
+        if dir_only and not is_dir:
+            continue
+        if regex.match(name if basename_only else path):
+            return not negate
+    return False
+
+
+def blob_oid(path, mode):
+    if stat.S_ISLNK(mode):
+        data = os.fsencode(os.readlink(path))
+    else:
+        with open(path, 'rb') as f:
+            data = f.read()
+    digest = hashlib.sha1(b'blob %d\0' % len(data))
+    digest.update(data)
+    return digest.hexdigest()
+
+
+class IndexStatusReader:
+    def __init__(self, root):
+        self.root = str(root)
+        self.git_dir = os.path.join(self.root, '.git')
+        if not os.path.isdir(self.git_dir):
+            raise UnsupportedIndex("Worktrees enlazados no soportados")
+
+        home = os.path.expanduser('~')
+        xdg_config = os.environ.get('XDG_CONFIG_HOME') or os.path.join(home, '.config')
+        if any(key.startswith('GIT_CONFIG') or key in ('GIT_DIR', 'GIT_INDEX_FILE', 'GIT_WORK_TREE')
+               for key in os.environ):
+            raise UnsupportedIndex("Configuración de git por variables de entorno")
+        self.config = read_git_config([
+            '/etc/gitconfig',
+            os.path.join(xdg_config, 'git', 'config'),
+            os.path.join(home, '.gitconfig'),
+            os.path.join(self.git_dir, 'config'),
+        ])
+        for key in ('core.sparsecheckout', 'index.sparse', 'core.splitindex', 'core.ignorecase',
+                    'core.fsmonitor', 'core.precomposeunicode'):
+            if key in self.config and config_true(self.config, key):
+                raise UnsupportedIndex(f"{key} no soportado")
+        if self.config.get('core.autocrlf', 'false').lower() not in ('false', 'no', 'off', '0'):
+            raise UnsupportedIndex("core.autocrlf no soportado")
+        if any(key.startswith('include') or key.startswith('extensions.') for key in self.config):
+            raise UnsupportedIndex("Configuración con include o extensiones")
+        if os.path.exists(os.path.join(self.git_dir, 'info', 'attributes')):
+            raise UnsupportedIndex("info/attributes no soportado")
+        self.trust_filemode = config_true(self.config, 'core.filemode') if 'core.filemode' in self.config else True
+        self.trust_ctime = config_true(self.config, 'core.trustctime') if 'core.trustctime' in self.config else True
+        self.excludes_file = os.path.expanduser(
+            self.config.get('core.excludesfile') or os.path.join(xdg_config, 'git', 'ignore'))
+
+    def read(self, untracked='all'):
+        from .status import RepoStatus, StatusEntry
+
+        index_path = os.path.join(self.git_dir, 'index')
+        try:
+            index_stat = os.stat(index_path)
+            with open(index_path, 'rb') as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    entries, tree_cache = parse_index(data)
+        except FileNotFoundError:
+            index_stat = None
+            entries, tree_cache = [], {}
+        except CORRUPT_DATA_ERRORS as e:
+            raise UnsupportedIndex(f"Índice ilegible: {e}")
+
+        if any(e.path == '.gitattributes' or e.path.endswith('/.gitattributes') for e in entries):
+            raise UnsupportedIndex(".gitattributes no soportado")
+
+        with profiling.span('index_status'):
+            try:
+                head_changes = self.compare_head(entries, tree_cache)
+            except CORRUPT_DATA_ERRORS as e:
+                raise UnsupportedIndex(f"Objeto ilegible: {e}")
+            worktree = self.compare_worktree(entries, index_stat)
+            untracked_paths = self.find_untracked(entries, untracked) if untracked != 'no' else []
+
+        by_path = {e.path: e for e in entries}
+        status_entries = []
+        for path in sorted(set(head_changes) | set(worktree)):
+            head_code, head_mode, head_oid = head_changes.get(path, ('.', None, None))
+            work_code, work_mode = worktree.get(path, ('.', None))
+            entry = by_path.get(path)
+            index_mode = f"{entry.mode:06o}" if entry else '000000'
+            index_oid = entry.oid if entry else EMPTY_OID
+            if head_mode is None:
+                head_mode, head_oid = index_mode, index_oid
+            if work_mode is None:
+                work_mode = index_mode
+            status_entries.append(StatusEntry(path, head_code + work_code, head_mode, index_mode, work_mode,
+                                              head_oid, index_oid, None))
+
+        status_entries = self.detect_renames(status_entries)
+        return RepoStatus(self.root, status_entries, untracked_paths)
+
+    def detect_renames(self, status_entries):
+        from .status import StatusEntry
+
+        deleted = {}
+        for entry in status_entries:
+            if entry.xy == 'D.':
+                deleted.setdefault(entry.oid_head, []).append(entry)
+        if not deleted:
+            return status_entries
+
+        renamed_from = set()
+        unpaired_added = False
+        result = []
+        for entry in status_entries:
+            if entry.xy[0] == 'A':
+                if deleted.get(entry.oid_index):
+                    source = deleted[entry.oid_index].pop(0)
+                    renamed_from.add(source.path)
+                    entry = StatusEntry(entry.path, 'R' + entry.xy[1], source.mode_head, entry.mode_index,
+                                        entry.mode_worktree, source.oid_head, entry.oid_index, source.path)
+                else:
+                    unpaired_added = True
+            result.append(entry)
+        # Solo se emparejan blobs idénticos; git también detecta renombres con cambios por similitud
+        if unpaired_added and any(deleted.values()):
+            raise UnsupportedIndex("Posible renombre con cambios")
+        return [e for e in result if e.path not in renamed_from]
+
+    def resolve_head(self):
+        try:
+            with open(os.path.join(self.git_dir, 'HEAD'), encoding='utf-8') as f:
+                head = f.read().strip()
+        except OSError:
+            return None
+        if not head.startswith('ref: '):
+            return head
+        ref = head[5:]
+        try:
+            with open(os.path.join(self.git_dir, ref), encoding='utf-8') as f:
+                return f.read().strip()
+        except OSError:
+            pass
+        try:
+            with open(os.path.join(self.git_dir, 'packed-refs'), encoding='utf-8') as f:
+                for line in f:
+                    parts = line.split()
+                    if len(parts) == 2 and parts[1] == ref:
+                        return parts[0]
+        except OSError:
+            pass
+        return None
+
+    def compare_head(self, entries, tree_cache):
+        head = self.resolve_head()
+        index_map = {e.path: e for e in entries}
+        changes = {}
+        if head is None:
+            for e in entries:
+                changes[e.path] = ('A', '000000', EMPTY_OID)
+            return changes
+
+        store = ObjectStore(self.git_dir)
+        root_tree = store.commit_tree(head)
+        head_paths = set()
+        skipped = set()
+
+        def walk(tree_oid, prefix):
+            if tree_cache.get(prefix) == tree_oid:
+                skipped.add(prefix)
+                return
+            for name, mode, oid in store.read_tree(tree_oid):
+                path = prefix + name
+                if stat.S_IFMT(mode) == stat.S_IFDIR:
+                    walk(oid, path + '/')
+                    continue
+                head_paths.add(path)
+                entry = index_map.get(path)
+                if entry is None:
+                    changes[path] = ('D', f"{mode:06o}", oid)
+                elif entry.oid != oid or entry.mode != mode:
+                    changes[path] = ('M', f"{mode:06o}", oid)
+
+        walk(root_tree, '')
+        if '' in skipped:
+            return changes
+
+        for path in index_map:
+            if path in head_paths:
+                continue
+            parts = path.split('/')[:-1]
+            prefixes = ('/'.join(parts[:i]) + '/' for i in range(1, len(parts) + 1))
+            if not any(prefix in skipped for prefix in prefixes):
+                changes[path] = ('A', '000000', EMPTY_OID)
+        return changes
+
+    def compare_worktree(self, entries, index_stat):
+        racy_limit = (index_stat.st_mtime_ns if index_stat else 0)
+        root = self.root
+
+        def check(chunk):
+            results = []
+            for entry in chunk:
+                if entry.assume_unchanged:
+                    continue
+                full_path = os.path.join(root, entry.path)
+                try:
+                    st = os.lstat(full_path)
+                except OSError:
+                    results.append((entry.path, ('D', '000000')))
+                    continue
+                profiling.count('stat_calls')
+
+                if stat.S_ISLNK(st.st_mode):
+                    work_mode = 0o120000
+                elif stat.S_ISREG(st.st_mode):
+                    executable = st.st_mode & 0o100 if self.trust_filemode else entry.mode & 0o100
+                    work_mode = 0o100755 if executable else 0o100644
+                else:
+                    # Un directorio (u otro tipo) en lugar del archivo: git lo reporta como borrado
+                    results.append((entry.path, ('D', '000000')))
+                    continue
+
+                if work_mode != entry.mode:
+                    results.append((entry.path, ('M', f"{work_mode:06o}")))
+                    continue
+
+                mtime_ns = st.st_mtime_ns
+                same_stat = (st.st_size & 0xffffffff == entry.size
+                             and st.st_ino & 0xffffffff == entry.ino
+                             and mtime_ns // 1_000_000_000 == entry.mtime_s
+                             and mtime_ns % 1_000_000_000 == entry.mtime_ns)
+                if self.trust_ctime:
+                    same_stat = (same_stat and st.st_ctime_ns // 1_000_000_000 == entry.ctime_s
+                                 and st.st_ctime_ns % 1_000_000_000 == entry.ctime_ns)
+                if same_stat and mtime_ns < racy_limit:
+                    continue
+                if st.st_size & 0xffffffff != entry.size and not stat.S_ISLNK(st.st_mode):
+                    results.append((entry.path, ('M', f"{work_mode:06o}")))
+                    continue
+                if blob_oid(full_path, st.st_mode) != entry.oid:
+                    results.append((entry.path, ('M', f"{work_mode:06o}")))
+            return results
+
+        chunks = [entries[i:i + STAT_CHUNK_SIZE] for i in range(0, len(entries), STAT_CHUNK_SIZE)]
+        changes = {}
+        with ThreadPoolExecutor(max_workers=STAT_WORKERS) as executor:
+            for results in executor.map(check, chunks):
+                changes.update(results)
+        return changes
+
+    def find_untracked(self, entries, mode):
+        tracked = {e.path for e in entries}
+        tracked_dirs = {''}
+        for path in tracked:
+            parts = path.split('/')
+            for i in range(1, len(parts)):
+                tracked_dirs.add('/'.join(parts[:i]) + '/')
+
+        base_rules = (read_ignore_file(self.excludes_file, '')
+                      + read_ignore_file(os.path.join(self.git_dir, 'info', 'exclude'), ''))
+
+        def scan(prefix, inherited_rules):
+            directory = os.path.join(self.root, prefix)
+            rules = inherited_rules + read_ignore_file(os.path.join(directory, '.gitignore'), prefix)
+            files = []
+            subdirs = []
+            try:
+                with os.scandir(directory) as it:
+                    items = list(it)
+            except OSError:
+                return files, subdirs
+            for item in items:
+                if prefix == '' and item.name == '.git':
+                    continue
+                path = prefix + item.name
+                is_dir = item.is_dir(follow_symlinks=False)
+                if is_dir:
+                    dir_path = path + '/'
+                    if dir_path not in tracked_dirs and is_ignored(rules, path, item.name, True):
+                        continue
+                    if dir_path not in tracked_dirs and os.path.exists(os.path.join(item.path, '.git')):
+                        files.append(dir_path)
+                        continue
+                    subdirs.append((dir_path, rules))
+                elif path not in tracked and not is_ignored(rules, path, item.name, False):
+                    files.append(path)
+            return files, subdirs
+
+        untracked = []
+        with ThreadPoolExecutor(max_workers=STAT_WORKERS) as executor:
+            pending = [executor.submit(scan, '', base_rules)]
+            while pending:
+                files, subdirs = pending.pop().result()
+                untracked.extend(files)
+                pending.extend(executor.submit(scan, dir_path, rules) for dir_path, rules in subdirs)
+
+        untracked.sort()
+        if mode == 'normal':
+            untracked = self.collapse_untracked_dirs(untracked, tracked_dirs, tracked)
+        return untracked
+
+    @staticmethod
+    def collapse_untracked_dirs(paths, tracked_dirs, tracked=()):
+        collapsed = []
+        for path in paths:
+            parts = path.rstrip('/').split('/')
+            entry = path
+            for i in range(1, len(parts)):
+                prefix = '/'.join(parts[:i]) + '/'
+                if prefix not in tracked_dirs:
+                    entry = prefix
+                    break
+            # git no lista un directorio que ocupa la ruta de un archivo rastreado
+            if entry.endswith('/') and entry[:-1] in tracked:
+                continue
+            if not collapsed or collapsed[-1] != entry:
+                collapsed.append(entry)
+        return collapsed
@@ -0,0 +1,233 @@
+import codecs
+import io
+import os
+import queue
+import subprocess
+import threading
+from collections import namedtuple
+
+from . import profiling
+
+CONCURRENCY_ENV = 'AI_GIT_ASSISTANT_GIT_JOBS'
+DEFAULT_CONCURRENCY = min(8, os.cpu_count() or 1)
+STREAM_CHUNK_SIZE = 64 * 1024
+STREAM_QUEUE_SIZE = 16
+
+GitResult = namedtuple('GitResult', ['args', 'returncode', 'stdout', 'stderr'])
+
+_END = object()
+
+
+class GitRunner:
+    def __init__(self, max_concurrency=None):
+        if max_concurrency is None:
+            max_concurrency = int(os.environ.get(CONCURRENCY_ENV) or DEFAULT_CONCURRENCY)
+        self.max_concurrency = max(1, max_concurrency)
+        self._loop = None
+        self._thread = None
+        self._semaphore = None
+        self._start_lock = threading.Lock()
+
+    @property
+    def loop(self):
+        import asyncio
+
+        if self._loop is None:
+            with self._start_lock:
+                if self._loop is None:
+                    loop = asyncio.new_event_loop()
+                    self._thread = threading.Thread(
+                        target=loop.run_forever, name='ai-git-assistant-git', daemon=True)
+                    self._thread.start()
+                    self._loop = loop
+        return self._loop
+
+    def semaphore(self):
+        import asyncio
+
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    def submit(self, coro):
+        import asyncio
+
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def call(self, coro):
+        if threading.current_thread() is self._thread:
+            raise RuntimeError("No se puede bloquear el hilo del GitRunner")
+        return self.submit(coro).result()
+
+    async def run_async(self, args, cwd=None, input=None, text=True, capture_output=True):
+        import asyncio
+
+        stream = subprocess.PIPE if capture_output else None
+        async with self.semaphore():
+            with profiling.subprocess_span(args) as span:
+                process = await asyncio.create_subprocess_exec(
+                    *args, cwd=cwd, stdout=stream, stderr=stream,
+                    stdin=subprocess.PIPE if input is not None else subprocess.DEVNULL)
+                if input is not None and text:
+                    input = input.encode('utf-8')
+                stdout, stderr = await process.communicate(input)
+                span.add_bytes(stdout)
+        if text:
+            stdout = stdout.decode('utf-8', errors='replace') if stdout is not None else ''
+            stderr = stderr.decode('utf-8', errors='replace') if stderr is not None else ''
+        return GitResult(args, process.returncode, stdout, stderr)
+
+    async def gather_async(self, *coros):
+        import asyncio
+
+        return await asyncio.gather(*coros)
+
+    def run(self, args, cwd=None, input=None, text=True, capture_output=True):
+        return self.call(self.run_async(args, cwd, input, text, capture_output))
+
+    def gather(self, *coros):
+        return self.call(self.gather_async(*coros))
+
+    async def _feed(self, process, input):
+        try:
+            process.stdin.write(input)
+            await process.stdin.drain()
+            process.stdin.close()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    async def _pump(self, args, cwd, chunks, input=None):
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        with profiling.subprocess_span(args) as span:
+            # El hueco del semáforo solo cubre el arranque: un stream puede quedar
+            # abierto mientras quien lo consume lanza otros comandos git
+            async with self.semaphore():
+                process = await asyncio.create_subprocess_exec(
+                    *args, cwd=cwd, stdin=subprocess.PIPE if input is not None else subprocess.DEVNULL,
+                    stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+            # La entrada se escribe en paralelo para que git no se bloquee con la salida llena
+            feeder = loop.create_task(self._feed(process, input)) if input is not None else None
+            try:
+                while True:
+                    chunk = await process.stdout.read(STREAM_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    span.add_bytes(chunk)
+                    await loop.run_in_executor(None, chunks.put, chunk)
+                await process.wait()
+            finally:
+                if process.returncode is None:
+                    process.kill()
+                    await process.wait()
+                if feeder is not None:
+                    feeder.cancel()
+                try:
+                    chunks.put_nowait(_END)
+                except queue.Full:
+                    pass
+
+    def iter_chunks(self, args, cwd=None, input=None):
+        chunks = queue.Queue(maxsize=STREAM_QUEUE_SIZE)
+        future = self.submit(self._pump(args, cwd, chunks, input))
+        try:
+            while True:
+                try:
+                    chunk = chunks.get(timeout=0.1)
+                except queue.Empty:
+                    if future.done():
+                        future.result()
+                        return
+                    continue
+                if chunk is _END:
+                    future.result()
+                    return
+                yield chunk
+        finally:
+            if not future.done():
+                future.cancel()
+                while True:
+                    try:
+                        chunks.get_nowait()
+                    except queue.Empty:
+                        break
+
+    def iter_lines(self, args, cwd=None):
+        decoder = io.IncrementalNewlineDecoder(
+            codecs.getincrementaldecoder('utf-8')(errors='replace'), translate=True)
+        pending = ''
+        for chunk in self.iter_chunks(args, cwd):
+            pending += decoder.decode(chunk)
+            lines = pending.split('\n')
+            pending = lines.pop()
+            for line in lines:
+                yield line + '\n'
+        pending += decoder.decode(b'', final=True)
+        if pending:
+            yield pending
+
+    def iter_records(self, args, cwd=None, separator=b'\0'):
+        pending = b''
+        for chunk in self.iter_chunks(args, cwd):
+            records = (pending + chunk).split(separator)
+            pending = records.pop()
+            for record in records:
+                yield record.decode('utf-8', errors='surrogateescape')
+        if pending:
+            yield pending.decode('utf-8', errors='surrogateescape')
+
+
+_runner = None
+_runner_lock = threading.Lock()
+
+
+def get_runner():
+    global _runner
+    if _runner is None:
+        with _runner_lock:
+            if _runner is None:
+                _runner = GitRunner()
+    return _runner
+
+
+def set_concurrency(max_concurrency):
+    global _runner
+    os.environ[CONCURRENCY_ENV] = str(max_concurrency)
+    with _runner_lock:
+        _runner = GitRunner(max_concurrency)
+    return _runner
+
+
+def _reset_after_fork():
+    global _runner, _runner_lock
+    _runner = None
+    _runner_lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def run(args, cwd=None, input=None, text=True, capture_output=True):
+    return get_runner().run(args, cwd, input, text, capture_output)
+
+
+def submit(coro):
+    return get_runner().submit(coro)
+
+
+def gather(*coros):
+    return get_runner().gather(*coros)
+
+
+def iter_chunks(args, cwd=None, input=None):
+    return get_runner().iter_chunks(args, cwd, input)
+
+
+def iter_lines(args, cwd=None):
+    return get_runner().iter_lines(args, cwd)
+
+
+def iter_records(args, cwd=None, separator=b'\0'):
+    return get_runner().iter_records(args, cwd, separator)
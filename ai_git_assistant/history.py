@@ -0,0 +1,195 @@
+import hashlib
+import json
+import os
+import re
+
+from . import git_runner
+from .model import HASHED_FEATURES, HashedModel, ModelFormatError, hash_token_counts, user_cache_dir
+
+HISTORY_FORMAT_VERSION = 1
+HISTORY_BATCH_SIZE = 512
+MAX_LINES_PER_COMMIT = 2000
+CONVENTIONAL_RE = re.compile(r'^(\w+)(?:\([^)]*\))?!?:\s*\S')
+COMMIT_MARKER = '\x1e'
+FIELD_SEPARATOR = '\x1f'
+
+
+def repo_cache_dir(root):
+    digest = hashlib.sha256(os.path.realpath(str(root)).encode('utf-8')).hexdigest()[:16]
+    return os.path.join(user_cache_dir(), 'repos', digest)
+
+
+def history_model_dir(root):
+    return os.path.join(repo_cache_dir(root), 'history')
+
+
+def commit_type(subject, types):
+    match = CONVENTIONAL_RE.match(subject)
+    if match and match.group(1).lower() in types:
+        return match.group(1).lower()
+    return None
+
+
+def iter_history_commits(root, revision_range='HEAD', max_lines=MAX_LINES_PER_COMMIT):
+    args = ["git", "log", "--no-merges", "--reverse", "--no-color", "--no-ext-diff", "-p", "--unified=0",
+            f"--format={COMMIT_MARKER}%H{FIELD_SEPARATOR}%ct{FIELD_SEPARATOR}%s", revision_range, "--"]
+    current = None
+    for line in git_runner.iter_lines(args, root):
+        if line.startswith(COMMIT_MARKER):
+            if current is not None:
+                yield current[0], current[1], current[2], ' '.join(current[3])
+            sha, timestamp, subject = line[1:].rstrip('\n').split(FIELD_SEPARATOR, 2)
+            current = (sha, int(timestamp), subject, [])
+        elif current is not None and line.startswith('+') and not line.startswith('+++'):
+            if len(current[3]) < max_lines:
+                current[3].append(line[1:].strip())
+    if current is not None:
+        yield current[0], current[1], current[2], ' '.join(current[3])
+
+
+def iter_commit_files(root, revision_range='HEAD'):
+    # Mismo orden que iter_history_commits: sirve para recorrer ambos en paralelo
+    args = ["git", "-c", "core.quotepath=off", "log", "--no-merges", "--reverse", "--name-only",
+            f"--format={COMMIT_MARKER}%H", revision_range, "--"]
+    current = None
+    for line in git_runner.iter_lines(args, root):
+        if line.startswith(COMMIT_MARKER):
+            if current is not None:
+                yield current
+            current = (line[1:].strip(), [])
+        elif current is not None and line.strip():
+            current[1].append(line.rstrip('\n'))
+    if current is not None:
+        yield current
+
+
+def iter_labelled_commits(root, types, revision_range='HEAD'):
+    for sha, timestamp, subject, text in iter_history_commits(root, revision_range):
+        label = commit_type(subject, types)
+        if label is not None and text:
+            yield sha, timestamp, label, text
+
+
+def hashed_matrix(texts, n_features=HASHED_FEATURES):
+    import numpy as np
+    from scipy.sparse import csr_matrix
+
+    indptr = [0]
+    indices = []
+    data = []
+    for text in texts:
+        counts = hash_token_counts(text, n_features)
+        indices.extend(counts.keys())
+        data.extend(counts.values())
+        indptr.append(len(indices))
+    return csr_matrix((np.array(data, dtype=np.float64), np.array(indices, dtype=np.int64), indptr),
+                      shape=(len(texts), n_features))
+
+
+def load_history_state(directory, classes):
+    import numpy as np
+
+    with open(os.path.join(directory, 'meta.json'), encoding='utf-8') as f:
+        meta = json.load(f)
+    if (meta.get('format_version') != HISTORY_FORMAT_VERSION
+            or meta.get('classes') != classes
+            or meta.get('n_features') != HASHED_FEATURES):
+        raise ModelFormatError(f"Modelo de historial obsoleto en {directory}")
+
+    feature_count = np.load(os.path.join(directory, 'feature_count.npy'))
+    class_count = np.load(os.path.join(directory, 'class_count.npy'))
+    return meta, feature_count, class_count
+
+
+def save_history_state(directory, meta, feature_count, class_count):
+    import numpy as np
+
+    os.makedirs(directory, exist_ok=True)
+    np.save(os.path.join(directory, 'feature_count.npy'), feature_count)
+    np.save(os.path.join(directory, 'class_count.npy'), class_count)
+    tmp_path = os.path.join(directory, 'meta.json.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(meta, f)
+    os.replace(tmp_path, os.path.join(directory, 'meta.json'))
+
+
+def is_ancestor(root, commit, head):
+    args = ["git", "merge-base", "--is-ancestor", commit, head]
+    return git_runner.run(args, root).returncode == 0
+
+
+def train_from_history(root, types, batch_size=HISTORY_BATCH_SIZE):
+    import numpy as np
+    from sklearn.naive_bayes import MultinomialNB
+
+    args = ["git", "rev-parse", "--verify", "-q", "HEAD"]
+    head = git_runner.run(args, root).stdout.strip()
+    if not head:
+        return None, 0
+
+    classes = sorted(types)
+    directory = history_model_dir(root)
+    feature_count = np.zeros((len(classes), HASHED_FEATURES))
+    class_count = np.zeros(len(classes))
+    meta = {'format_version': HISTORY_FORMAT_VERSION, 'classes': classes,
+            'n_features': HASHED_FEATURES, 'last_commit': None, 'commits_trained': 0}
+
+    try:
+        meta, feature_count, class_count = load_history_state(directory, classes)
+    except (OSError, ValueError, KeyError, ModelFormatError):
+        pass
+
+    last_commit = meta.get('last_commit')
+    if last_commit and not is_ancestor(root, last_commit, head):
+        feature_count[:] = 0
+        class_count[:] = 0
+        meta['commits_trained'] = 0
+        last_commit = None
+    revision_range = f"{last_commit}..{head}" if last_commit else head
+
+    clf = MultinomialNB()
+    trained = 0
+    texts, labels = [], []
+    for _, _, label, text in iter_labelled_commits(root, types, revision_range):
+        texts.append(text)
+        labels.append(label)
+        if len(texts) >= batch_size:
+            clf.partial_fit(hashed_matrix(texts), labels, classes=classes)
+            trained += len(texts)
+            texts, labels = [], []
+    if texts:
+        clf.partial_fit(hashed_matrix(texts), labels, classes=classes)
+        trained += len(texts)
+
+    if trained:
+        feature_count += clf.feature_count_
+        class_count += clf.class_count_
+
+    meta['last_commit'] = head
+    meta['commits_trained'] = meta.get('commits_trained', 0) + trained
+    save_history_state(directory, meta, feature_count, class_count)
+    return meta, trained
+
+
+def history_model_identity(root, types):
+    try:
+        with open(os.path.join(history_model_dir(root), 'meta.json'), encoding='utf-8') as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if meta.get('classes') != sorted(types) or not meta.get('commits_trained'):
+        return None
+    return f"history-{meta.get('last_commit')}-{meta['commits_trained']}"
+
+
+def load_history_model(root, types):
+    directory = history_model_dir(root)
+    if not os.path.isdir(directory):
+        return None
+    try:
+        meta, feature_count, class_count = load_history_state(directory, sorted(types))
+    except (OSError, ValueError, KeyError, ModelFormatError):
+        return None
+    if not meta.get('commits_trained'):
+        return None
+    return HashedModel(feature_count, class_count, meta['classes'])
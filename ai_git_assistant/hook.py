@@ -0,0 +1,58 @@
+import os
+import sys
+
+from .daemon import send_request
+
+SKIP_SOURCES = {'message', 'template', 'merge', 'squash', 'commit'}
+
+
+def uses_default_index(repo):
+    index_file = os.environ.get('GIT_INDEX_FILE')
+    if not index_file:
+        return True
+    git_dir = os.environ.get('GIT_DIR') or os.path.join(repo, '.git')
+    return os.path.abspath(index_file) == os.path.abspath(os.path.join(git_dir, 'index'))
+
+
+def request_message(repo):
+    if uses_default_index(repo):
+        try:
+            response = send_request({"op": "suggest", "repo": repo})
+            if "error" not in response:
+                return response.get("message")
+        except (OSError, ValueError):
+            pass
+
+    # Sin daemon solo hace falta la sugerencia: nada de escaneo ni plantilla de PR
+    from .__main__ import TYPES, find_git_root, load_history_model, suggest_for_repo
+    git_root = find_git_root(repo)
+    if not git_root:
+        return None
+    git_root = str(git_root)
+    _, _, _, suggestions, _ = suggest_for_repo(git_root, load_history_model(git_root, TYPES))
+    return suggestions[0][0] if suggestions else None
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        print("Uso: ai-git-assistant-hook <archivo-del-mensaje> [origen] [sha]", file=sys.stderr)
+        return 1
+    message_file = argv[0]
+    source = argv[1] if len(argv) > 1 else ''
+    if source in SKIP_SOURCES:
+        return 0
+
+    message = request_message(os.getcwd())
+    if not message:
+        return 0
+
+    with open(message_file, encoding='utf-8') as f:
+        current = f.read()
+    with open(message_file, 'w', encoding='utf-8') as f:
+        f.write(message + "\n" + current)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,201 @@
+import abc
+import hashlib
+import json
+import os
+import re
+import shutil
+import sys
+import tempfile
+import zlib
+
+MODEL_FORMAT_VERSION = 1
+TOKEN_PATTERN = re.compile(r"(?u)\b\w\w+\b")
+HASHED_FEATURES = 2 ** 16
+
+
+class ModelFormatError(Exception):
+    pass
+
+
+def user_cache_dir():
+    if sys.platform == 'darwin':
+        base = os.path.expanduser('~/Library/Caches')
+    elif os.name == 'nt':
+        base = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~\\AppData\\Local')
+    else:
+        base = os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache')
+    return os.path.join(base, 'ai-git-assistant')
+
+
+def model_key(types):
+    payload = json.dumps({'version': MODEL_FORMAT_VERSION, 'types': types}, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def model_dir(types):
+    return os.path.join(user_cache_dir(), 'models', f'v{MODEL_FORMAT_VERSION}-{model_key(types)}')
+
+
+def hash_token_counts(text, n_features=HASHED_FEATURES):
+    counts = {}
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        index = zlib.crc32(token.encode('utf-8')) % n_features
+        counts[index] = counts.get(index, 0) + 1
+    return counts
+
+
+class LinearTextModel(abc.ABC):
+    def __init__(self, feature_log_prob, class_log_prior, classes):
+        self.feature_log_prob = feature_log_prob
+        self.class_log_prior = class_log_prior
+        self.classes_ = list(classes)
+
+    @abc.abstractmethod
+    def features(self, text):
+        pass
+
+    def batch_joint_log_likelihood(self, texts):
+        import numpy as np
+
+        rows, indices, weights = [], [], []
+        for row, text in enumerate(texts):
+            row_indices, row_weights = self.features(text)
+            rows.append(np.full(len(row_indices), row, dtype=np.intp))
+            indices.append(np.asarray(row_indices, dtype=np.intp))
+            weights.append(np.asarray(row_weights, dtype=float))
+
+        jll = np.tile(np.asarray(self.class_log_prior, dtype=float), (len(texts), 1))
+        if not texts:
+            return jll
+        rows = np.concatenate(rows)
+        if len(rows) == 0:
+            return jll
+        contributions = self.feature_log_prob[:, np.concatenate(indices)] * np.concatenate(weights)
+        for column, class_contributions in enumerate(contributions):
+            jll[:, column] += np.bincount(rows, weights=class_contributions, minlength=len(texts))
+        return jll
+
+    def predict_proba(self, texts):
+        import numpy as np
+
+        jll = self.batch_joint_log_likelihood(texts)
+        jll -= jll.max(axis=1, keepdims=True)
+        proba = np.exp(jll)
+        return proba / proba.sum(axis=1, keepdims=True)
+
+    def predict(self, texts):
+        return [self.classes_[int(i)] for i in self.batch_joint_log_likelihood(texts).argmax(axis=1)]
+
+
+class CompactModel(LinearTextModel):
+    def __init__(self, vocabulary, idf, feature_log_prob, class_log_prior, classes):
+        super().__init__(feature_log_prob, class_log_prior, classes)
+        self.vocabulary = vocabulary
+        self.idf = idf
+
+    @classmethod
+    def from_pipeline(cls, pipeline):
+        tfidf = pipeline.named_steps['tfidf']
+        clf = pipeline.named_steps['clf']
+        vocabulary = {token: int(index) for token, index in tfidf.vocabulary_.items()}
+        return cls(vocabulary, tfidf.idf_, clf.feature_log_prob_, clf.class_log_prior_,
+                   [str(c) for c in clf.classes_])
+
+    def features(self, text):
+        import numpy as np
+
+        counts = {}
+        for token in TOKEN_PATTERN.findall(text.lower()):
+            index = self.vocabulary.get(token)
+            if index is not None:
+                counts[index] = counts.get(index, 0) + 1
+
+        indices = np.fromiter(counts.keys(), dtype=np.intp, count=len(counts))
+        weights = np.fromiter(counts.values(), dtype=float, count=len(counts))
+        if len(indices):
+            weights *= self.idf[indices]
+            weights /= np.sqrt(np.dot(weights, weights))
+        return indices, weights
+
+    def save(self, directory, key):
+        import numpy as np
+
+        parent = os.path.dirname(directory)
+        os.makedirs(parent, exist_ok=True)
+        tmp_dir = tempfile.mkdtemp(prefix='.tmp-', dir=parent)
+        try:
+            np.save(os.path.join(tmp_dir, 'idf.npy'), np.asarray(self.idf, dtype=np.float64))
+            np.save(os.path.join(tmp_dir, 'feature_log_prob.npy'),
+                    np.asarray(self.feature_log_prob, dtype=np.float64))
+            np.save(os.path.join(tmp_dir, 'class_log_prior.npy'),
+                    np.asarray(self.class_log_prior, dtype=np.float64))
+            with open(os.path.join(tmp_dir, 'meta.json'), 'w', encoding='utf-8') as f:
+                json.dump({
+                    'format_version': MODEL_FORMAT_VERSION,
+                    'key': key,
+                    'classes': self.classes_,
+                    'vocabulary': self.vocabulary,
+                }, f, ensure_ascii=False)
+            try:
+                os.replace(tmp_dir, directory)
+            except OSError:
+                shutil.rmtree(directory, ignore_errors=True)
+                os.replace(tmp_dir, directory)
+        except OSError:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            if not os.path.isdir(directory):
+                raise
+
+
+def load_model(directory, key):
+    import numpy as np
+
+    with open(os.path.join(directory, 'meta.json'), encoding='utf-8') as f:
+        meta = json.load(f)
+
+    if meta.get('format_version') != MODEL_FORMAT_VERSION or meta.get('key') != key:
+        raise ModelFormatError(f"Modelo obsoleto en {directory}")
+
+    idf = np.load(os.path.join(directory, 'idf.npy'), mmap_mode='r')
+    feature_log_prob = np.load(os.path.join(directory, 'feature_log_prob.npy'), mmap_mode='r')
+    class_log_prior = np.load(os.path.join(directory, 'class_log_prior.npy'), mmap_mode='r')
+
+    classes = meta['classes']
+    if feature_log_prob.shape != (len(classes), len(idf)) or class_log_prior.shape != (len(classes),):
+        raise ModelFormatError(f"Dimensiones inconsistentes en {directory}")
+
+    return CompactModel(meta['vocabulary'], idf, feature_log_prob, class_log_prior, classes)
+
+
+def prune_stale_models(current_dir):
+    parent = os.path.dirname(current_dir)
+    try:
+        names = os.listdir(parent)
+    except OSError:
+        return
+    for name in names:
+        path = os.path.join(parent, name)
+        if name.startswith('v') and path != current_dir and os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+
+
+class HashedModel(LinearTextModel):
+    def __init__(self, feature_count, class_count, classes, alpha=1.0):
+        import numpy as np
+
+        smoothed = np.asarray(feature_count, dtype=float) + alpha
+        feature_log_prob = np.log(smoothed) - np.log(smoothed.sum(axis=1, keepdims=True))
+        class_count = np.asarray(class_count, dtype=float)
+        with np.errstate(divide='ignore'):
+            class_log_prior = np.log(class_count) - np.log(class_count.sum())
+        class_log_prior[np.isneginf(class_log_prior)] = -1e9
+        super().__init__(feature_log_prob, class_log_prior, classes)
+        self.n_features = feature_log_prob.shape[1]
+
+    def features(self, text):
+        import numpy as np
+
+        counts = hash_token_counts(text, self.n_features)
+        indices = np.fromiter(counts.keys(), dtype=np.intp, count=len(counts))
+        weights = np.fromiter(counts.values(), dtype=float, count=len(counts))
+        return indices, weights
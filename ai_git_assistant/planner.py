@@ -0,0 +1,230 @@
+import os
+import zlib
+from collections import Counter, defaultdict
+
+from .model import TOKEN_PATTERN
+
+PLAN_FEATURES = 2 ** 18
+PATH_TOKEN_WEIGHT = 3.0
+SIMILARITY_WEIGHT = 0.6
+DIRECTORY_WEIGHT = 0.4
+JOIN_THRESHOLD = 0.35
+MAX_LINES_PER_FILE = 400
+LEADER_BLOCK = 32
+
+
+class PlannedFile:
+    __slots__ = ('path', 'text', 'lines', 'deleted')
+
+    def __init__(self, path, text, lines, deleted=False):
+        self.path = path
+        self.text = text
+        self.lines = lines
+        self.deleted = deleted
+
+
+class CommitGroup:
+    def __init__(self, commit_type, files, type_probabilities):
+        self.commit_type = commit_type
+        self.files = files
+        self.type_probabilities = type_probabilities
+
+    @property
+    def lines(self):
+        return sum(f.lines for f in self.files)
+
+    @property
+    def changes_text(self):
+        return ' '.join(f.text for f in self.files if f.text).strip()
+
+    def __repr__(self):
+        return f"CommitGroup({self.commit_type!r}, {len(self.files)} archivos)"
+
+
+def planned_files(file_diffs, max_lines=MAX_LINES_PER_FILE):
+    return [
+        PlannedFile(d.path, ' '.join(line.strip() for line in d.added_lines[:max_lines]),
+                    d.added_count + d.removed_count, d.deleted)
+        for d in file_diffs
+    ]
+
+
+def path_tokens(path):
+    directory, name = os.path.split(path)
+    stem, ext = os.path.splitext(name)
+    tokens = ['dir:' + part for part in directory.split('/') if part]
+    tokens += ['name:' + t for t in TOKEN_PATTERN.findall(stem.lower())]
+    if ext:
+        tokens.append('ext:' + ext.lower())
+    return tokens
+
+
+def hashed_row(text, path, n_features, index_cache):
+    def index_of(token):
+        index = index_cache.get(token)
+        if index is None:
+            index = index_cache[token] = zlib.crc32(token.encode('utf-8')) % n_features
+        return index
+
+    counts = {}
+    for token, count in Counter(TOKEN_PATTERN.findall(text.lower())).items():
+        index = index_of(token)
+        counts[index] = counts.get(index, 0) + count
+    for token in path_tokens(path):
+        index = index_of(token)
+        counts[index] = counts.get(index, 0) + PATH_TOKEN_WEIGHT
+    return counts
+
+
+def sparse_rows(rows, n_features):
+    import numpy as np
+    from scipy.sparse import csr_matrix
+
+    indptr = [0]
+    indices = []
+    data = []
+    for counts in rows:
+        indices.extend(counts.keys())
+        data.extend(counts.values())
+        indptr.append(len(indices))
+    matrix = csr_matrix((np.array(data, dtype=np.float64), np.array(indices, dtype=np.int64), indptr),
+                        shape=(len(rows), n_features))
+    matrix.data = np.log1p(matrix.data)
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return csr_matrix(matrix.multiply(1.0 / norms[:, None]))
+
+
+def compact_columns(matrix):
+    import numpy as np
+    from scipy.sparse import csr_matrix
+
+    # Solo las columnas usadas: cada unidad se puntúa con un vector denso pequeño
+    used, indices = np.unique(matrix.indices, return_inverse=True)
+    return csr_matrix((matrix.data, indices.astype(np.int64), matrix.indptr), shape=(matrix.shape[0], len(used)))
+
+
+def directory_parts(directories):
+    import numpy as np
+
+    parts = [d.split('/') if d else [] for d in directories]
+    part_ids = {}
+    prefixes = np.full((len(parts), max(1, max(map(len, parts), default=0))), -1, dtype=np.int64)
+    for row, names in enumerate(parts):
+        for depth, name in enumerate(names):
+            prefixes[row, depth] = part_ids.setdefault(name, len(part_ids))
+    return prefixes, np.array([len(names) for names in parts], dtype=np.int64)
+
+
+class LeaderBucket:
+    # Líderes de un mismo tipo. Cada unidad se puntúa solo contra ellos; la matriz de
+    # líderes se reconstruye por bloques para no copiarla en cada alta.
+    def __init__(self, matrix, prefixes, lengths):
+        import numpy as np
+
+        self.matrix = matrix
+        self.prefixes = prefixes
+        self.lengths = lengths
+        self.units = np.empty(matrix.shape[0], dtype=np.intp)
+        self.groups = []
+        self._block = None
+        self._block_size = 0
+
+    def __len__(self):
+        return len(self.groups)
+
+    def add(self, unit, group):
+        self.units[len(self.groups)] = unit
+        self.groups.append(group)
+
+    def similarity(self, vector):
+        import numpy as np
+
+        count = len(self.groups)
+        if count - self._block_size >= LEADER_BLOCK:
+            self._block = self.matrix[self.units[:count]]
+            self._block_size = count
+        scores = np.empty(count)
+        if self._block is not None:
+            scores[:self._block_size] = self._block @ vector
+        indptr, indices, data = self.matrix.indptr, self.matrix.indices, self.matrix.data
+        for position in range(self._block_size, count):
+            leader = self.units[position]
+            start, end = indptr[leader], indptr[leader + 1]
+            scores[position] = vector[indices[start:end]] @ data[start:end]
+        return scores
+
+    def proximity(self, unit):
+        import numpy as np
+
+        leaders = self.units[:len(self.groups)]
+        prefix = self.prefixes[unit]
+        same = (self.prefixes[leaders] == prefix) & (prefix >= 0)
+        common = np.cumprod(same, axis=1).sum(axis=1)
+        depth = np.maximum(self.lengths[leaders], self.lengths[unit])
+        return np.where(depth == 0, 1.0, common / np.maximum(depth, 1))
+
+    def best(self, unit, vector, threshold):
+        scores = SIMILARITY_WEIGHT * self.similarity(vector) + DIRECTORY_WEIGHT * self.proximity(unit)
+        best = int(scores.argmax())
+        return self.groups[best] if scores[best] > threshold else None
+
+
+def plan_commits(files, model, n_features=PLAN_FEATURES, threshold=JOIN_THRESHOLD):
+    import numpy as np
+
+    if not files:
+        return []
+    classes = list(model.classes_)
+    probabilities = model.predict_proba([f.text + ' ' + ' '.join(path_tokens(f.path)) for f in files])
+    predicted = probabilities.argmax(axis=1)
+
+    # Primero se agrupan por directorio y tipo: cada unidad es una fila de la matriz
+    units = defaultdict(list)
+    for index, f in enumerate(files):
+        units[(os.path.dirname(f.path), int(predicted[index]))].append(index)
+    unit_keys = sorted(units, key=lambda key: -sum(files[i].lines + 1 for i in units[key]))
+
+    rows = []
+    index_cache = {}
+    for key in unit_keys:
+        counts = {}
+        for i in units[key]:
+            for feature, value in hashed_row(files[i].text, files[i].path, n_features, index_cache).items():
+                counts[feature] = counts.get(feature, 0) + value
+        rows.append(counts)
+    matrix = compact_columns(sparse_rows(rows, n_features))
+    prefixes, lengths = directory_parts([key[0] for key in unit_keys])
+
+    # Los líderes se agrupan por tipo predicho; nunca se calcula la matriz unidades x unidades
+    buckets = {}
+    members = []
+    vector = np.zeros(matrix.shape[1])
+    for u, (_, type_index) in enumerate(unit_keys):
+        bucket = buckets.get(type_index)
+        best = None
+        if bucket:
+            start, end = matrix.indptr[u], matrix.indptr[u + 1]
+            vector[matrix.indices[start:end]] = matrix.data[start:end]
+            best = bucket.best(u, vector, threshold)
+            vector[matrix.indices[start:end]] = 0.0
+        if best is None:
+            if bucket is None:
+                bucket = buckets[type_index] = LeaderBucket(matrix, prefixes, lengths)
+            bucket.add(u, len(members))
+            members.append([u])
+        else:
+            members[best].append(u)
+
+    groups = []
+    for unit_indices in members:
+        file_indices = sorted(i for u in unit_indices for i in units[unit_keys[u]])
+        weights = np.array([files[i].lines + 1 for i in file_indices], dtype=float)
+        mean = (probabilities[file_indices] * weights[:, None]).sum(axis=0) / weights.sum()
+        groups.append(CommitGroup(
+            classes[int(mean.argmax())],
+            [files[i] for i in file_indices],
+            dict(zip(classes, (float(p) for p in mean))),
+        ))
+    groups.sort(key=lambda g: (-g.lines, g.files[0].path))
+    return groups
@@ -0,0 +1,175 @@
+import functools
+import json
+import os
+import sys
+import threading
+import time
+
+DEFAULT_TRACE_PATH = 'ai-git-assistant-trace.json'
+
+_enabled = False
+_origin = 0.0
+_events = []
+_counters = {}
+_lock = threading.Lock()
+
+
+def peak_memory_bytes():
+    try:
+        import resource
+    except ImportError:
+        return 0
+    scale = 1 if sys.platform == 'darwin' else 1024
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale
+    return max(own, children)
+
+
+class NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def add_bytes(self, data):
+        pass
+
+
+NULL_SPAN = NullSpan()
+
+
+class Span:
+    def __init__(self, name, category, args):
+        self.name = name
+        self.category = category
+        self.args = args
+        self.bytes_read = 0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter()
+        if self.category == 'subprocess':
+            self.args['bytes'] = self.bytes_read
+            count('subprocesses')
+            count('git_bytes', self.bytes_read)
+        event = {
+            'name': self.name,
+            'cat': self.category,
+            'ph': 'X',
+            'ts': (self.start - _origin) * 1e6,
+            'dur': (end - self.start) * 1e6,
+            'pid': os.getpid(),
+            'tid': threading.get_ident(),
+            'args': self.args,
+        }
+        with _lock:
+            _events.append(event)
+        return False
+
+    def add_bytes(self, data):
+        if data:
+            self.bytes_read += len(data)
+
+
+def enable():
+    global _enabled, _origin
+    _enabled = True
+    _origin = time.perf_counter()
+
+
+def span(name, **args):
+    if not _enabled:
+        return NULL_SPAN
+    return Span(name, 'stage', args)
+
+
+def command_name(command):
+    words = [command[0]]
+    args = iter(command[1:])
+    for arg in args:
+        if arg in ('-c', '-C'):
+            next(args, None)
+        elif not arg.startswith('-'):
+            words.append(arg)
+            break
+    return ' '.join(words)
+
+
+def subprocess_span(command):
+    if not _enabled:
+        return NULL_SPAN
+    return Span(command_name(command), 'subprocess', {'command': ' '.join(command)})
+
+
+def count(name, amount=1):
+    if not _enabled:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + amount
+
+
+def profiled(name):
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with Span(name, 'stage', {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def summary():
+    stages = {}
+    for event in _events:
+        stats = stages.setdefault((event['cat'], event['name']), [0, 0.0, 0])
+        stats[0] += 1
+        stats[1] += event['dur'] / 1000
+        stats[2] += event['args'].get('bytes', 0)
+    return {
+        'stages': stages,
+        'counters': dict(_counters),
+        'wall_ms': (time.perf_counter() - _origin) * 1000,
+        'peak_memory_bytes': peak_memory_bytes(),
+    }
+
+
+def format_summary(data):
+    lines = [
+        f"{'Etapa':<40} {'Llamadas':>8} {'Total ms':>10} {'Bytes':>12}",
+        '-' * 73,
+    ]
+    for (category, name), (calls, total_ms, nbytes) in sorted(
+            data['stages'].items(), key=lambda item: -item[1][1]):
+        label = f"[git] {name}" if category == 'subprocess' else name
+        lines.append(f"{label[:40]:<40} {calls:>8} {total_ms:>10.1f} {nbytes:>12}")
+    lines.append('-' * 73)
+    lines.append(f"Tiempo total: {data['wall_ms']:.1f} ms")
+    lines.append(f"Subprocesos: {data['counters'].get('subprocesses', 0)}")
+    lines.append(f"Bytes leídos de git: {data['counters'].get('git_bytes', 0)}")
+    lines.append(f"Llamadas a stat: {data['counters'].get('stat_calls', 0)}")
+    lines.append(f"Memoria pico: {data['peak_memory_bytes'] / (1024 * 1024):.1f} MiB")
+    return '\n'.join(lines)
+
+
+def write_trace(path=DEFAULT_TRACE_PATH):
+    data = summary()
+    with _lock:
+        events = list(_events)
+    end_ts = data['wall_ms'] * 1000
+    events.append({
+        'name': 'peak_memory', 'ph': 'C', 'ts': end_ts, 'pid': os.getpid(),
+        'args': {'bytes': data['peak_memory_bytes']},
+    })
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'traceEvents': events,
+            'displayTimeUnit': 'ms',
+            'otherData': {'counters': data['counters']},
+        }, f)
+    return data
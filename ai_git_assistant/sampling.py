@@ -0,0 +1,227 @@
+import os
+import re
+import time
+from collections import Counter
+
+from . import git_runner, profiling
+from .analysis_cache import staged_blob_changes
+from .classifier import get_classifier
+from .config import config_section
+from .scanner import NULL_OID, blob_sizes
+
+DEFAULT_SKIP = ('lock', 'minified', 'binary')
+# Medido con un diff sintético: bytes de diff leídos y líneas conservadas analizadas por milisegundo.
+# La mitad del presupuesto es para leer y la otra mitad para analizar lo que se conservó.
+READ_SHARE = 0.5
+READ_BYTES_PER_MS = 10_000
+KEPT_LINES_PER_MS = 20
+MIN_LINES_PER_FILE = 20
+PATHSPEC_CHUNK = 500
+MAX_LISTED_FILES = 10
+
+MINIFIED_RE = re.compile(r'\.min\.(?:js|css)$|\.(?:js|css)\.map$')
+
+SKIP_REASONS = {
+    'lock': 'lockfile',
+    'minified': 'minificado',
+    'binary': 'binario',
+    'budget': 'excede el presupuesto',
+    'deadline': 'tiempo agotado',
+}
+
+
+def parse_numstat(output):
+    stats = {}
+    records = output.split('\0')
+    i = 0
+    while i < len(records):
+        record = records[i]
+        i += 1
+        if not record:
+            continue
+        added, _, path = record.split('\t', 2)
+        if not path:
+            # Renombre: la ruta vieja y la nueva vienen en los dos registros siguientes
+            path = records[i + 1] if i + 1 < len(records) else ''
+            i += 2
+        stats[path] = None if added == '-' else int(added)
+    return stats
+
+
+def chunks(paths, size=PATHSPEC_CHUNK):
+    return [paths[i:i + size] for i in range(0, len(paths), size)]
+
+
+def staged_added_lines(root, paths):
+    # None en lugar del número de líneas indica un archivo binario
+    stats = {}
+    for chunk in chunks(paths):
+        args = ["git", "--literal-pathspecs", "-c", "core.quotepath=off", "diff", "--cached", "--numstat", "-z",
+                "--no-color", "--"] + chunk
+        result = git_runner.run(args, root)
+        if result.returncode == 0:
+            stats.update(parse_numstat(result.stdout))
+    return stats
+
+
+def analysis_settings(root=None, budget_ms=None):
+    section = config_section(root, 'analysis')
+    if budget_ms is None:
+        budget_ms = section.get('budget_ms')
+    return {
+        'budget_ms': int(budget_ms) if budget_ms else None,
+        'skip': tuple(section.get('skip', DEFAULT_SKIP)),
+    }
+
+
+def path_skip_reason(path, file_type, skip):
+    if 'lock' in skip and file_type == 'lock':
+        return 'lock'
+    if 'minified' in skip and MINIFIED_RE.search(path):
+        return 'minified'
+    return None
+
+
+def allocate_quotas(counts, total):
+    # Reparto max-min: los archivos pequeños se leen completos y el resto se divide el sobrante
+    quotas = {}
+    remaining = sorted(counts.items(), key=lambda item: item[1])
+    while remaining:
+        share = max(MIN_LINES_PER_FILE, total // len(remaining))
+        path, count = remaining[0]
+        if count > share:
+            break
+        quotas[path] = count
+        total -= count
+        remaining.pop(0)
+    for path, count in remaining:
+        quotas[path] = max(MIN_LINES_PER_FILE, total // len(remaining))
+    return quotas
+
+
+class SamplePlan:
+    def __init__(self, budget_ms=None, skip=DEFAULT_SKIP):
+        self.budget_ms = budget_ms
+        self.skip = skip
+        self.deadline = time.monotonic() + budget_ms * READ_SHARE / 1000 if budget_ms else None
+        self.read = []
+        self.deleted = []
+        self.quotas = {}
+        self.skipped = {}
+        self.file_types = {}
+
+    def pathspec_chunks(self):
+        # Sin nada omitido basta un solo diff sin pathspecs
+        return chunks(self.read) if self.skipped else [None]
+
+    def binary_skip(self, file_diff):
+        # Sin presupuesto no se corre numstat: los binarios se detectan al leer el diff
+        return 'binary' if file_diff.binary and 'binary' in self.skip else None
+
+    def expired(self):
+        return self.deadline is not None and time.monotonic() > self.deadline
+
+
+@profiling.profiled('plan_sample')
+def plan_sample(root, paths, budget_ms=None, skip=DEFAULT_SKIP, blob_changes=None):
+    plan = SamplePlan(budget_ms, skip)
+    classifier = get_classifier(root)
+    if blob_changes is None:
+        blob_changes = staged_blob_changes(root) or []
+    staged = {path: new_oid for path, _, _, new_oid in blob_changes}
+    oids = {path: new_oid for path, new_oid in staged.items() if new_oid != NULL_OID}
+    candidates = []
+    for path in paths:
+        if path not in staged:
+            continue
+        plan.file_types[path] = classifier.file_type(os.path.join(root, path))
+        # Los borrados cuentan para el tipo predominante, pero no tienen diff que leer
+        if path not in oids:
+            plan.deleted.append(path)
+            continue
+        reason = path_skip_reason(path, plan.file_types[path], skip)
+        if reason:
+            plan.skipped[path] = reason
+        else:
+            candidates.append(path)
+
+    if not budget_ms:
+        plan.read = candidates
+        return plan
+
+    # El tamaño del blob sale de un solo `cat-file --batch-check`, sin calcular ningún diff
+    sizes = blob_sizes(root, [oids[path] for path in candidates])
+    read_bytes = budget_ms * READ_SHARE * READ_BYTES_PER_MS
+    selected = []
+    # Primero los archivos pequeños: con el mismo tiempo se cubren más archivos
+    for path in sorted(candidates, key=lambda p: sizes.get(oids[p], 0)):
+        size = sizes.get(oids[path], 0)
+        if size > read_bytes:
+            plan.skipped[path] = 'budget'
+            continue
+        read_bytes -= size
+        selected.append(path)
+
+    counts = staged_added_lines(root, selected)
+    for path in selected:
+        if counts.get(path, 0) is None and 'binary' in skip:
+            plan.skipped[path] = 'binary'
+        else:
+            plan.read.append(path)
+    counts = {path: counts.get(path) or 0 for path in plan.read}
+    plan.quotas = {path: (quota, counts[path])
+                   for path, quota in allocate_quotas(counts, int(budget_ms * KEPT_LINES_PER_MS)).items()
+                   if quota < counts[path]}
+    plan.read.sort()
+    return plan
+
+
+class ChangeSample:
+    def __init__(self):
+        self.texts = []
+        self.file_types = Counter()
+        self.sampled = {}
+        self.skipped = {}
+
+    def add(self, path, file_type, text=None, sampled=None, skipped=None):
+        self.file_types[file_type] += 1
+        if text is not None:
+            self.texts.append(text)
+        if sampled:
+            self.sampled[path] = sampled
+        if skipped:
+            self.skipped[path] = skipped
+
+    @property
+    def text(self):
+        return ' '.join(self.texts).strip()
+
+    @property
+    def predominant_type(self):
+        return self.file_types.most_common(1)[0][0] if self.file_types else 'other'
+
+    def coverage(self):
+        if not self.sampled and not self.skipped:
+            return None
+        return {
+            'sampled': {path: list(counts) for path, counts in sorted(self.sampled.items())},
+            'skipped': dict(sorted(self.skipped.items())),
+        }
+
+
+def format_coverage(coverage):
+    if not coverage:
+        return None
+    parts = []
+    sampled = list(coverage['sampled'].items())
+    if sampled:
+        listed = ", ".join(f"{path} ({kept}/{total} líneas)" for path, (kept, total) in sampled[:MAX_LISTED_FILES])
+        more = f" y {len(sampled) - MAX_LISTED_FILES} más" if len(sampled) > MAX_LISTED_FILES else ""
+        parts.append(f"muestreados: {listed}{more}")
+    skipped = list(coverage['skipped'].items())
+    if skipped:
+        listed = ", ".join(f"{path} ({SKIP_REASONS.get(reason, reason)})"
+                           for path, reason in skipped[:MAX_LISTED_FILES])
+        more = f" y {len(skipped) - MAX_LISTED_FILES} más" if len(skipped) > MAX_LISTED_FILES else ""
+        parts.append(f"omitidos: {listed}{more}")
+    return "; ".join(parts)
@@ -0,0 +1,309 @@
+import os
+import re
+import time
+from collections import deque
+from concurrent.futures import TimeoutError
+
+from . import git_runner, profiling
+from .analysis_cache import staged_blob_changes
+from .config import config_section
+
+NULL_OID = '0' * 40
+DEFAULT_BUDGET_MS = 2000
+DEFAULT_MAX_FILE_BYTES = 1024 * 1024
+DEFAULT_MAX_BINARY_BYTES = 256 * 1024
+BINARY_SNIFF_BYTES = 8000
+HEADER_BYTES = 1024
+MINIFIED_SAMPLE_BYTES = 16 * 1024
+MINIFIED_LINE_BYTES = 500
+BATCH_BYTES = 1024 * 1024
+PARALLEL_MIN_BYTES = 8 * 1024 * 1024
+SCAN_WORKERS = os.cpu_count() or 1
+MAX_LISTED_FINDINGS = 50
+
+# (regla, patrón, pistas): la regex combinada solo se ejecuta si alguna pista aparece en el contenido
+SECRET_RULES = (
+    ('aws_access_key', rb'\b(?:AKIA|ASIA)[0-9A-Z]{16}\b', (b'akia', b'asia')),
+    ('private_key', rb'-----BEGIN (?:[A-Z0-9]+ )*PRIVATE KEY(?: BLOCK)?-----', (b'private key',)),
+    ('github_token', rb'\bgh[pousr]_[A-Za-z0-9]{36,}', (b'ghp_', b'gho_', b'ghu_', b'ghs_', b'ghr_')),
+    ('slack_token', rb'\bxox[abprs]-[A-Za-z0-9-]{10,}', (b'xox',)),
+    ('google_api_key', rb'\bAIza[0-9A-Za-z_\-]{35}', (b'aiza',)),
+    ('stripe_key', rb'\b[rs]k_live_[0-9A-Za-z]{20,}', (b'k_live_',)),
+    ('secret_assignment',
+     rb'(?i:\b(?:password|passwd|pwd|secret|api[_-]?key|access[_-]?token|auth[_-]?token)\b["\']?\s*[:=]\s*'
+     rb'["\'][^"\'\s]{8,}["\'])',
+     (b'passw', b'pwd', b'secret', b'api_key', b'api-key', b'apikey', b'access_token', b'access-token',
+      b'accesstoken', b'auth_token', b'auth-token', b'authtoken')),
+)
+SECRET_RE = re.compile(b'|'.join(b'(?P<%s>%s)' % (name.encode(), pattern) for name, pattern, _ in SECRET_RULES))
+SECRET_HINTS = tuple(hint for _, _, hints in SECRET_RULES for hint in hints)
+SECRET_RULE_NAMES = frozenset(name for name, _, _ in SECRET_RULES)
+
+GENERATED_PATH_RE = re.compile(
+    r'(?:^|/)(?:dist|build|node_modules|__pycache__)/|\.min\.(?:js|css)$|\.bundle\.js$|\.(?:js|css)\.map$|\.py[co]$')
+GENERATED_MARKER_RE = re.compile(rb'@generated|DO NOT EDIT|<auto-generated')
+
+RULE_LABELS = {
+    'aws_access_key': 'clave de acceso AWS',
+    'private_key': 'llave privada',
+    'github_token': 'token de GitHub',
+    'slack_token': 'token de Slack',
+    'google_api_key': 'API key de Google',
+    'stripe_key': 'clave de Stripe',
+    'secret_assignment': 'credencial en texto plano',
+    'large_file': 'archivo grande',
+    'large_binary': 'binario grande',
+    'generated': 'archivo generado',
+}
+
+
+class Finding:
+    def __init__(self, path, rule, line=None, detail=None):
+        self.path = path
+        self.rule = rule
+        self.line = line
+        self.detail = detail
+
+    @property
+    def severity(self):
+        return 'error' if self.rule in SECRET_RULE_NAMES else 'warning'
+
+    def as_dict(self):
+        return {'path': self.path, 'rule': self.rule, 'severity': self.severity, 'line': self.line,
+                'detail': self.detail}
+
+
+class ScanResult:
+    def __init__(self):
+        self.findings = []
+        self.scanned = 0
+        self.unscanned = []
+        self.elapsed_ms = 0.0
+
+    def add(self, paths, rule, line=None, detail=None):
+        self.findings.extend(Finding(path, rule, line, detail) for path in paths)
+
+    def secrets(self):
+        return [f for f in self.findings if f.severity == 'error']
+
+    def as_dict(self):
+        return {'scanned': self.scanned, 'unscanned': self.unscanned, 'elapsed_ms': round(self.elapsed_ms, 1),
+                'findings': [f.as_dict() for f in self.findings]}
+
+
+def scan_settings(root=None):
+    section = config_section(root, 'scan')
+    return {
+        'budget_ms': int(section.get('budget_ms', DEFAULT_BUDGET_MS)),
+        'max_file_bytes': int(section.get('max_file_bytes', DEFAULT_MAX_FILE_BYTES)),
+        'max_binary_bytes': int(section.get('max_binary_bytes', DEFAULT_MAX_BINARY_BYTES)),
+    }
+
+
+def format_size(size):
+    for unit in ('B', 'KiB', 'MiB'):
+        if size < 1024 or unit == 'MiB':
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+def is_minified(data):
+    sample = data[:MINIFIED_SAMPLE_BYTES]
+    return len(sample) >= 4096 and len(sample) / (sample.count(b'\n') + 1) > MINIFIED_LINE_BYTES
+
+
+def scan_blob(data, max_binary_bytes=DEFAULT_MAX_BINARY_BYTES):
+    if b'\0' in data[:BINARY_SNIFF_BYTES]:
+        if len(data) > max_binary_bytes:
+            return [('large_binary', None, format_size(len(data)))]
+        return []
+
+    results = []
+    if GENERATED_MARKER_RE.search(data[:HEADER_BYTES]):
+        results.append(('generated', None, 'marcado como generado'))
+    elif is_minified(data):
+        results.append(('generated', None, 'contenido minificado'))
+
+    lowered = data.lower()
+    if any(hint in lowered for hint in SECRET_HINTS):
+        line, position = 1, 0
+        for match in SECRET_RE.finditer(data):
+            line += data.count(b'\n', position, match.start())
+            position = match.start()
+            value = match.group().decode('utf-8', errors='replace')
+            # Nunca se copia el secreto completo al reporte
+            results.append((match.lastgroup, line, value[:4] + '…'))
+    return results
+
+
+def scan_batch(batch, max_binary_bytes=DEFAULT_MAX_BINARY_BYTES):
+    return [(oid, scan_blob(data, max_binary_bytes)) for oid, data in batch]
+
+
+def blob_sizes(root, oids):
+    if not oids:
+        return {}
+    result = git_runner.run(["git", "cat-file", "--batch-check"], root, input="\n".join(oids) + "\n")
+    sizes = {}
+    for line in result.stdout.splitlines():
+        fields = line.split()
+        if len(fields) == 3 and fields[1] == 'blob':
+            sizes[fields[0]] = int(fields[2])
+    return sizes
+
+
+def iter_batch_blobs(chunks):
+    # Salida de `git cat-file --batch`: "<oid> <tipo> <tamaño>\n<contenido>\n" por cada objeto
+    buffer = bytearray()
+    oid, size = None, None
+    for chunk in chunks:
+        buffer += chunk
+        while True:
+            if size is None:
+                newline = buffer.find(b'\n')
+                if newline < 0:
+                    break
+                header = bytes(buffer[:newline]).split()
+                del buffer[:newline + 1]
+                if len(header) != 3:
+                    continue
+                oid, size = header[0].decode(), int(header[2])
+            if len(buffer) < size + 1:
+                break
+            data = bytes(buffer[:size])
+            del buffer[:size + 1]
+            yield oid, data
+            oid, size = None, None
+
+
+def iter_blob_batches(root, oids, deadline):
+    stream = iter_batch_blobs(git_runner.iter_chunks(
+        ["git", "cat-file", "--batch"], root, input=("\n".join(oids) + "\n").encode()))
+    batch, batch_bytes = [], 0
+    try:
+        for oid, data in stream:
+            batch.append((oid, data))
+            batch_bytes += len(data)
+            if batch_bytes >= BATCH_BYTES:
+                yield batch
+                batch, batch_bytes = [], 0
+            if time.monotonic() > deadline:
+                batch = []
+                return
+        if batch:
+            yield batch
+    finally:
+        # Cerrar el flujo termina el proceso de git si se agotó el tiempo
+        stream.close()
+
+
+def scan_inline(batches, max_binary_bytes, deadline):
+    for batch in batches:
+        yield from scan_batch(batch, max_binary_bytes)
+        if time.monotonic() > deadline:
+            return
+
+
+def scan_parallel(batches, max_binary_bytes, deadline, workers, total_bytes):
+    # Con poco contenido levantar procesos cuesta más que revisarlo en el proceso actual
+    if workers <= 1 or total_bytes < PARALLEL_MIN_BYTES:
+        yield from scan_inline(batches, max_binary_bytes, deadline)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    executor = ProcessPoolExecutor(max_workers=workers)
+    in_flight = deque()
+    try:
+        for batch in batches:
+            in_flight.append(executor.submit(scan_batch, batch, max_binary_bytes))
+            while len(in_flight) >= workers * 2 or (in_flight and in_flight[0].done()):
+                yield from in_flight.popleft().result(timeout=max(0.0, deadline - time.monotonic()))
+        while in_flight:
+            yield from in_flight.popleft().result(timeout=max(0.0, deadline - time.monotonic()))
+    except TimeoutError:
+        return
+    finally:
+        for future in in_flight:
+            future.cancel()
+        executor.shutdown(wait=False)
+
+
+@profiling.profiled('scan_staged_changes')
+def scan_staged_changes(root=None, budget_ms=None):
+    start = time.monotonic()
+    root = str(root or os.getcwd())
+    settings = scan_settings(root)
+    budget_ms = settings['budget_ms'] if budget_ms is None else budget_ms
+    deadline = start + budget_ms / 1000
+    result = ScanResult()
+
+    blobs = {}
+    for path, _, _, new_oid in staged_blob_changes(root) or []:
+        if new_oid != NULL_OID:
+            blobs.setdefault(new_oid, []).append(path)
+    sizes = blob_sizes(root, list(blobs))
+
+    wanted = []
+    generated = set()
+    for oid, paths in blobs.items():
+        generated.update(p for p in paths if GENERATED_PATH_RE.search(p))
+        if generated.intersection(paths):
+            result.add([p for p in paths if p in generated], 'generated', detail='ruta de artefactos generados')
+        size = sizes.get(oid)
+        if size is None:
+            continue
+        if size > settings['max_file_bytes']:
+            result.add(paths, 'large_file', detail=format_size(size))
+            continue
+        wanted.append((size, oid))
+    # Primero los blobs pequeños: con el tiempo justo se revisan más archivos, y ahí suelen estar las credenciales
+    wanted.sort()
+    total_bytes = sum(size for size, _ in wanted)
+
+    pending = {oid for _, oid in wanted}
+    if pending:
+        batches = iter_blob_batches(root, [oid for _, oid in wanted], deadline)
+        scanned = scan_parallel(batches, settings['max_binary_bytes'], deadline, SCAN_WORKERS, total_bytes)
+        try:
+            for oid, findings in scanned:
+                pending.discard(oid)
+                result.scanned += len(blobs[oid])
+                for rule, line, detail in findings:
+                    paths = [p for p in blobs[oid] if p not in generated] if rule == 'generated' else blobs[oid]
+                    result.add(paths, rule, line, detail)
+        finally:
+            scanned.close()
+            batches.close()
+
+    result.unscanned = sorted(path for oid in pending for path in blobs[oid])
+    result.elapsed_ms = (time.monotonic() - start) * 1000
+    profiling.count('scanned_blobs', len(blobs) - len(pending))
+    return result
+
+
+def describe_finding(finding):
+    location = f"`{finding.path}`" + (f":{finding.line}" if finding.line else "")
+    label = RULE_LABELS.get(finding.rule, finding.rule)
+    return f"{location} — {label}" + (f" ({finding.detail})" if finding.detail else "")
+
+
+def format_scan_report(result):
+    secrets = result.secrets()
+    warnings = [f for f in result.findings if f.severity != 'error']
+    lines = []
+    if not result.findings:
+        lines.append(f"Sin hallazgos en {result.scanned} archivos revisados")
+    else:
+        lines.append(f"**Hallazgos:** posibles secretos: {len(secrets)}, avisos: {len(warnings)}")
+        for finding in (secrets + warnings)[:MAX_LISTED_FINDINGS]:
+            icon = '🚫' if finding.severity == 'error' else '⚠️'
+            lines.append(f"- {icon} {describe_finding(finding)}")
+        if len(result.findings) > MAX_LISTED_FINDINGS:
+            lines.append(f"- … y {len(result.findings) - MAX_LISTED_FINDINGS} hallazgos más")
+    if result.unscanned:
+        lines.append(f"\n**Sin revisar por límite de tiempo ({len(result.unscanned)}):**")
+        lines += [f"- {path}" for path in result.unscanned[:MAX_LISTED_FINDINGS]]
+        if len(result.unscanned) > MAX_LISTED_FINDINGS:
+            lines.append(f"- … y {len(result.unscanned) - MAX_LISTED_FINDINGS} archivos más")
+    return "\n".join(lines)
@@ -0,0 +1,125 @@
+import fnmatch
+import os
+import re
+
+from . import git_runner
+
+PAGE_SIZE = 20
+GLOB_CHARS = re.compile(r'[*?\[]')
+RANGE_RE = re.compile(r'^(\d+)-(\d*)$')
+
+
+class SelectionError(ValueError):
+    pass
+
+
+class LazyEntries:
+    def __init__(self, iterable):
+        self.iterator = iter(iterable)
+        self.items = []
+        self.exhausted = False
+
+    def fill(self, count):
+        while not self.exhausted and len(self.items) < count:
+            try:
+                self.items.append(next(self.iterator))
+            except StopIteration:
+                self.exhausted = True
+        return self.items[:count]
+
+    def page(self, start, size=PAGE_SIZE):
+        return self.fill(start + size)[start:]
+
+    def has_more(self, count):
+        self.fill(count + 1)
+        return len(self.items) > count
+
+    def __bool__(self):
+        return self.has_more(0)
+
+    def __iter__(self):
+        index = 0
+        while True:
+            if index >= len(self.items):
+                self.fill(index + 1)
+                if index >= len(self.items):
+                    return
+            yield self.items[index]
+            index += 1
+
+
+def iter_untracked(root):
+    args = ["git", "-c", "core.quotepath=off", "ls-files", "-z", "--others", "--exclude-standard", "--directory",
+            "--no-empty-directory"]
+    for path in git_runner.iter_records(args, root):
+        if path:
+            yield os.path.join(root, path)
+
+
+async def count_untracked_files_async(root, directory):
+    args = ["git", "-c", "core.quotepath=off", "ls-files", "-z", "--others", "--exclude-standard", "--", directory]
+    result = await git_runner.get_runner().run_async(args, root)
+    return result.stdout.count('\0') if result.returncode == 0 else 0
+
+
+def count_untracked_files(root, directories):
+    if not directories:
+        return {}
+    counts = git_runner.gather(*(count_untracked_files_async(root, d) for d in directories))
+    return dict(zip(directories, counts))
+
+
+def display_path(path, root):
+    prefix = os.path.join(root, '') if root else None
+    return path[len(prefix):] if prefix and path.startswith(prefix) else path
+
+
+def glob_matcher(pattern):
+    # Sin '/', el patrón se compara con el nombre del archivo, como en .gitignore
+    if '/' not in pattern.rstrip('/'):
+        return lambda path: fnmatch.fnmatchcase(path.rstrip('/').rsplit('/', 1)[-1], pattern.rstrip('/'))
+    return lambda path: fnmatch.fnmatchcase(path.rstrip('/'), pattern.rstrip('/'))
+
+
+def parse_selector(text):
+    text = text.strip()
+    if text.startswith('re:'):
+        try:
+            search = re.compile(text[3:]).search
+        except re.error as e:
+            raise SelectionError(f"regex inválida: {e}")
+        return [], [lambda path: search(path) is not None]
+
+    ranges = []
+    matchers = []
+    for token in filter(None, (t.strip() for t in text.split(','))):
+        if token.isdigit():
+            ranges.append((int(token), int(token)))
+        elif RANGE_RE.match(token):
+            start, end = RANGE_RE.match(token).groups()
+            ranges.append((int(start), int(end) if end else None))
+        elif GLOB_CHARS.search(token):
+            matchers.append(glob_matcher(token))
+        else:
+            raise SelectionError(f"selector no reconocido: {token}")
+    return ranges, matchers
+
+
+def select_entries(entries, text, root=None):
+    ranges, matchers = parse_selector(text)
+    if not matchers and all(end is not None for _, end in ranges):
+        # Solo índices: no hace falta recorrer más allá del mayor
+        last = max((end for _, end in ranges), default=-1)
+        candidates = enumerate(entries.fill(last + 1))
+    else:
+        candidates = enumerate(entries)
+
+    selected = []
+    for index, path in candidates:
+        if any(start <= index and (end is None or index <= end) for start, end in ranges):
+            selected.append(path)
+        elif matchers:
+            label = display_path(path, root)
+            if any(match(label) for match in matchers):
+                selected.append(path)
+    return selected
@@ -0,0 +1,185 @@
+import re
+from collections import Counter
+
+from . import git_runner, profiling
+
+SQL_SUFFIXES = ('.sql', '.ddl')
+NULL_OID = '0' * 40
+MAX_STATEMENT_BYTES = 64 * 1024
+MAX_TRACKED_CHANGES = 10_000
+MAX_LISTED_CHANGES = 50
+
+IDENT = rb'(?:`[^`]+`|"[^"]+"|\[[^\]]+\]|[\w$]+)'
+QUALIFIED = IDENT + rb'(?:\s*\.\s*' + IDENT + rb')*'
+
+DDL_KEYWORDS = (b'create', b'alter', b'drop')
+STATEMENT_BOUNDARIES = (ord('\n'), ord(';'))
+DDL_RE = re.compile(
+    rb'\s*(?P<verb>CREATE|ALTER|DROP)\s+(?:OR\s+REPLACE\s+)?(?:(?:UNIQUE|TEMP|TEMPORARY|MATERIALIZED)\s+)*'
+    rb'(?P<object>TABLE|INDEX|VIEW|SEQUENCE|TYPE|SCHEMA)\s+(?:CONCURRENTLY\s+)?(?:IF\s+(?:NOT\s+)?EXISTS\s+)?'
+    rb'(?:ONLY\s+)?(?P<name>' + QUALIFIED + rb')(?:\s+ON\s+(?P<target>' + QUALIFIED + rb'))?',
+    re.IGNORECASE)
+COLUMN_ACTION_RE = re.compile(
+    rb'\s*(?P<action>ADD|DROP|ALTER|MODIFY|CHANGE|RENAME)\s+(?:COLUMN\s+)?(?:IF\s+(?:NOT\s+)?EXISTS\s+)?'
+    rb'(?P<column>' + IDENT + rb')',
+    re.IGNORECASE)
+NOT_A_COLUMN = {'CONSTRAINT', 'PRIMARY', 'FOREIGN', 'INDEX', 'KEY', 'UNIQUE', 'CHECK', 'TO', 'PARTITION'}
+
+
+def identifier(raw):
+    name = raw.decode('utf-8', errors='replace')
+    return '.'.join(part.strip().strip('`"[]') for part in name.split('.'))
+
+
+def parse_statement(statement):
+    match = DDL_RE.match(statement)
+    if not match:
+        return []
+    verb = match.group('verb').decode().upper()
+    kind = match.group('object').decode().upper()
+    name = identifier(match.group('name'))
+    target = match.group('target')
+    changes = [(verb, kind, name, identifier(target) if target else None)]
+
+    if verb == 'ALTER' and kind == 'TABLE':
+        changes = []
+        for clause in statement[match.end():].split(b','):
+            action = COLUMN_ACTION_RE.match(clause)
+            if not action:
+                continue
+            column = identifier(action.group('column'))
+            if column.upper() not in NOT_A_COLUMN:
+                changes.append((action.group('action').decode().upper(), 'COLUMN', name, column))
+        changes = changes or [(verb, kind, name, None)]
+    return changes
+
+
+def is_statement_start(buffer, position):
+    # Solo cuenta como DDL lo que empieza una línea o sigue a un ';'
+    position -= 1
+    while position >= 0 and buffer[position] in b' \t\r':
+        position -= 1
+    return position < 0 or buffer[position] in STATEMENT_BOUNDARIES
+
+
+def ddl_starts(buffer):
+    # bytes.find es mucho más rápido que una regex sin prefijo literal sobre volcados grandes
+    lowered = buffer.lower()
+    starts = []
+    for keyword in DDL_KEYWORDS:
+        position = lowered.find(keyword)
+        while position >= 0:
+            if is_statement_start(buffer, position):
+                starts.append(position)
+            position = lowered.find(keyword, position + len(keyword))
+    return sorted(starts)
+
+
+def iter_ddl(chunks):
+    carry = b''
+    for chunk in chunks:
+        buffer = carry + chunk if carry else chunk
+        position = 0
+        pending = None
+        for start in ddl_starts(buffer):
+            if start < position:
+                continue
+            end = buffer.find(b';', start)
+            if end < 0:
+                pending = start
+                break
+            yield from parse_statement(buffer[start:end])
+            position = end + 1
+
+        if pending is not None:
+            carry = buffer[pending:]
+            if len(carry) > MAX_STATEMENT_BYTES:
+                # Sentencia enorme: la cabecera basta para saber qué objeto cambia
+                yield from parse_statement(carry[:MAX_STATEMENT_BYTES])
+                carry = b''
+        else:
+            # Se conserva la última línea incompleta por si un CREATE quedó partido entre bloques
+            cut = max(buffer.rfind(b'\n'), buffer.rfind(b';'), position - 1)
+            carry = buffer[cut + 1:]
+            if len(carry) > MAX_STATEMENT_BYTES:
+                carry = b''
+    if carry:
+        yield from parse_statement(carry)
+
+
+def iter_blob_ddl(root, oid):
+    if not oid or oid == NULL_OID:
+        return iter(())
+    return iter_ddl(git_runner.iter_chunks(["git", "cat-file", "blob", oid], root))
+
+
+def tracked_changes(changes):
+    seen = {}
+    for change in changes:
+        if change not in seen and len(seen) < MAX_TRACKED_CHANGES:
+            seen[change] = None
+    return seen
+
+
+class SqlFileSummary:
+    def __init__(self, path, status):
+        self.path = path
+        self.status = status
+        self.changes = []
+
+    def counts(self):
+        return Counter((verb, kind) for verb, kind, _, _ in self.changes)
+
+
+class SchemaSummary:
+    def __init__(self):
+        self.files = []
+
+    def totals(self):
+        totals = Counter()
+        for summary in self.files:
+            totals.update(summary.counts())
+        return totals
+
+
+@profiling.profiled('summarize_sql_changes')
+def summarize_sql_changes(root, blob_changes):
+    schema = SchemaSummary()
+    for path, old_oid, new_oid in blob_changes:
+        if not path.lower().endswith(SQL_SUFFIXES):
+            continue
+        if new_oid == NULL_OID:
+            schema.files.append(SqlFileSummary(path, 'eliminado'))
+            continue
+        summary = SqlFileSummary(path, 'nuevo' if old_oid == NULL_OID else 'modificado')
+        new_changes = tracked_changes(iter_blob_ddl(root, new_oid))
+        if old_oid != NULL_OID:
+            for change in iter_blob_ddl(root, old_oid):
+                new_changes.pop(change, None)
+        summary.changes = list(new_changes)
+        schema.files.append(summary)
+    return schema
+
+
+def describe_change(change):
+    verb, kind, name, detail = change
+    if kind == 'COLUMN':
+        return f"ALTER TABLE `{name}`: {verb} COLUMN `{detail}`"
+    if detail:
+        return f"{verb} {kind} `{name}` ON `{detail}`"
+    return f"{verb} {kind} `{name}`"
+
+
+def format_schema_summary(schema):
+    lines = []
+    totals = schema.totals()
+    if totals:
+        parts = [f"{verb} {kind}: {count}" for (verb, kind), count in sorted(totals.items())]
+        lines.append("**Cambios de esquema:** " + ", ".join(parts))
+    for summary in schema.files:
+        lines.append(f"- {summary.path} ({summary.status})")
+        for change in summary.changes[:MAX_LISTED_CHANGES]:
+            lines.append(f"  - {describe_change(change)}")
+        if len(summary.changes) > MAX_LISTED_CHANGES:
+            lines.append(f"  - … y {len(summary.changes) - MAX_LISTED_CHANGES} cambios más")
+    return "\n".join(lines)
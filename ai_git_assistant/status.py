@@ -0,0 +1,117 @@
+import os
+from collections import namedtuple
+
+from . import git_runner, profiling
+
+StatusEntry = namedtuple(
+    'StatusEntry',
+    ['path', 'xy', 'mode_head', 'mode_index', 'mode_worktree', 'oid_head', 'oid_index', 'orig_path']
+)
+
+NULL_OID = '0' * 40
+BACKEND_ENV = 'AI_GIT_ASSISTANT_STATUS_BACKEND'
+
+
+class RepoStatus:
+    def __init__(self, root, entries, untracked):
+        self.root = str(root)
+        self.entries = entries
+        self.untracked_paths = untracked
+
+    @classmethod
+    def load(cls, root=None, untracked='all', backend=None):
+        return git_runner.get_runner().call(cls.load_async(root, untracked, backend))
+
+    @classmethod
+    async def load_async(cls, root=None, untracked='all', backend=None):
+        import asyncio
+
+        root = root or os.getcwd()
+        backend = backend or os.environ.get(BACKEND_ENV, 'git')
+        if backend == 'index':
+            from .git_index import IndexStatusReader, UnsupportedIndex
+
+            def read_index():
+                try:
+                    return IndexStatusReader(root).read(untracked)
+                except (UnsupportedIndex, OSError):
+                    profiling.count('index_backend_fallbacks')
+                    return None
+
+            status = await asyncio.get_running_loop().run_in_executor(None, read_index)
+            if status is not None:
+                return status
+        args = ["git", "--no-optional-locks", "status", "--porcelain=v2", "-z", f"--untracked-files={untracked}"]
+        result = await git_runner.get_runner().run_async(args, root)
+        if result.returncode != 0:
+            return cls(root, [], [])
+        return cls.from_porcelain(result.stdout, root)
+
+    @classmethod
+    def from_porcelain(cls, output, root):
+        entries = []
+        untracked = []
+        records = output.split('\0')
+        i = 0
+        while i < len(records):
+            record = records[i]
+            i += 1
+            if not record:
+                continue
+            kind = record[0]
+            if kind == '1':
+                fields = record.split(' ', 8)
+                entries.append(StatusEntry(fields[8], fields[1], fields[3], fields[4], fields[5],
+                                           fields[6], fields[7], None))
+            elif kind == '2':
+                fields = record.split(' ', 9)
+                orig_path = records[i] if i < len(records) else None
+                i += 1
+                entries.append(StatusEntry(fields[9], fields[1], fields[3], fields[4], fields[5],
+                                           fields[6], fields[7], orig_path))
+            elif kind == 'u':
+                fields = record.split(' ', 10)
+                # En conflictos: stage 1 (base) como HEAD y stage 2 (ours) como índice
+                entries.append(StatusEntry(fields[10], fields[1], fields[3], fields[4], fields[6],
+                                           fields[7], fields[8], None))
+            elif kind == '?':
+                untracked.append(record[2:])
+        return cls(root, entries, untracked)
+
+    def abspath(self, path):
+        return os.path.join(self.root, path)
+
+    @property
+    def staged_entries(self):
+        return [e for e in self.entries if e.xy[0] != '.']
+
+    @property
+    def unstaged_entries(self):
+        return [e for e in self.entries if e.xy[1] != '.']
+
+    @property
+    def renamed_entries(self):
+        return [e for e in self.entries if e.orig_path is not None]
+
+    @property
+    def staged(self):
+        return [self.abspath(e.path) for e in self.staged_entries]
+
+    @property
+    def unstaged(self):
+        return [self.abspath(e.path) for e in self.unstaged_entries]
+
+    @property
+    def untracked(self):
+        return [self.abspath(p) for p in self.untracked_paths]
+
+    @property
+    def renamed(self):
+        return [(self.abspath(e.orig_path), self.abspath(e.path)) for e in self.renamed_entries]
+
+    def as_dict(self):
+        return {
+            "staged": self.staged,
+            "unstaged": self.unstaged,
+            "untracked": self.untracked
+        }
@@ -0,0 +1,188 @@
+import hashlib
+import json
+import os
+import re
+from collections import Counter
+
+from .config import config_section, config_signature
+
+WORD_RE = re.compile(r'\b\w+\b')
+NAME_SEPARATOR_RE = re.compile(r'[\W_]+')
+MATCHER_VERSION = 2
+VOWELS = 'aeiou'
+
+# Tipos y palabras con los que se entrena el modelo por defecto
+TYPES = {
+    'feat': ['add', 'create', 'implement', 'new', 'feature'],
+    'fix': ['fix', 'bug', 'error', 'issue', 'resolve', 'solve'],
+    'refactor': ['refactor', 'restructure', 'clean', 'improve', 'simplify'],
+    'chore': ['update', 'upgrade', 'bump', 'maintain', 'setup'],
+    'test': ['test', 'assert', 'coverage', 'spec', 'validate'],
+    'docs': ['document', 'comment', 'readme', 'guide', 'wiki'],
+    'style': ['style', 'format', 'indent', 'css', 'layout'],
+    'perf': ['performance', 'optimize', 'speed', 'efficiency', 'faster']
+}
+
+EXTRA_TYPE_KEYWORDS = {
+    'feat': ['agregar', 'agrega', 'añadir', 'añade', 'crear', 'crea', 'implementar', 'implementa', 'nuevo', 'nueva'],
+    'fix': ['bugfix', 'hotfix', 'corregir', 'corrige', 'arreglar', 'arregla', 'solucionar', 'soluciona', 'reparar',
+            'falla'],
+    'refactor': ['refactorizar', 'refactoriza', 'reestructurar', 'limpiar', 'simplificar', 'simplifica'],
+    'chore': ['actualizar', 'actualiza', 'mantenimiento', 'configurar', 'dependencias'],
+    'test': ['prueba', 'pruebas', 'cobertura', 'validar', 'valida'],
+    'docs': ['documentar', 'documentación', 'documenta', 'comentario', 'guía'],
+    'style': ['estilo', 'estilos', 'formato', 'formatear', 'indentación'],
+    'perf': ['rendimiento', 'optimizar', 'optimiza', 'velocidad', 'eficiencia', 'rápido'],
+}
+
+DEFAULT_TYPE_KEYWORDS = {t: keywords + EXTRA_TYPE_KEYWORDS.get(t, []) for t, keywords in TYPES.items()}
+
+DEFAULT_ACTION_KEYWORDS = {
+    'add': ['agregar', 'añadir', 'crear', 'implementar', 'nuevo', 'add', 'create', 'implement', 'new'],
+    'fix': ['arreglar', 'corregir', 'solucionar', 'reparar', 'fix', 'repair', 'resolve'],
+    'update': ['actualizar', 'mejorar', 'modificar', 'cambiar', 'update', 'improve', 'modify', 'change'],
+    'remove': ['eliminar', 'quitar', 'borrar', 'remover', 'remove', 'delete', 'drop'],
+    'refactor': ['refactorizar', 'reestructurar', 'simplificar', 'refactor', 'restructure', 'simplify'],
+}
+
+DEFAULT_ACTION_TYPES = {
+    'add': 'feat',
+    'fix': 'fix',
+    'update': 'chore',
+    'remove': 'refactor',
+    'refactor': 'refactor',
+}
+
+FALLBACK_TYPES = {'code': 'feat', 'docs': 'docs', 'test': 'test', 'style': 'style'}
+
+DEFAULT_STOP_WORDS = [
+    'the', 'a', 'an', 'in', 'to', 'of', 'and', 'or', 'for', 'with', 'on', 'at',
+    'el', 'la', 'los', 'las', 'un', 'una', 'de', 'del', 'en', 'y', 'o', 'para', 'con', 'por', 'que',
+]
+
+
+def keyword_weights(keywords):
+    if isinstance(keywords, dict):
+        return {k.lower(): float(w) for k, w in keywords.items()}
+    return {k.lower(): 1.0 for k in keywords}
+
+
+def inflections(keyword):
+    # Formas flexionadas que cuentan como la palabra clave: fixes, tests, optimized, corregido...
+    if len(keyword) > 4 and keyword[-2:] in ('ar', 'ir'):
+        stem = keyword[:-2] + keyword[-2]
+        return {stem + 'do', stem + 'da', stem + 'dos', stem + 'das'}
+    if keyword.endswith('e'):
+        stem = keyword[:-1]
+        return {keyword + 's', keyword + 'd', keyword + 'r', keyword + 'rs', stem + 'ing', stem + 'ion', stem + 'ation'}
+    if keyword.endswith('y') and keyword[-2:-1] not in VOWELS:
+        stem = keyword[:-1]
+        return {stem + 'ies', stem + 'ied', stem + 'ication', keyword + 'ing'}
+    plural = keyword + ('es' if keyword.endswith(('s', 'x', 'z', 'ch', 'sh')) else 's')
+    short = len(keyword) == 3 and keyword[1] in VOWELS and keyword[2] not in VOWELS + 'wxy'
+    base = keyword + keyword[-1] if short else keyword
+    forms = {plural, base + 'ed', base + 'ing', base + 'er', base + 'ers'}
+    if len(keyword) > 4:
+        forms.add(keyword + 'ation')
+    return forms
+
+
+def merge_groups(defaults, configured):
+    groups = {name: keyword_weights(keywords) for name, keywords in defaults.items()}
+    for name, keywords in configured.items():
+        groups.setdefault(name, {}).update(keyword_weights(keywords))
+    return groups
+
+
+class Taxonomy:
+    def __init__(self, types, actions, action_types=None, stop_words=()):
+        self.type_order = list(types)
+        self.action_order = list(actions)
+        self.action_types = dict(action_types or DEFAULT_ACTION_TYPES)
+        self.stop_words = frozenset(w.lower() for w in stop_words)
+        # Palabra -> [(grupo, etiqueta, peso)]; las frases de varias palabras van a una sola regex.
+        # Las formas flexionadas se precalculan en el mismo dict, sin pisar palabras explícitas.
+        self.words = {}
+        self.phrases = {}
+        inflected = {}
+        for group, labels in (('types', types), ('actions', actions)):
+            for label, keywords in labels.items():
+                for keyword, weight in keywords.items():
+                    if weight <= 0:
+                        continue
+                    if not WORD_RE.fullmatch(keyword):
+                        self.phrases.setdefault(keyword, []).append((group, label, weight))
+                        continue
+                    self.words.setdefault(keyword, []).append((group, label, weight))
+                    for form in inflections(keyword):
+                        targets = inflected.setdefault(form, {})
+                        targets[group, label] = max(weight, targets.get((group, label), 0))
+        for form, targets in inflected.items():
+            if form not in self.words:
+                self.words[form] = [(group, label, weight) for (group, label), weight in targets.items()]
+        alternation = '|'.join(re.escape(p) for p in sorted(self.phrases, key=len, reverse=True))
+        self.phrase_matcher = re.compile(rf'\b(?:{alternation})\b') if self.phrases else None
+        payload = json.dumps([MATCHER_VERSION, types, actions, self.action_types, sorted(self.stop_words)],
+                             sort_keys=True)
+        self.key = hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+    @classmethod
+    def from_config(cls, root=None):
+        section = config_section(root, 'taxonomy')
+        types = merge_groups(DEFAULT_TYPE_KEYWORDS, section.get('types', {}))
+        actions = merge_groups(DEFAULT_ACTION_KEYWORDS, section.get('actions', {}))
+        action_types = dict(DEFAULT_ACTION_TYPES)
+        action_types.update(section.get('action_types', {}))
+        stop_words = section.get('stop_words', []) + DEFAULT_STOP_WORDS
+        return cls(types, actions, action_types, stop_words)
+
+    def score(self, words, text=None):
+        type_scores = Counter()
+        action_scores = Counter()
+        scores = {'types': type_scores, 'actions': action_scores}
+        for word in words:
+            for group, label, weight in self.words.get(word, ()):
+                scores[group][label] += weight
+        if self.phrase_matcher is not None and text:
+            for phrase in set(self.phrase_matcher.findall(text.lower())):
+                for group, label, weight in self.phrases[phrase]:
+                    scores[group][label] += weight
+        return type_scores, action_scores
+
+    def score_name(self, name):
+        # Ramas como 'bugfix/login_form': se separa también por '_' y '/'
+        lowered = name.lower()
+        return self.score(set(NAME_SEPARATOR_RE.split(lowered)), NAME_SEPARATOR_RE.sub(' ', lowered))
+
+    def best_type(self, type_scores, default='chore'):
+        return self.best(self.type_order, type_scores, default)
+
+    def best_action(self, action_scores, default='update'):
+        return self.best(self.action_order, action_scores, default)
+
+    def fallback_type(self, branch, file_type):
+        # Sin diff suficiente: el nombre de la rama decide y, si no dice nada, el tipo de archivo
+        commit_type = self.best_type(self.score_name(branch)[0])
+        if commit_type == 'chore':
+            commit_type = FALLBACK_TYPES.get(file_type, commit_type)
+        return commit_type
+
+    @staticmethod
+    def best(order, scores, default):
+        # Empates: gana el primero en el orden de la taxonomía
+        best = max(order, key=lambda label: scores.get(label, 0), default=None)
+        return best if best is not None and scores.get(best, 0) > 0 else default
+
+
+_taxonomies = {}
+
+
+def get_taxonomy(root=None, refresh=False):
+    root = os.path.abspath(str(root or os.getcwd()))
+    cached = _taxonomies.get(root)
+    if cached is not None and not refresh:
+        return cached[1]
+    signature = config_signature(root)
+    if cached is None or cached[0] != signature:
+        cached = _taxonomies[root] = (signature, Taxonomy.from_config(root))
+    return cached[1]
@@ -0,0 +1,161 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from unittest.mock import patch
+
+from benchmarks.synthetic import create_repo, unstage
+
+DEFAULT_THRESHOLD = 0.25
+NOISE_FLOOR_MS = 1.0
+
+
+def measure(func, repeat, setup=None, teardown=None):
+    timings = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+        if teardown:
+            teardown()
+    return {
+        'median_ms': round(statistics.median(timings), 3),
+        'min_ms': round(min(timings), 3),
+        'runs': repeat,
+    }
+
+
+def run_benchmarks(tracked, untracked, modified, diff_lines, repeat=5, workdir=None):
+    workdir = workdir or tempfile.mkdtemp(prefix='ai-git-bench-')
+    # La caché del modelo va al directorio temporal solo mientras dura la medición
+    with patch.dict(os.environ, {'XDG_CACHE_HOME': os.path.join(workdir, 'cache')}):
+        repo = create_repo(os.path.join(workdir, 'repo'), tracked, untracked, modified, diff_lines)
+
+        from ai_git_assistant import __main__ as cli
+
+        previous_cwd = os.getcwd()
+        os.chdir(repo['root'])
+        results = {}
+        try:
+            with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+                results['git_status_info'] = measure(
+                    cli.git_status_info, repeat, setup=cli.invalidate_repo_status)
+                results['add_files'] = measure(
+                    lambda: cli.add_files(repo['untracked']), repeat,
+                    teardown=lambda: unstage(repo['root'], repo['untracked']))
+
+                staged = repo['staged']
+                results['analyze_changes'] = measure(lambda: cli.analyze_changes(staged), repeat)
+                changes_text, file_type = cli.analyze_changes(staged)
+
+                cli.load_default_model()
+                results['model_load'] = measure(cli.load_default_model, repeat)
+                model = cli.load_default_model()
+                results['model_predict'] = measure(lambda: model.predict_proba([changes_text]), repeat)
+
+                generators = {
+                    'generate_ml_based_message': lambda: cli.generate_ml_based_message(
+                        'main', staged, changes_text, file_type, model),
+                    'generate_file_type_message': lambda: cli.generate_file_type_message(staged, file_type),
+                    'generate_thematic_message': lambda: cli.generate_thematic_message(changes_text, staged),
+                    'generate_descriptive_message': lambda: cli.generate_descriptive_message(
+                        changes_text, staged, file_type),
+                    'generate_action_message': lambda: cli.generate_action_message(changes_text, staged),
+                    'suggest_commit_messages': lambda: cli.suggest_commit_messages(
+                        'main', staged, changes_text, file_type, model),
+                }
+                for name, func in generators.items():
+                    results[name] = measure(func, repeat)
+
+                with patch('builtins.input', return_value=''):
+                    results['generate_pr_template'] = measure(
+                        lambda: cli.generate_pr_template('main', staged, 'feat: benchmark'), repeat)
+        finally:
+            os.chdir(previous_cwd)
+
+    return {
+        'params': {
+            'tracked': tracked,
+            'untracked': untracked,
+            'modified': modified,
+            'diff_lines': diff_lines,
+            'repeat': repeat,
+        },
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'git': subprocess.run(["git", "--version"], capture_output=True, text=True).stdout.strip(),
+        },
+        'results': results,
+    }
+
+
+def compare(current, baseline, threshold=DEFAULT_THRESHOLD):
+    regressions = []
+    if current['params'] != baseline.get('params'):
+        return regressions
+    for name, result in current['results'].items():
+        previous = baseline['results'].get(name)
+        if not previous:
+            continue
+        limit = previous['median_ms'] * (1 + threshold)
+        if result['median_ms'] > limit and result['median_ms'] - previous['median_ms'] > NOISE_FLOOR_MS:
+            regressions.append((name, previous['median_ms'], result['median_ms']))
+    return regressions
+
+
+def format_results(data):
+    lines = [f"{'Operación':<32} {'Mediana ms':>12} {'Mín ms':>10}", '-' * 56]
+    for name, result in data['results'].items():
+        lines.append(f"{name:<32} {result['median_ms']:>12.3f} {result['min_ms']:>10.3f}")
+    return '\n'.join(lines)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description='Benchmarks de ai-git-assistant sobre repositorios sintéticos')
+    parser.add_argument('--tracked', type=int, default=2000, help='Archivos versionados')
+    parser.add_argument('--untracked', type=int, default=500, help='Archivos sin seguimiento')
+    parser.add_argument('--modified', type=int, default=200, help='Archivos modificados y en staging')
+    parser.add_argument('--diff-lines', type=int, default=50, help='Líneas agregadas por archivo modificado')
+    parser.add_argument('--repeat', type=int, default=5, help='Repeticiones por operación')
+    parser.add_argument('--output', help='Guarda los resultados en este JSON')
+    parser.add_argument('--baseline', help='JSON de referencia para detectar regresiones')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='Aumento relativo de la mediana que se considera regresión')
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    data = run_benchmarks(args.tracked, args.untracked, args.modified, args.diff_lines, args.repeat)
+    print(format_results(data))
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get('params') != data['params']:
+            print("⚠️ La referencia usa otros parámetros; no se compara.")
+            return 0
+        regressions = compare(data, baseline, args.threshold)
+        for name, before, after in regressions:
+            print(f"❌ Regresión en {name}: {before:.3f} ms → {after:.3f} ms")
+        if regressions:
+            return 1
+        print("✅ Sin regresiones respecto a la referencia")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
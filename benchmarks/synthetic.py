@@ -0,0 +1,66 @@
+import os
+import random
+import subprocess
+
+WORDS = ['add', 'fix', 'update', 'parser', 'handler', 'error', 'cache', 'config', 'user', 'invoice',
+         'payment', 'render', 'validate', 'request', 'response', 'session', 'token', 'index', 'report']
+EXTENSIONS = ['.py', '.js', '.md', '.json', '.css', '.sql', '.txt', '.ts']
+
+
+def git(repo, *args, input=None):
+    return subprocess.run(
+        ["git", "-c", "user.name=bench", "-c", "user.email=bench@example.com", *args],
+        cwd=repo, check=True, capture_output=True, text=True, input=input
+    ).stdout
+
+
+def random_line(rng):
+    return ' '.join(rng.choice(WORDS) for _ in range(8))
+
+
+def write_file(path, lines, rng):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        for _ in range(lines):
+            f.write(random_line(rng) + '\n')
+
+
+def file_path(root, prefix, index, rng):
+    directory = os.path.join(root, f'pkg{index % 20}', f'mod{index % 7}')
+    return os.path.join(directory, f'{prefix}{index}{rng.choice(EXTENSIONS)}')
+
+
+def create_repo(root, tracked=200, untracked=50, modified=20, diff_lines=50, seed=0):
+    rng = random.Random(seed)
+    os.makedirs(root, exist_ok=True)
+    git(root, "init", "-q")
+
+    tracked_paths = [file_path(root, 'file', i, rng) for i in range(tracked)]
+    for path in tracked_paths:
+        write_file(path, 10, rng)
+    git(root, "add", "-A")
+    git(root, "commit", "-q", "-m", "chore: initial commit")
+
+    modified_paths = tracked_paths[:modified]
+    for path in modified_paths:
+        with open(path, 'a', encoding='utf-8') as f:
+            for _ in range(diff_lines):
+                f.write(random_line(rng) + '\n')
+    if modified_paths:
+        git(root, "add", "--pathspec-from-file=-", "--pathspec-file-nul", input='\0'.join(modified_paths))
+
+    untracked_paths = [file_path(root, 'new', i, rng) for i in range(untracked)]
+    for path in untracked_paths:
+        write_file(path, 5, rng)
+
+    return {
+        'root': root,
+        'tracked': tracked_paths,
+        'staged': modified_paths,
+        'untracked': untracked_paths,
+    }
+
+
+def unstage(root, paths):
+    if paths:
+        git(root, "reset", "-q", "--pathspec-from-file=-", "--pathspec-file-nul", input='\0'.join(paths))
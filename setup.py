@@ -23,11 +23,11 @@ setup(
     install_requires=[
         "scikit-learn",
         "numpy",
-        "joblib",
     ],
     entry_points={
         "console_scripts": [
             "ai-git-assistant=ai_git_assistant.__main__:main",  
+            "ai-git-assistant-hook=ai_git_assistant.hook:main",
         ],
     },
     extras_require={
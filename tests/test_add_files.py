@@ -0,0 +1,40 @@
+from ai_git_assistant.__main__ import add_files, parse_rejected_paths
+from .conftest import git
+
+def test_parse_rejected_paths():
+    stderr = (
+        "The following paths are ignored by one of your .gitignore files:\n"
+        "build.log\n"
+        "hint: Use -f if you really want to add them.\n"
+        "fatal: pathspec 'falta.txt' did not match any files\n"
+    )
+    assert parse_rejected_paths(stderr) == {"build.log", "falta.txt"}
+
+def test_add_files_in_bulk_with_rejected_path(tmp_path, monkeypatch):
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    git(repo, "init")
+    (repo / ".gitignore").write_text("*.log\n")
+    for i in range(20):
+        (repo / f"f{i}.txt").write_text(f"{i}\n")
+    (repo / "build.log").write_text("log\n")
+    monkeypatch.chdir(repo)
+
+    files = [str(repo / f"f{i}.txt") for i in range(20)]
+    added = add_files(files + [str(repo / "build.log"), str(repo / "falta.txt")])
+
+    assert added == 20
+    staged = git(repo, "diff", "--cached", "--name-only").split()
+    assert sorted(staged) == sorted(f"f{i}.txt" for i in range(20))
+
+def test_glob_characters_in_paths_are_literal(tmp_path, monkeypatch):
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    git(repo, "init")
+    for name in ("a[1].txt", "a1.txt", "x*.txt", "xa.txt", "xb.txt"):
+        (repo / name).write_text("x\n")
+    monkeypatch.chdir(repo)
+
+    assert add_files([str(repo / "a[1].txt"), str(repo / "x*.txt")]) == 2
+    staged = git(repo, "diff", "--cached", "--name-only", "-z").split("\0")
+    assert sorted(p for p in staged if p) == ["a[1].txt", "x*.txt"]
@@ -0,0 +1,49 @@
+import os
+import pytest
+from ai_git_assistant import __main__ as cli
+from ai_git_assistant.analysis_cache import AnalysisCache, staged_blob_triples
+from .conftest import git
+
+@pytest.fixture
+def repo(tmp_path, cache_home):
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    git(repo, "init")
+    (repo / "a.py").write_text("x = 1\n")
+    git(repo, "add", ".")
+    git(repo, "commit", "-m", "init")
+    (repo / "a.py").write_text("def fix_error():\n    return 'bug resuelto'\n")
+    git(repo, "mv", "a.py", "b.py")
+    git(repo, "add", "b.py")
+    return repo
+
+def test_staged_blob_triples(repo):
+    triples = staged_blob_triples(str(repo))
+    assert [path for path, _, _ in triples] == ["a.py", "b.py"]
+    assert all(len(oid) == 40 for _, old, new in triples for oid in (old, new))
+
+def test_unchanged_index_skips_analysis_and_inference(repo, monkeypatch):
+    files = [str(repo / "b.py")]
+    first, file_type, coverage = cli.compute_suggestions("main", files, repo)
+    assert first and file_type == "code"
+
+    def fail(*args, **kwargs):
+        raise AssertionError("no debería recalcularse")
+    monkeypatch.setattr(cli, "sample_changes", fail)
+    monkeypatch.setattr(cli, "load_or_train_model", fail)
+    assert cli.compute_suggestions("main", files, repo) == (first, file_type, coverage)
+
+    (repo / "b.py").write_text("print('otro cambio')\n")
+    git(repo, "add", "b.py")
+    with pytest.raises(AssertionError):
+        cli.compute_suggestions("main", files, repo)
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = AnalysisCache(str(tmp_path / "analysis"), max_entries=2)
+    for index, key in enumerate(["uno", "dos", "tres"]):
+        cache.put(key, {"n": index})
+        os.utime(cache.entry_path(key), ns=(index, index))
+        cache.evict()
+    assert cache.get("uno") is None
+    assert cache.get("dos") == {"n": 1}
+    assert cache.get("tres") == {"n": 2}
@@ -0,0 +1,48 @@
+import json
+import subprocess
+import pytest
+from ai_git_assistant.__main__ import main
+from .conftest import git
+
+def make_repo(path, staged_name):
+    path.mkdir()
+    git(path, "init")
+    (path / "README.md").write_text("# repo\n")
+    git(path, "add", ".")
+    git(path, "commit", "-m", "docs: init")
+    (path / staged_name).write_text("def fix_bug():\n    return 'error resuelto'\n")
+    git(path, "add", staged_name)
+    (path / "suelto.txt").write_text("x\n")
+    return path
+
+pytestmark = pytest.mark.usefixtures("cache_home")
+
+def test_json_report_for_several_repos(tmp_path, capsys):
+    first = make_repo(tmp_path / "uno", "app.py")
+    second = make_repo(tmp_path / "dos", "lib.py")
+
+    main(["--json", "--repo", str(first), "--repo", str(second), "--jobs", "2"])
+    reports = json.loads(capsys.readouterr().out)
+
+    assert [r["repo"] for r in reports] == [str(first), str(second)]
+    for report in reports:
+        assert report["files"]["untracked"][0]["path"].endswith("suelto.txt")
+        assert report["files"]["staged"][0]["type"] == "code"
+        assert report["suggestions"]
+        assert report["pr_template"].startswith("## Descripción")
+
+    status = subprocess.run(["git", "status", "--porcelain"], cwd=first, capture_output=True, text=True)
+    assert "A  app.py" in status.stdout
+
+def test_non_git_path_is_reported(tmp_path, capsys):
+    main(["--json", "--repo", str(tmp_path)])
+    report = json.loads(capsys.readouterr().out)
+    assert report["error"]
+
+def test_batch_flags_do_not_hijack_subcommands(tmp_path, capsys, monkeypatch):
+    repo = make_repo(tmp_path / "repo", "app.py")
+    monkeypatch.chdir(repo)
+    monkeypatch.setattr("ai_git_assistant.__main__.run_batch", lambda *a: pytest.fail("modo lote"))
+
+    main(["--json", "train", "--from-history"])
+    assert "1 commits nuevos procesados" in capsys.readouterr().out
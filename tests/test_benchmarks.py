@@ -0,0 +1,22 @@
+import os
+from benchmarks.run import compare, run_benchmarks
+
+def test_benchmark_harness_runs_on_small_repo(tmp_path, monkeypatch):
+    monkeypatch.setattr("sys.platform", "linux")
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "user-cache"))
+    data = run_benchmarks(tracked=20, untracked=5, modified=4, diff_lines=5, repeat=1, workdir=str(tmp_path))
+    assert os.environ["XDG_CACHE_HOME"] == str(tmp_path / "user-cache")
+    assert (tmp_path / "cache").is_dir()
+
+    expected = {'git_status_info', 'add_files', 'analyze_changes', 'model_load', 'model_predict',
+                'generate_ml_based_message', 'generate_file_type_message', 'generate_thematic_message',
+                'generate_descriptive_message', 'generate_action_message', 'generate_pr_template'}
+    assert expected <= set(data['results'])
+    assert all(result['median_ms'] >= 0 for result in data['results'].values())
+
+def test_compare_flags_regressions():
+    params = {'tracked': 1}
+    baseline = {'params': params, 'results': {'a': {'median_ms': 10.0}, 'b': {'median_ms': 10.0}}}
+    current = {'params': params, 'results': {'a': {'median_ms': 20.0}, 'b': {'median_ms': 10.5}}}
+    assert compare(current, baseline) == [('a', 10.0, 20.0)]
+    assert compare(current, {'params': {'tracked': 2}, 'results': baseline['results']}) == []
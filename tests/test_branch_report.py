@@ -0,0 +1,52 @@
+import pytest
+from ai_git_assistant import __main__ as cli
+from ai_git_assistant.branch_report import collect_branch_report
+from .conftest import git
+
+@pytest.fixture
+def repo(tmp_path):
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    git(repo, "init", "-b", "main")
+    (repo / "viejo.py").write_text("x = 1\n")
+    git(repo, "add", ".")
+    git(repo, "commit", "-m", "init")
+
+    git(repo, "checkout", "-b", "feature/reportes")
+    (repo / "src" / "api").mkdir(parents=True)
+    (repo / "src" / "api" / "vistas.py").write_text("a = 1\nb = 2\n")
+    (repo / "db").mkdir()
+    (repo / "db" / "001.sql").write_text("CREATE TABLE t (id INT);\n")
+    git(repo, "add", ".")
+    git(repo, "commit", "-m", "feat(api): agrega vistas")
+    git(repo, "mv", "viejo.py", "src/nuevo.py")
+    (repo / "logo.png").write_bytes(b"\x00\x01\x02")
+    git(repo, "add", ".")
+    git(repo, "commit", "-m", "refactor: mueve modulo")
+    (repo / "src" / "nuevo.py").write_text("x = 2\n")
+    (repo / "README.md").write_text("# Reportes\n")
+    git(repo, "add", ".")
+    git(repo, "commit", "-m", "fix: corrige valor")
+    git(repo, "commit", "--allow-empty", "-m", "wip")
+    return repo
+
+def test_branch_report_aggregates_commits_files_and_components(repo):
+    report = collect_branch_report(str(repo), cli.TYPES)
+    assert report.base == "main" and report.branch == "feature/reportes"
+    assert report.commits == 4
+    assert dict(report.commit_types) == {"feat": 1, "refactor": 1, "fix": 1, "otros": 1}
+    assert sorted(report.files) == ["README.md", "db/001.sql", "logo.png", "src/api/vistas.py", "src/nuevo.py"]
+    nuevo = report.files["src/nuevo.py"]
+    assert (nuevo.added, nuevo.removed, nuevo.old_path) == (1, 1, "viejo.py")
+    assert report.files["logo.png"].binary
+    assert report.components["src/api"] == 2
+    assert [subject for _, subject in report.recent][0] == "wip"
+
+def test_pr_command_writes_template(repo, monkeypatch):
+    monkeypatch.chdir(repo)
+    cli.main(["pr", "--output", "PR_suggest.md"])
+    content = (repo / "PR_suggest.md").read_text(encoding="utf-8")
+    assert "**Commits:** 4" in content
+    assert "- db/001.sql" in content.split("## Configuraciones")[1]
+    assert "- src/nuevo.py (antes `viejo.py`): +1 / -1" in content
+    assert "### Código (2 archivos, +3 / -1)" in content
@@ -0,0 +1,45 @@
+import json
+import pytest
+from ai_git_assistant import __main__ as cli
+from ai_git_assistant.classifier import FileClassifier, get_classifier
+
+@pytest.mark.parametrize("path, expected", [
+    ("src/app.py", "code"),
+    ("web/Boton.test.tsx", "test"),
+    ("a/b.spec.py", "test"),
+    ("tests/data.json", "test"),
+    ("pkg/test_modelo.py", "test"),
+    ("cmd/main_test.go", "test"),
+    ("src/migrations/0001_inicial.py", "db"),
+    ("db/Esquema.SQL", "db"),
+    ("package-lock.json", "lock"),
+    ("yarn.lock", "lock"),
+    ("Makefile", "config"),
+    ("README", "other"),
+    ("dist/archivo.tar.gz", "other"),
+])
+def test_default_classification(path, expected):
+    assert FileClassifier().file_type(path) == expected
+
+def test_repo_config_overrides_defaults(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CONFIG_HOME", str(tmp_path / "config"))
+    monkeypatch.setattr("sys.platform", "linux")
+    (tmp_path / ".ai-git-assistant.json").write_text(json.dumps({"classification": {
+        "suffixes": {".tf": "config", ".md": "other"},
+        "filenames": {"Justfile": "config"},
+        "patterns": [{"pattern": "^docs/", "type": "docs"}],
+    }}))
+    classifier = get_classifier(tmp_path, refresh=True)
+    assert classifier.file_type("infra/main.tf") == "config"
+    assert classifier.file_type("CHANGELOG.md") == "other"
+    assert classifier.file_type("Justfile") == "config"
+    assert classifier.file_type(str(tmp_path / "docs" / "api.py")) == "docs"
+    assert get_classifier(tmp_path) is classifier
+    assert cli.get_file_type("docs/x.py", tmp_path) == "docs"
+
+def test_pr_categories_follow_file_types():
+    classifier = FileClassifier()
+    grouped = classifier.group_by_category(["db/001.sql", "src/app.py", "tests/test_app.py", "guia.md", "logo.png"])
+    assert grouped == {"SQL": ["db/001.sql"], "Código": ["src/app.py", "tests/test_app.py"],
+                       "Documentación": ["guia.md"], "Otros": ["logo.png"]}
+    assert classifier.memo["tests/test_app.py"] == "test"
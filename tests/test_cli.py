@@ -0,0 +1,21 @@
+from unittest.mock import patch
+from ai_git_assistant import __main__ as cli
+from ai_git_assistant.git_runner import GitResult
+from ai_git_assistant.__main__ import git_status_info
+
+def test_git_status_info():
+    async def fake_run(args, cwd=None, *rest):
+        # Simula la salida de git status --porcelain=v2 -z
+        return GitResult(args, 0, (
+            "1 .M N... 100644 100644 100644 aaa aaa file1.txt\0"
+            "1 .M N... 100644 100644 100644 bbb bbb file2.txt\0"
+        ), "")
+
+    with patch('ai_git_assistant.git_runner.GitRunner.run_async', side_effect=fake_run):
+        cli.invalidate_repo_status()
+        
+        result = git_status_info()
+        assert isinstance(result, dict)
+        assert "unstaged" in result
+        assert [p.rsplit('/', 1)[-1] for p in result["unstaged"]] == ["file1.txt", "file2.txt"]
+        cli.invalidate_repo_status()
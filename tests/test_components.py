@@ -0,0 +1,67 @@
+import json
+import pytest
+from ai_git_assistant import __main__ as cli
+from ai_git_assistant import components
+from ai_git_assistant.components import ComponentIndex, component_scope, load_component_index
+from .conftest import git
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CONFIG_HOME", str(tmp_path / "config"))
+    monkeypatch.setattr("sys.platform", "linux")
+    repo = tmp_path / "repo"
+    for path in ["setup.py", "services/billing/pyproject.toml", "services/billing/plugins/stripe/package.json",
+                 "libs/ui/package.json", "services/billing/api/pagos.py", "libs/ui/src/boton.ts", "docs/guia.md"]:
+        (repo / path).parent.mkdir(parents=True, exist_ok=True)
+        (repo / path).write_text("x\n")
+    git(repo, "init")
+    git(repo, "add", ".")
+    git(repo, "commit", "-m", "init")
+    return repo
+
+def test_longest_prefix_lookup():
+    index = ComponentIndex({"services/billing": "billing", "services/billing/plugins/stripe": "stripe"})
+    assert index.lookup("services/billing/api/pagos.py") == "billing"
+    assert index.lookup("services/billing/plugins/stripe/index.js") == "stripe"
+    assert index.lookup("services/billing") is None
+    assert index.lookup("docs/guia.md") is None
+    assert index.scope(["services/billing/a.py", "services/billing/b.py", "docs/c.md"]) == "billing"
+    assert index.scope(["services/billing/a.py", "docs/c.md"]) is None
+
+def test_detects_package_roots_and_reuses_cache(repo, monkeypatch):
+    assert component_scope(str(repo), [str(repo / "services/billing/api/pagos.py")]) == "billing"
+    assert component_scope(str(repo), ["libs/ui/src/boton.ts"]) == "ui"
+    assert component_scope(str(repo), ["docs/guia.md"]) is None
+
+    monkeypatch.setattr(components, "detect_package_roots", lambda root: pytest.fail("se reconstruyó"))
+    assert component_scope(str(repo), ["services/billing/plugins/stripe/x.js"]) == "stripe"
+
+def test_commits_keep_index_until_a_marker_changes(repo, monkeypatch):
+    load_component_index(str(repo))
+    (repo / "docs" / "guia.md").write_text("y\n")
+    git(repo, "commit", "-am", "docs")
+    detect = components.detect_package_roots
+    calls = []
+    monkeypatch.setattr(components, "detect_package_roots", lambda root: calls.append(root) or detect(root))
+    assert component_scope(str(repo), ["libs/ui/src/boton.ts"]) == "ui"
+    assert calls == []
+
+    (repo / "libs" / "ui" / "package.json").write_text('{"name": "ui"}\n')
+    assert component_scope(str(repo), ["libs/ui/src/boton.ts"]) == "ui"
+    assert len(calls) == 1
+
+def test_new_marker_or_config_rebuilds_index(repo):
+    load_component_index(str(repo))
+    (repo / "docs" / "package.json").write_text("{}\n")
+    git(repo, "add", "docs/package.json")
+    assert component_scope(str(repo), ["docs/package.json", "docs/guia.md"]) == "docs"
+
+    (repo / ".ai-git-assistant.json").write_text(json.dumps({"components": {"libs": "frontend"}}))
+    assert component_scope(str(repo), ["libs/ui/src/boton.ts"]) == "frontend"
+    assert component_scope(str(repo), ["services/billing/api/pagos.py"]) is None
+
+def test_suggestions_carry_scope():
+    assert cli.with_scope("feat: agrega pagos", "billing") == "feat(billing): agrega pagos"
+    assert cli.with_scope("fix!: rompe api", "billing") == "fix(billing)!: rompe api"
+    assert cli.with_scope("feat(ui): boton", "billing") == "feat(ui): boton"
+    assert cli.generate_action_message("", ["a/b/c.py"], "billing").endswith("billing en c.py")
@@ -0,0 +1,60 @@
+import threading
+import time
+import pytest
+from ai_git_assistant import hook
+from ai_git_assistant.__main__ import SuggestionService
+from ai_git_assistant.daemon import make_server, send_request
+from .conftest import git
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch, cache_home):
+    monkeypatch.delenv("GIT_INDEX_FILE", raising=False)
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    git(repo, "init")
+    (repo / "app.py").write_text("def fix_error():\n    return 'bug resuelto'\n")
+    git(repo, "add", "app.py")
+    monkeypatch.chdir(repo)
+    return repo
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    socket_path = str(tmp_path / "d.sock")
+    monkeypatch.setattr("ai_git_assistant.hook.send_request",
+                        lambda request: send_request(request, socket_path))
+    server = make_server(SuggestionService().handle, socket_path)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield socket_path
+    server.shutdown()
+    server.server_close()
+
+def test_hook_uses_warm_daemon(repo, server):
+    first = send_request({"op": "suggest", "repo": str(repo)}, server)
+    assert first["message"]
+
+    start = time.perf_counter()
+    second = send_request({"op": "suggest", "repo": str(repo)}, server)
+    assert time.perf_counter() - start < 0.05
+    assert second == first
+
+    message_file = repo / "COMMIT_EDITMSG"
+    message_file.write_text("\n# Comentario de git\n")
+    assert hook.main([str(message_file)]) == 0
+    assert message_file.read_text() == first["message"] + "\n\n# Comentario de git\n"
+
+def test_hook_falls_back_without_daemon(repo, tmp_path, monkeypatch):
+    monkeypatch.setattr("ai_git_assistant.hook.send_request",
+                        lambda request: send_request(request, str(tmp_path / "missing.sock")))
+    monkeypatch.setattr("ai_git_assistant.scanner.scan_staged_changes", lambda *a: pytest.fail("escaneó"))
+    monkeypatch.setattr("ai_git_assistant.__main__.build_pr_template", lambda *a, **k: pytest.fail("plantilla"))
+    message_file = repo / "COMMIT_EDITMSG"
+    message_file.write_text("")
+    hook.main([str(message_file)])
+    assert message_file.read_text().strip()
+
+def test_hook_keeps_user_message(repo):
+    message_file = repo / "COMMIT_EDITMSG"
+    message_file.write_text("mensaje propio\n")
+    hook.main([str(message_file), "message"])
+    assert message_file.read_text() == "mensaje propio\n"
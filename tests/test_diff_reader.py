@@ -0,0 +1,47 @@
+from ai_git_assistant.diff_reader import iter_staged_diff, parse_diff_lines
+from ai_git_assistant.__main__ import analyze_changes
+from .conftest import git
+
+def test_parse_diff_lines():
+    diff = [
+        "diff --git a/app.py b/app.py\n",
+        "index 1111111..2222222 100644\n",
+        "--- a/app.py\n",
+        "+++ b/app.py\n",
+        "@@ -1,2 +1,2 @@\n",
+        " import os\n",
+        "-old = 1\n",
+        "+new = 2\n",
+        "--- no es cabecera\n",
+        "diff --git a/img.png b/img.png\n",
+        "new file mode 100644\n",
+        "Binary files /dev/null and b/img.png differ\n",
+    ]
+    records = list(parse_diff_lines(diff))
+    assert [r.path for r in records] == ["app.py", "img.png"]
+    assert records[0].added_lines == ["new = 2"]
+    assert records[0].removed_lines == ["old = 1", "-- no es cabecera"]
+    assert records[0].hunks == ["@@ -1,2 +1,2 @@"]
+    assert records[1].binary and records[1].new_file
+
+def test_staged_diff_and_analysis(tmp_path, monkeypatch):
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    git(repo, "init")
+    (repo / "viejo.py").write_text("x = 1\n")
+    git(repo, "add", ".")
+    git(repo, "commit", "-m", "init")
+
+    (repo / "viejo.py").write_text("x = 2\n")
+    (repo / "con espacio.md").write_text("# guía\n")
+    git(repo, "add", ".")
+
+    records = {r.path: r for r in iter_staged_diff(repo)}
+    assert set(records) == {"viejo.py", "con espacio.md"}
+    assert records["con espacio.md"].added_lines == ["# guía"]
+    assert records["viejo.py"].removed_count == 1
+
+    monkeypatch.chdir(repo)
+    changes_text, predominant = analyze_changes([str(repo / "viejo.py")])
+    assert changes_text == "x = 2"
+    assert predominant == "code"
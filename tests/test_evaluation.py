@@ -0,0 +1,53 @@
+from ai_git_assistant import __main__ as cli
+from ai_git_assistant.evaluation import BranchFileTypeFallback, classification_scores, load_corpus, time_split_folds
+from .conftest import git
+
+def test_time_split_never_trains_on_the_future():
+    splits = list(time_split_folds(23, 4))
+    assert len(splits) == 4
+    for train, test in splits:
+        assert max(train) < min(test)
+    assert splits[-1][1][-1] == 22
+
+def test_classification_scores():
+    scores = classification_scores(["fix", "fix", "docs", "feat"], ["fix", "docs", "docs", "fix"],
+                                   ["docs", "feat", "fix"])
+    assert scores["accuracy"] == 0.5
+    assert scores["per_class"]["fix"] == {"f1": 0.5, "support": 2}
+    assert scores["per_class"]["feat"] == {"f1": 0.0, "support": 1}
+
+def test_evaluate_command_reports_every_model(tmp_path, monkeypatch, capsys):
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    git(repo, "init")
+    samples = [("fix", "fix the null error bug in parser"), ("docs", "document the readme guide"),
+               ("feat", "add new export feature"), ("test", "assert coverage for the parser test")]
+    for i in range(24):
+        kind, text = samples[i % 4]
+        (repo / f"f{i}.txt").write_text(f"{text} {i}\n")
+        git(repo, "add", ".")
+        git(repo, "commit", "-m", f"{kind}: cambio {i}", f"--date=2024-01-{i + 1:02d}T00:00:00")
+
+    capsys.readouterr()
+    report = cli.evaluate_command(cli.build_parser().parse_args(
+        ["--json", "--repo", str(repo), "evaluate", "--folds", "3"]))
+    assert report["commits"] == 24 and report["folds"] == 3 and report["evaluated"] == 18
+    by_model = {r["model"]: r for r in report["results"]}
+    assert set(by_model) == {"tfidf_nb", "fallback", "tfidf_logreg", "hashed_nb"}
+    assert by_model["tfidf_nb"]["accuracy"] == 1.0
+    assert by_model["fallback"]["size_bytes"] == 0 and by_model["tfidf_nb"]["size_bytes"] > 0
+    assert all(r["predictions_per_second"] for r in report["results"])
+    assert '"per_class"' in capsys.readouterr().out
+
+    corpus = load_corpus(str(repo), cli.TYPES, 0)
+    assert len(corpus) == 24
+    assert corpus[0][1:] == ("fix", "fix the null error bug in parser 0", ["f0.txt"])
+    assert load_corpus(str(repo), cli.TYPES, 5) == corpus[-5:]
+
+def test_fallback_matches_the_cli_short_diff_path(tmp_path):
+    model = BranchFileTypeFallback(str(tmp_path), "main").fit([], [])
+    assert model.predict([["src/app.py", "src/util.py", "README.md"], ["docs/guia.md"], []]) == ["feat", "docs", "chore"]
+    assert cli.generate_ml_based_message("main", ["src/app.py"], "", "code", None).startswith("feat:")
+    model = BranchFileTypeFallback(str(tmp_path), "bugfix/login_form")
+    assert model.predict([["docs/guia.md"]]) == ["fix"]
+    assert cli.generate_ml_based_message("bugfix/login_form", ["docs/guia.md"], "", "docs", None).startswith("fix:")
@@ -0,0 +1,161 @@
+import os
+import struct
+import zlib
+
+import pytest
+
+from ai_git_assistant.git_index import IndexStatusReader, ObjectStore, UnsupportedIndex
+from ai_git_assistant.status import RepoStatus
+from .conftest import git
+
+
+def write(repo, name, content):
+    path = os.path.join(repo, name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(content)
+
+
+def summary(status):
+    return {
+        "staged": sorted((e.path, e.xy, e.orig_path) for e in status.staged_entries),
+        "unstaged": sorted((e.path, e.xy[1]) for e in status.unstaged_entries),
+        "untracked": sorted(status.untracked_paths),
+    }
+
+
+def assert_same_status(repo, untracked="all"):
+    expected = RepoStatus.load(repo, untracked, backend="git")
+    actual = IndexStatusReader(repo).read(untracked)
+    assert summary(actual) == summary(expected)
+
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    monkeypatch.setenv("HOME", str(tmp_path / "home"))
+    monkeypatch.setenv("XDG_CONFIG_HOME", str(tmp_path / "home" / ".config"))
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    git(repo, "init", "-q")
+    for i in range(40):
+        write(repo, f"src/pkg{i % 4}/mod{i}.py", f"valor = {i}\n")
+    write(repo, "docs/guia.md", "# Guía\n")
+    write(repo, "script.sh", "echo hola\n")
+    write(repo, ".gitignore", "*.log\nbuild/\n!importante.log\n")
+    write(repo, "src/.gitignore", "/generado.py\n")
+    os.symlink("guia.md", repo / "docs" / "enlace.md")
+    git(repo, "add", "-A")
+    git(repo, "commit", "-q", "-m", "inicial")
+    return repo
+
+
+def test_clean_repo_matches_porcelain(repo):
+    assert_same_status(repo)
+
+
+def test_worktree_and_index_changes_match_porcelain(repo):
+    write(repo, "src/pkg0/mod0.py", "valor = 'cambiado'\n")
+    os.remove(repo / "src/pkg1/mod1.py")
+    os.chmod(repo / "script.sh", 0o755)
+    os.remove(repo / "docs" / "enlace.md")
+    os.symlink("otro.md", repo / "docs" / "enlace.md")
+
+    write(repo, "src/pkg2/mod2.py", "valor = 'staged'\n")
+    git(repo, "add", "src/pkg2/mod2.py")
+    write(repo, "src/pkg2/mod2.py", "valor = 'otra vez'\n")
+    git(repo, "mv", "docs/guia.md", "docs/manual.md")
+    write(repo, "nuevo/modulo.py", "print('nuevo')\n")
+    git(repo, "add", "nuevo/modulo.py")
+
+    write(repo, "suelto.txt", "x\n")
+    write(repo, "app.log", "ignorado\n")
+    write(repo, "importante.log", "visible\n")
+    write(repo, "build/salida.o", "ignorado\n")
+    write(repo, "src/generado.py", "ignorado\n")
+    write(repo, "src/pkg0/generado.py", "visible\n")
+    write(repo, "otro/dir/profundo.txt", "x\n")
+
+    assert_same_status(repo)
+    assert_same_status(repo, "normal")
+
+    status = IndexStatusReader(repo).read()
+    assert status.renamed == [(str(repo / "docs/guia.md"), str(repo / "docs/manual.md"))]
+
+
+def test_racy_same_size_edit_is_detected(repo):
+    path = repo / "src/pkg0/mod4.py"
+    stat = os.stat(path)
+    write(repo, "src/pkg0/mod4.py", "valor = 9\n")
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert_same_status(repo)
+
+
+def test_staged_deletion_matches_porcelain(repo):
+    git(repo, "rm", "-q", "src/pkg3/mod3.py")
+    os.remove(repo / "src/pkg1/mod1.py")
+    assert_same_status(repo)
+
+
+def test_modified_rename_falls_back_to_porcelain(repo):
+    git(repo, "mv", "src/pkg0/mod0.py", "src/pkg0/renombrado.py")
+    write(repo, "src/pkg0/renombrado.py", "valor = 0\notra = 1\n")
+    git(repo, "add", "src/pkg0/renombrado.py")
+    with pytest.raises(UnsupportedIndex):
+        IndexStatusReader(repo).read()
+    status = RepoStatus.load(repo, backend="index")
+    assert summary(status) == summary(RepoStatus.load(repo, backend="git"))
+    assert [e.xy for e in status.staged_entries] == ["R."]
+
+
+def test_assume_unchanged_entries_are_hidden(repo):
+    git(repo, "update-index", "--assume-unchanged", "src/pkg0/mod0.py", "src/pkg1/mod1.py")
+    write(repo, "src/pkg0/mod0.py", "valor = 'oculto'\n")
+    os.remove(repo / "src/pkg1/mod1.py")
+    write(repo, "src/pkg2/mod2.py", "valor = 'visible'\n")
+    assert_same_status(repo)
+
+
+def test_file_replaced_by_directory_is_deleted(repo):
+    os.remove(repo / "src/pkg0/mod0.py")
+    write(repo, "src/pkg0/mod0.py/dentro.py", "x\n")
+    assert_same_status(repo)
+    assert_same_status(repo, "normal")
+    assert ("src/pkg0/mod0.py", "D") in summary(IndexStatusReader(repo).read())["unstaged"]
+
+
+def test_packed_objects_are_read(repo):
+    write(repo, "src/pkg0/mod0.py", "valor = 'v2'\n")
+    git(repo, "commit", "-q", "-am", "segundo")
+    git(repo, "gc", "-q", "--aggressive")
+    write(repo, "src/pkg0/mod0.py", "valor = 'v3'\n")
+    git(repo, "add", "src/pkg0/mod0.py")
+    os.remove(repo / "src/pkg1/mod5.py")
+    assert_same_status(repo)
+
+
+def test_index_backend_selected_by_environment(repo, monkeypatch):
+    write(repo, "suelto.txt", "x\n")
+    monkeypatch.setenv("AI_GIT_ASSISTANT_STATUS_BACKEND", "index")
+    assert RepoStatus.load(repo).untracked == [str(repo / "suelto.txt")]
+
+
+def test_unsupported_index_falls_back_to_porcelain(repo):
+    git(repo, "sparse-checkout", "set", "src")
+    with pytest.raises(UnsupportedIndex):
+        IndexStatusReader(repo).read()
+    status = RepoStatus.load(repo, backend="index")
+    assert summary(status) == summary(RepoStatus.load(repo, backend="git"))
+
+
+@pytest.mark.parametrize("error", [zlib.error("corrupto"), ValueError("x"), IndexError("x"), struct.error("x")])
+def test_corrupt_objects_fall_back_to_porcelain(repo, monkeypatch, error):
+    write(repo, "src/pkg0/mod0.py", "valor = 'cambiado'\n")
+
+    def broken_read(self, oid):
+        raise error
+
+    monkeypatch.setattr(ObjectStore, "read", broken_read)
+    with pytest.raises(UnsupportedIndex):
+        IndexStatusReader(repo).read()
+    status = RepoStatus.load(repo, backend="index")
+    assert summary(status) == summary(RepoStatus.load(repo, backend="git"))
@@ -0,0 +1,67 @@
+import sys
+import time
+
+from ai_git_assistant.git_runner import GitRunner
+
+
+def sleeper(seconds):
+    return [sys.executable, "-c", f"import time; time.sleep({seconds})"]
+
+
+def test_independent_commands_overlap():
+    runner = GitRunner(max_concurrency=4)
+    start = time.perf_counter()
+    results = runner.gather(*(runner.run_async(sleeper(0.3)) for _ in range(4)))
+    assert [r.returncode for r in results] == [0, 0, 0, 0]
+    assert time.perf_counter() - start < 1.0
+
+
+def test_concurrency_limit_is_respected():
+    runner = GitRunner(max_concurrency=1)
+    start = time.perf_counter()
+    runner.gather(*(runner.run_async(sleeper(0.2)) for _ in range(3)))
+    assert time.perf_counter() - start >= 0.6
+
+
+def test_run_captures_output_and_input():
+    runner = GitRunner()
+    script = "import sys; data = sys.stdin.read(); print(data.upper()); sys.exit(3)"
+    result = runner.run([sys.executable, "-c", script], input="hola")
+    assert result.returncode == 3
+    assert result.stdout.strip() == "HOLA"
+
+
+def test_streams_lines_and_records_across_chunks():
+    runner = GitRunner()
+    script = "import sys; sys.stdout.write(''.join(f'línea {i}\\r\\n' for i in range(50000)))"
+    lines = list(runner.iter_lines([sys.executable, "-c", script]))
+    assert len(lines) == 50000
+    assert lines[12345] == "línea 12345\n"
+
+    script = "import sys; sys.stdout.write(''.join(f'r{i}\\0' for i in range(30000)))"
+    records = list(runner.iter_records([sys.executable, "-c", script]))
+    assert records[-1] == "r29999" and len(records) == 30000
+
+
+def test_closing_a_stream_early_stops_the_process():
+    runner = GitRunner(max_concurrency=1)
+    script = "import sys\nwhile True: sys.stdout.write('x' * 1000 + '\\n')"
+    lines = runner.iter_lines([sys.executable, "-c", script])
+    assert next(lines).startswith("x")
+    lines.close()
+    # El único hueco del semáforo debe quedar libre otra vez
+    assert runner.run([sys.executable, "-c", "print('ok')"]).stdout.strip() == "ok"
+
+
+def test_commands_run_while_a_stream_is_open():
+    runner = GitRunner(max_concurrency=1)
+    script = "import sys\nwhile True: sys.stdout.write('x' * 1000 + '\\n')"
+    lines = runner.iter_lines([sys.executable, "-c", script])
+    assert next(lines).startswith("x")
+    # Con un solo hueco, el comando no debe esperar a que se cierre el stream
+    future = runner.submit(runner.run_async([sys.executable, "-c", "print('ok')"]))
+    try:
+        assert future.result(timeout=10).stdout.strip() == "ok"
+    finally:
+        future.cancel()
+        lines.close()
@@ -0,0 +1,10 @@
+import pytest
+from ai_git_assistant.__main__ import add_files
+from unittest.mock import patch, MagicMock
+
+def test_add_files_success():
+    with patch('ai_git_assistant.git_runner.run') as mock_run:
+        mock_run.return_value = MagicMock(returncode=0, stderr="")
+        result = add_files(["/repo/test_file.txt"])
+        assert result == 1
+        assert mock_run.call_count == 1
@@ -0,0 +1,48 @@
+import pytest
+from ai_git_assistant import __main__ as cli
+from ai_git_assistant.history import commit_type, history_model_dir, iter_labelled_commits, train_from_history
+from ai_git_assistant.model import HashedModel
+from .conftest import git
+
+def commit_file(repo, name, content, message):
+    (repo / name).write_text(content)
+    git(repo, "add", name)
+    git(repo, "commit", "-m", message)
+
+@pytest.fixture
+def repo(tmp_path, cache_home):
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    git(repo, "init")
+    commit_file(repo, "app.py", "def handler():\n    raise ValueError\n", "fix(api): handle invalid payload")
+    commit_file(repo, "README.md", "# Guide\nInstall docs\n", "docs: explain installation guide")
+    commit_file(repo, "notes.txt", "random\n", "sin formato convencional")
+    return repo
+
+def test_commit_type():
+    assert commit_type("feat(billing)!: new invoices", cli.TYPES) == "feat"
+    assert commit_type("Merge branch 'main'", cli.TYPES) is None
+    assert commit_type("wip: algo", cli.TYPES) is None
+
+def test_labelled_commits_stream(repo):
+    commits = list(iter_labelled_commits(repo, cli.TYPES))
+    assert [label for _, _, label, _ in commits] == ["fix", "docs"]
+    assert "raise ValueError" in commits[0][3]
+
+def test_incremental_history_training(repo):
+    meta, trained = train_from_history(repo, cli.TYPES)
+    assert trained == 2
+    assert meta["commits_trained"] == 2
+
+    meta, trained = train_from_history(repo, cli.TYPES)
+    assert trained == 0
+
+    commit_file(repo, "docs.md", "Install guide for docs\n", "docs: more installation docs")
+    meta, trained = train_from_history(repo, cli.TYPES)
+    assert trained == 1
+    assert meta["commits_trained"] == 3
+
+    model = cli.load_or_train_model(repo)
+    assert isinstance(model, HashedModel)
+    assert model.predict(["Install guide docs"]) == ["docs"]
+    assert history_model_dir(repo).startswith(str(repo.parent / "cache"))
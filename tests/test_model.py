@@ -0,0 +1,44 @@
+import json
+import numpy as np
+import pytest
+from ai_git_assistant import __main__ as cli
+from ai_git_assistant.model import CompactModel, ModelFormatError, load_model, model_dir, model_key
+
+def test_compact_model_matches_sklearn_pipeline(cache_home):
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.naive_bayes import MultinomialNB
+    from sklearn.pipeline import Pipeline
+
+    texts = ["fix bug in parser", "add new feature", "update readme guide", "fix error handling",
+             "implement feature flag", "document api in readme"]
+    labels = ["fix", "feat", "docs", "fix", "feat", "docs"]
+    pipeline = Pipeline([('tfidf', TfidfVectorizer()), ('clf', MultinomialNB())]).fit(texts, labels)
+    model = CompactModel.from_pipeline(pipeline)
+
+    samples = ["fix the parser bug", "new feature added", "readme", "nada conocido"]
+    assert model.predict(samples) == list(pipeline.predict(samples))
+    np.testing.assert_allclose(model.predict_proba(samples), pipeline.predict_proba(samples))
+
+def test_model_is_cached_and_memory_mapped(cache_home):
+    model = cli.load_or_train_model()
+    directory = model_dir(cli.TYPES)
+    assert directory.startswith(str(cache_home))
+
+    loaded = load_model(directory, model_key(cli.TYPES))
+    assert isinstance(loaded.feature_log_prob, np.memmap)
+    assert loaded.predict(["fix bug error"]) == model.predict(["fix bug error"])
+
+def test_stale_model_is_detected(cache_home):
+    cli.load_or_train_model()
+    directory = model_dir(cli.TYPES)
+    meta_path = f"{directory}/meta.json"
+    with open(meta_path) as f:
+        meta = json.load(f)
+    meta["format_version"] = 0
+    with open(meta_path, "w") as f:
+        json.dump(meta, f)
+
+    with pytest.raises(ModelFormatError):
+        load_model(directory, model_key(cli.TYPES))
+    assert cli.load_or_train_model().predict(["fix bug"]) == ["fix"]
+    assert load_model(directory, model_key(cli.TYPES)).predict(["fix bug"]) == ["fix"]
@@ -0,0 +1,60 @@
+import time
+import numpy as np
+from ai_git_assistant import __main__ as cli
+from ai_git_assistant.model import LinearTextModel
+from ai_git_assistant.planner import PlannedFile, directory_parts, plan_commits
+from .conftest import git
+
+class KeywordModel(LinearTextModel):
+    def __init__(self):
+        self.keywords = {"fix": 0, "bug": 0, "docs": 1, "guide": 1}
+        super().__init__(np.log(np.full((2, 2), 0.1) + np.eye(2)), np.log([0.5, 0.5]), ["fix", "docs"])
+
+    def features(self, text):
+        indices = [self.keywords[w] for w in text.split() if w in self.keywords]
+        return np.array(indices, dtype=np.intp), np.ones(len(indices))
+
+def test_batched_predict_proba_matches_single_rows():
+    model = KeywordModel()
+    texts = ["fix bug", "", "docs guide guide", "nada"]
+    batched = model.predict_proba(texts)
+    single = np.vstack([model.predict_proba([text]) for text in texts])
+    np.testing.assert_allclose(batched, single)
+    assert model.predict(texts) == ["fix", "fix", "docs", "fix"]
+
+def test_directory_parts_share_ids_per_name():
+    prefixes, lengths = directory_parts(["src/api", "src/db", ""])
+    assert lengths.tolist() == [2, 2, 0]
+    assert prefixes[0, 0] == prefixes[1, 0] and prefixes[0, 1] != prefixes[1, 1]
+    assert prefixes[2].tolist() == [-1, -1]
+
+def test_mixed_changes_are_split_by_type_and_directory():
+    files = [PlannedFile(f"src/api/h{i}.py", "fix bug fix", 3) for i in range(30)]
+    files += [PlannedFile(f"docs/p{i}.md", "docs guide", 2) for i in range(20)]
+    groups = plan_commits(files, KeywordModel())
+    assert [(g.commit_type, len(g.files)) for g in groups] == [("fix", 30), ("docs", 20)]
+    assert groups[0].type_probabilities["fix"] > 0.5
+
+def test_thousands_of_files_in_separate_directories_scale():
+    files = [PlannedFile(f"pkg{i}/sub{i % 7}/f{i}.py", f"fix bug modulo{i}" if i % 2 else f"docs guide pagina{i}", 5)
+             for i in range(4000)]
+    start = time.perf_counter()
+    groups = plan_commits(files, KeywordModel())
+    assert time.perf_counter() - start < 10
+    assert sorted(f.path for g in groups for f in g.files) == sorted(f.path for f in files)
+    assert {g.commit_type for g in groups} == {"fix", "docs"}
+
+def test_plan_command_outputs_json(tmp_path, monkeypatch, capsys, cache_home):
+    repo = tmp_path / "repo"
+    (repo / "src").mkdir(parents=True)
+    (repo / "docs").mkdir()
+    git(repo, "init")
+    (repo / "src" / "app.py").write_text("def fix_error():\n    return 'bug'\n")
+    (repo / "docs" / "guia.md").write_text("# Document the readme guide\n")
+    git(repo, "add", ".")
+
+    capsys.readouterr()
+    plan = cli.plan_command(cli.build_parser().parse_args(["--json", "--repo", str(repo), "plan"]))
+    assert sorted(f for step in plan for f in step["files"]) == ["docs/guia.md", "src/app.py"]
+    assert all(step["message"] and step["type"] in cli.TYPES for step in plan)
+    assert '"files"' in capsys.readouterr().out
@@ -0,0 +1,36 @@
+import json
+import subprocess
+import pytest
+from ai_git_assistant import profiling
+from ai_git_assistant.__main__ import main
+
+@pytest.fixture
+def reset_profiling(monkeypatch):
+    monkeypatch.setattr(profiling, "_enabled", False)
+    monkeypatch.setattr(profiling, "_events", [])
+    monkeypatch.setattr(profiling, "_counters", {})
+
+def test_disabled_profiling_records_nothing(reset_profiling):
+    with profiling.span("etapa") as span:
+        span.add_bytes("datos")
+    profiling.count("stat_calls")
+    assert span is profiling.NULL_SPAN
+    assert profiling._events == [] and profiling._counters == {}
+
+def test_profile_flag_writes_chrome_trace(reset_profiling, tmp_path, monkeypatch, capsys, cache_home):
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    subprocess.run(["git", "init"], cwd=repo, check=True, capture_output=True)
+    (repo / "app.py").write_text("print('hola')\n")
+    subprocess.run(["git", "add", "app.py"], cwd=repo, check=True)
+
+    trace_path = tmp_path / "trace.json"
+    main(["--non-interactive", "--repo", str(repo), "--profile", str(trace_path)])
+
+    trace = json.loads(trace_path.read_text())
+    names = {event["name"] for event in trace["traceEvents"]}
+    assert "analyze_changes" in names
+    assert {"git diff", "git status"} <= names
+    assert trace["otherData"]["counters"]["subprocesses"] >= 3
+    assert trace["otherData"]["counters"]["git_bytes"] > 0
+    assert "Memoria pico" in capsys.readouterr().err
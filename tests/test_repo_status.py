@@ -0,0 +1,36 @@
+import os
+from ai_git_assistant.status import RepoStatus
+from .conftest import git
+
+def test_repo_status_snapshot(tmp_path):
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    git(repo, "init")
+    (repo / "a.txt").write_text("a\n")
+    (repo / "b.txt").write_text("b\n")
+    git(repo, "add", ".")
+    git(repo, "commit", "-m", "init")
+
+    (repo / "a.txt").write_text("a\nmodificado\n")
+    git(repo, "mv", "b.txt", "c.txt")
+    (repo / "nuevo.sql").write_text("select 1;\n")
+    git(repo, "add", "nuevo.sql")
+    (repo / "dir").mkdir()
+    (repo / "dir" / "suelto.py").write_text("x = 1\n")
+
+    status = RepoStatus.load(repo)
+    root = str(repo)
+
+    assert sorted(status.staged) == [os.path.join(root, "c.txt"), os.path.join(root, "nuevo.sql")]
+    assert status.unstaged == [os.path.join(root, "a.txt")]
+    assert status.untracked == [os.path.join(root, "dir", "suelto.py")]
+    assert status.renamed == [(os.path.join(root, "b.txt"), os.path.join(root, "c.txt"))]
+
+    added = [e for e in status.entries if e.path == "nuevo.sql"][0]
+    assert added.mode_head == "000000"
+    assert added.mode_index == "100644"
+    assert added.oid_index != "0" * 40
+
+def test_repo_status_outside_repo(tmp_path):
+    status = RepoStatus.load(tmp_path)
+    assert status.as_dict() == {"staged": [], "unstaged": [], "untracked": []}
@@ -0,0 +1,74 @@
+import pytest
+from ai_git_assistant import __main__ as cli
+from ai_git_assistant import sampling
+from ai_git_assistant.diff_reader import parse_diff_lines
+from ai_git_assistant.sampling import allocate_quotas, format_coverage
+from .conftest import git
+
+def diff_of(path, count):
+    yield f"diff --git a/{path} b/{path}\n"
+    yield f"@@ -0,0 +1,{count} @@\n"
+    for i in range(1, count + 1):
+        yield f"+linea {i}\n"
+
+def test_quotas_read_small_files_whole_and_split_the_rest():
+    quotas = allocate_quotas({"a.py": 5, "b.py": 400, "c.py": 1000}, 305)
+    assert quotas == {"a.py": 5, "b.py": 150, "c.py": 150}
+    assert allocate_quotas({"a.py": 1000, "b.py": 1000}, 10) == {"a.py": 20, "b.py": 20}
+
+def test_sampling_is_stratified_across_the_file():
+    record, = parse_diff_lines(diff_of("big.py", 100), quotas={"big.py": (10, 100)})
+    assert record.added_lines == [f"linea {i}" for i in range(10, 101, 10)]
+    assert record.added_count == 100
+
+def test_deadline_stops_reading_mid_file():
+    record, = parse_diff_lines(diff_of("big.py", 20_000), deadline=0)
+    assert record.truncated and record.added_count < 20_000
+
+@pytest.fixture
+def repo(tmp_path):
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    git(repo, "init")
+    (repo / "app.py").write_text("def fix_error():\n    return 'bug resuelto'\n")
+    (repo / "big.py").write_text("".join(f"valor_{i} = {i}\n" for i in range(3000)))
+    (repo / "package-lock.json").write_text('{"lockfileVersion": 3}\n' * 500)
+    (repo / "bundle.min.js").write_text("var a=1;" * 100)
+    (repo / "logo.png").write_bytes(b"\x89PNG\0\1\2")
+    git(repo, "add", ".")
+    return repo
+
+def staged(repo):
+    return [str(repo / name) for name in ("app.py", "big.py", "package-lock.json", "bundle.min.js", "logo.png")]
+
+def test_lockfiles_minified_and_binaries_are_skipped_by_default(repo):
+    sample = cli.sample_changes(staged(repo), repo)
+    assert sample.skipped == {"package-lock.json": "lock", "bundle.min.js": "minified", "logo.png": "binary"}
+    assert sample.sampled == {}
+    assert "lockfileVersion" not in sample.text and "fix_error" in sample.text
+    assert sum(sample.file_types.values()) == 5
+
+def test_budget_samples_large_files_and_reports_coverage(repo, monkeypatch):
+    monkeypatch.setattr(sampling, "KEPT_LINES_PER_MS", 1)
+    sample = cli.sample_changes(staged(repo), repo, budget_ms=200)
+    assert sample.sampled == {"big.py": (198, 3000)}
+    assert "fix_error" in sample.text
+    coverage = sample.coverage()
+    assert coverage["sampled"] == {"big.py": [198, 3000]}
+    assert format_coverage(coverage) == (
+        "muestreados: big.py (198/3000 líneas); "
+        "omitidos: bundle.min.js (minificado), logo.png (binario), package-lock.json (lockfile)")
+
+def test_files_larger_than_the_budget_are_skipped(repo, monkeypatch):
+    monkeypatch.setattr(sampling, "READ_BYTES_PER_MS", 1)
+    sample = cli.sample_changes(staged(repo), repo, budget_ms=200)
+    assert sample.skipped["big.py"] == "budget"
+    assert "fix_error" in sample.text
+
+def test_configured_skip_list_and_suggestions_report_coverage(repo, cache_home):
+    (repo / ".ai-git-assistant.json").write_text('{"analysis": {"skip": ["binary"]}}')
+    sample = cli.sample_changes(staged(repo), repo)
+    assert sample.skipped == {"logo.png": "binary"}
+
+    suggestions, _, coverage = cli.compute_suggestions("main", staged(repo), repo)
+    assert suggestions and coverage == {"sampled": {}, "skipped": {"logo.png": "binary"}}
@@ -0,0 +1,83 @@
+import subprocess
+import threading
+import pytest
+from ai_git_assistant import __main__ as cli
+from ai_git_assistant import git_runner
+from ai_git_assistant.selection import (LazyEntries, SelectionError, count_untracked_files, iter_untracked,
+                                        select_entries)
+from .conftest import git
+
+def counted(paths, pulled):
+    for path in paths:
+        pulled.append(path)
+        yield path
+
+def test_selectors_are_evaluated_on_the_stream():
+    pulled = []
+    entries = LazyEntries(counted([f"/r/src/m{i}.py" for i in range(1000)] + ["/r/build/"], pulled))
+    assert select_entries(entries, "0, 3-5", "/r") == ["/r/src/m0.py", "/r/src/m3.py", "/r/src/m4.py", "/r/src/m5.py"]
+    assert len(pulled) == 6
+    assert select_entries(entries, "m99?.py", "/r") == [f"/r/src/m99{i}.py" for i in range(10)]
+    assert select_entries(entries, "re:^build/", "/r") == ["/r/build/"]
+    assert select_entries(entries, "998-", "/r") == ["/r/src/m998.py", "/r/src/m999.py", "/r/build/"]
+    with pytest.raises(SelectionError):
+        select_entries(entries, "abc", "/r")
+
+def test_selection_pages_lazily(monkeypatch, capsys):
+    pulled = []
+    answers = iter(["m", "21, 30-31"])
+    monkeypatch.setattr("builtins.input", lambda prompt: next(answers))
+    files = counted([f"/r/f{i}.txt" for i in range(100)], pulled)
+    assert cli.handle_files_selection(files, "Archivos:", "/r") == ["/r/f21.txt", "/r/f30.txt", "/r/f31.txt"]
+    out = capsys.readouterr().out
+    assert " [39] f39.txt" in out and "[40]" not in out
+    assert len(pulled) == 41
+
+def test_untracked_directories_are_collapsed_and_counted(tmp_path):
+    repo = tmp_path / "repo"
+    (repo / "build" / "sub").mkdir(parents=True)
+    git(repo, "init")
+    (repo / ".gitignore").write_text("*.log\n")
+    for i in range(5):
+        (repo / "build" / "sub" / f"o{i}.bin").write_text("x")
+    (repo / "build" / "ruido.log").write_text("x")
+    (repo / "nuevo.py").write_text("x")
+    paths = list(iter_untracked(str(repo)))
+    assert sorted(paths) == sorted([str(repo / ".gitignore"), str(repo / "build") + "/", str(repo / "nuevo.py")])
+    assert count_untracked_files(str(repo), ["build/"]) == {"build/": 5}
+
+def test_empty_and_ignored_only_directories_are_not_listed(tmp_path):
+    repo = tmp_path / "repo"
+    (repo / "vacio").mkdir(parents=True)
+    (repo / "logs").mkdir()
+    (repo / "lib").mkdir()
+    git(repo, "init")
+    (repo / ".gitignore").write_text("*.log\n")
+    (repo / "logs" / "a.log").write_text("x")
+    (repo / "lib" / "root_only.txt").write_text("x")
+    git(repo, "add", ".gitignore")
+    git(repo, "commit", "-m", "init")
+
+    paths = list(iter_untracked(str(repo)))
+    assert paths == [str(repo / "lib") + "/"]
+    porcelain = subprocess.run(["git", "status", "--porcelain"], cwd=repo, capture_output=True, text=True).stdout
+    assert porcelain == "?? lib/\n"
+
+def test_selection_counts_directories_while_listing_is_open(tmp_path, monkeypatch):
+    repo = tmp_path / "repo"
+    (repo / "build").mkdir(parents=True)
+    git(repo, "init")
+    for i in range(3):
+        (repo / "build" / f"o{i}.bin").write_text("x")
+    # Más salida de la que cabe en la cola del stream, para que git siga abierto
+    for i in range(8000):
+        (repo / f"{'f' * 200}{i:05}.txt").write_text("x")
+    monkeypatch.setattr(git_runner, "_runner", git_runner.GitRunner(max_concurrency=1))
+    monkeypatch.setattr("builtins.input", lambda prompt: "0")
+    entries = LazyEntries(iter_untracked(str(repo)))
+    selected = []
+    worker = threading.Thread(daemon=True, target=lambda: selected.append(
+        cli.handle_files_selection(entries, "Archivos:", str(repo), count_untracked_files)))
+    worker.start()
+    worker.join(timeout=30)
+    assert selected == [[str(repo / "build") + "/"]]
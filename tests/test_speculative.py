@@ -0,0 +1,54 @@
+import pytest
+from ai_git_assistant import __main__ as cli
+from .conftest import git
+
+@pytest.fixture
+def repo(tmp_path, cache_home):
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    git(repo, "init")
+    (repo / "viejo.py").write_text("x = 1\n")
+    (repo / "borrar.md").write_text("# fuera\n")
+    git(repo, "add", ".")
+    git(repo, "commit", "-m", "init")
+    (repo / "viejo.py").write_text("def fix_error():\n    return 'bug resuelto'\n")
+    git(repo, "add", "viejo.py")
+    git(repo, "rm", "-q", "borrar.md")
+    return repo
+
+def same_sample(speculative, full):
+    return (speculative.text, speculative.predominant_type, speculative.coverage()) == \
+           (full.text, full.predominant_type, full.coverage())
+
+def test_matches_full_analysis_and_only_diffs_new_files(repo, monkeypatch):
+    diffed = []
+    iter_staged_diff = cli.iter_staged_diff
+    def recording_diff(root=None, paths=None, *args, **kwargs):
+        diffed.append(paths)
+        return iter_staged_diff(root, paths, *args, **kwargs)
+    monkeypatch.setattr(cli, "iter_staged_diff", recording_diff)
+
+    analyzer = cli.SpeculativeAnalyzer(repo)
+    files = [str(repo / "viejo.py")]
+    assert same_sample(analyzer.sample(files), cli.sample_changes(files, repo))
+
+    (repo / "nuevo.sql").write_text("CREATE TABLE usuarios (id INT);\n")
+    git(repo, "add", "nuevo.sql")
+    analyzer.refresh()
+    files.append(str(repo / "nuevo.sql"))
+    assert same_sample(analyzer.sample(files), cli.sample_changes(files, repo))
+    assert [p for p in diffed if p is not None] == [["viejo.py"], ["nuevo.sql"]]
+
+    suggestions, file_type, coverage = cli.compute_suggestions("main", files, repo, analyzer=analyzer)
+    assert suggestions and file_type == cli.analyze_changes(files, repo)[1]
+    analyzer.close()
+
+def test_deleted_files_count_towards_the_predominant_type(repo):
+    (repo / "otro.md").write_text("# otro\n")
+    git(repo, "add", "otro.md")
+    analyzer = cli.SpeculativeAnalyzer(repo)
+    files = [str(repo / "viejo.py"), str(repo / "borrar.md"), str(repo / "otro.md")]
+    speculative = analyzer.sample(files)
+    assert same_sample(speculative, cli.sample_changes(files, repo))
+    assert speculative.predominant_type == "docs"
+    analyzer.close()
@@ -0,0 +1,72 @@
+import pytest
+from ai_git_assistant import __main__ as cli
+from ai_git_assistant import sql_summary
+from ai_git_assistant.sql_summary import iter_ddl
+from .conftest import git
+
+DUMP = b"""-- volcado
+SET client_encoding = 'UTF8';
+CREATE TABLE IF NOT EXISTS `users` (id INT, price DECIMAL(10,2));
+INSERT INTO users VALUES (1, 'x'), (2, 'y');
+ALTER TABLE public.orders ADD COLUMN total INT, DROP COLUMN tmp, ADD CONSTRAINT fk FOREIGN KEY (a) REFERENCES b(id);
+CREATE UNIQUE INDEX idx_users_email ON users (email);
+DROP TABLE old_stuff;
+"""
+
+EXPECTED = [
+    ("CREATE", "TABLE", "users", None),
+    ("ADD", "COLUMN", "public.orders", "total"),
+    ("DROP", "COLUMN", "public.orders", "tmp"),
+    ("CREATE", "INDEX", "idx_users_email", "users"),
+    ("DROP", "TABLE", "old_stuff", None),
+]
+
+@pytest.mark.parametrize("size", [1, 5, 64, len(DUMP)])
+def test_ddl_is_independent_of_chunk_boundaries(size):
+    chunks = [DUMP[i:i + size] for i in range(0, len(DUMP), size)]
+    assert list(iter_ddl(chunks)) == EXPECTED
+
+def test_oversized_statements_do_not_accumulate(monkeypatch):
+    monkeypatch.setattr(sql_summary, "MAX_STATEMENT_BYTES", 256)
+    def chunks():
+        yield b"CREATE TABLE enorme (\n"
+        for _ in range(1000):
+            yield b"  col INT DEFAULT 0,\n"
+        yield b");\nINSERT INTO t VALUES " + b"(1)," * 5000 + b"(2);\nDROP VIEW v;\n"
+    assert list(iter_ddl(chunks())) == [("CREATE", "TABLE", "enorme", None), ("DROP", "VIEW", "v", None)]
+
+def test_pr_template_summarizes_staged_schema_changes(tmp_path):
+    repo = tmp_path / "repo"
+    (repo / "db").mkdir(parents=True)
+    git(repo, "init")
+    (repo / "db" / "schema.sql").write_text("CREATE TABLE users (id INT);\n")
+    git(repo, "add", ".")
+    git(repo, "commit", "-m", "init")
+    (repo / "db" / "schema.sql").write_text("CREATE TABLE users (id INT);\nALTER TABLE users ADD email TEXT;\n")
+    (repo / "db" / "seed.sql").write_bytes(DUMP)
+    git(repo, "add", ".")
+
+    template = cli.build_pr_template("main", ["db/schema.sql", "db/seed.sql"], "feat: esquema", root=str(repo))
+    section = template.split("## Configuraciones")[1].split("## Archivos Modificados")[0]
+    assert "**Cambios de esquema:** ADD COLUMN: 2, CREATE INDEX: 1, CREATE TABLE: 1, DROP COLUMN: 1, DROP TABLE: 1" in section
+    assert "- db/schema.sql (modificado)\n  - ALTER TABLE `users`: ADD COLUMN `email`\n" in section
+    assert "- db/seed.sql (nuevo)\n  - CREATE TABLE `users`\n" in section
+
+def test_interactive_pr_template_keeps_schema_summary_after_commit(tmp_path, monkeypatch):
+    repo = tmp_path / "repo"
+    (repo / "db").mkdir(parents=True)
+    git(repo, "init")
+    (repo / "README.md").write_text("x\n")
+    git(repo, "add", ".")
+    git(repo, "commit", "-m", "init")
+    (repo / "db" / "schema.sql").write_text("CREATE TABLE users (id INT);\nALTER TABLE users ADD email TEXT;\n")
+    git(repo, "add", ".")
+
+    blob_changes = cli.staged_blob_changes(str(repo))
+    git(repo, "commit", "-m", "feat: esquema")
+    monkeypatch.chdir(repo)
+    monkeypatch.setattr("builtins.input", lambda prompt="": "" if "App" in prompt else "n")
+    cli.generate_pr_template("main", ["db/schema.sql"], "feat: esquema", blob_changes=blob_changes)
+
+    section = (repo / "PR_suggest.md").read_text(encoding="utf-8").split("## Configuraciones")[1]
+    assert "**Cambios de esquema:** ADD COLUMN: 1, CREATE TABLE: 1" in section
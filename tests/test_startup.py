@@ -0,0 +1,37 @@
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+IMPORT_BUDGET_US = 200_000
+HEAVY_MODULES = ('sklearn', 'scipy', 'joblib', 'numpy')
+DEFERRED_MODULES = ('asyncio', 'concurrent.futures.process', 'ai_git_assistant.evaluation', 'ai_git_assistant.planner',
+                    'ai_git_assistant.branch_report', 'ai_git_assistant.daemon', 'ai_git_assistant.scanner',
+                    'ai_git_assistant.sampling', 'ai_git_assistant.sql_summary')
+
+def import_times(module):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=True, cwd=PROJECT_ROOT
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cumulative_us)
+    return times
+
+def test_entry_point_does_not_import_ml_stack():
+    times = import_times("ai_git_assistant.__main__")
+    heavy = [name for name in times if name.split('.')[0] in HEAVY_MODULES]
+    assert heavy == []
+
+def test_command_modules_are_imported_on_demand():
+    times = import_times("ai_git_assistant.__main__")
+    assert [name for name in DEFERRED_MODULES if name in times] == []
+
+def test_entry_point_import_budget():
+    times = import_times("ai_git_assistant.__main__")
+    assert times["ai_git_assistant.__main__"] < IMPORT_BUDGET_US
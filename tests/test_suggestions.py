@@ -0,0 +1,36 @@
+from unittest.mock import patch
+import numpy as np
+from ai_git_assistant.__main__ import ChangeAnalysis, suggest_commit_messages
+
+class FakeModel:
+    classes_ = ['chore', 'feat', 'fix']
+
+    def __init__(self):
+        self.calls = 0
+
+    def predict_proba(self, texts):
+        self.calls += 1
+        return np.array([[0.2, 0.1, 0.7]] * len(texts))
+
+    def predict(self, texts):
+        raise AssertionError("predict no debe llamarse si ya hay probabilidades")
+
+def test_suggestions_are_ranked_and_unique():
+    model = FakeModel()
+    changes = "arreglar error en parser parser parser validate input handler"
+    suggestions = suggest_commit_messages("main", ["/repo/src/parser.py"], changes, "code", model)
+
+    messages = [m for m, _ in suggestions]
+    confidences = [c for _, c in suggestions]
+    assert model.calls == 1
+    assert len(messages) == len(set(messages))
+    assert messages[0].startswith("fix")
+    assert confidences == sorted(confidences, reverse=True)
+
+def test_change_analysis_is_shared():
+    analysis = ChangeAnalysis("Nuevo parser parser con validación")
+    with patch('re.findall') as findall:
+        suggest_commit_messages("main", ["/repo/a.py"], analysis.changes_text, "code", FakeModel(), analysis)
+        findall.assert_not_called()
+    assert analysis.confidence("fix(api): algo") == 0.7
+    assert analysis.confidence("actualiza src en a.py") == 0.0
@@ -0,0 +1,54 @@
+import json
+from ai_git_assistant import __main__ as cli
+from ai_git_assistant.taxonomy import Taxonomy, get_taxonomy
+
+def test_one_pass_scores_types_and_actions_in_both_languages():
+    taxonomy = get_taxonomy()
+    analysis = cli.ChangeAnalysis("corregir el error del parser y eliminar código muerto", taxonomy)
+    assert taxonomy.best_type(analysis.type_scores) == "fix"
+    assert analysis.type_scores["fix"] == 2.0
+    assert taxonomy.best_action(analysis.action_scores) in {"fix", "remove"}
+    assert taxonomy.best_type(taxonomy.score_name("bugfix/login_form")[0]) == "fix"
+    assert taxonomy.best_type(cli.ChangeAnalysis("nada relevante", taxonomy).type_scores) == "chore"
+
+def test_weights_and_phrases():
+    taxonomy = Taxonomy({"feat": {"add": 1.0}, "fix": {"bug": 0.5, "clean up": 3.0}}, {"update": {"tweak": 1.0}})
+    assert taxonomy.best_type(cli.ChangeAnalysis("Add a bug", taxonomy).type_scores) == "feat"
+    assert taxonomy.best_type(cli.ChangeAnalysis("add bug and clean   up? no: clean up", taxonomy).type_scores) == "fix"
+    assert taxonomy.best_action(cli.ChangeAnalysis("nothing", taxonomy).action_scores) == "update"
+
+def test_repo_config_extends_taxonomy(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CONFIG_HOME", str(tmp_path / "config"))
+    monkeypatch.setattr("sys.platform", "linux")
+    default_key = get_taxonomy(tmp_path, refresh=True).key
+    (tmp_path / ".ai-git-assistant.json").write_text(json.dumps({"taxonomy": {
+        "types": {"perf": {"cache": 2.0}, "feat": {"new": 0}},
+        "actions": {"remove": ["purgar"]},
+        "stop_words": ["parser"],
+    }}))
+    taxonomy = get_taxonomy(tmp_path, refresh=True)
+    assert taxonomy.key != default_key
+    assert taxonomy.best_type(cli.ChangeAnalysis("new cache layer", taxonomy).type_scores) == "perf"
+    assert taxonomy.best_action(cli.ChangeAnalysis("purgar filas", taxonomy).action_scores) == "remove"
+    assert cli.generate_descriptive_message("purgar filas", ["a.py"], "code",
+                                            cli.ChangeAnalysis("purgar filas", taxonomy)).startswith("refactor: remove")
+    assert "parser" not in cli.ChangeAnalysis("parser parser parser", taxonomy).thematic_counts
+
+def test_inflected_branch_names_keep_their_type():
+    taxonomy = get_taxonomy()
+    assert taxonomy.best_type(taxonomy.score_name("fixes/login")[0]) == "fix"
+    assert taxonomy.best_type(taxonomy.score_name("tests/parser")[0]) == "test"
+    assert taxonomy.best_type(taxonomy.score_name("optimized-queries")[0]) == "perf"
+    assert taxonomy.best_type(taxonomy.score_name("docs/readme")[0]) == "docs"
+
+def test_inflected_diff_words_are_scored():
+    taxonomy = get_taxonomy()
+    assert cli.ChangeAnalysis("fixed two bugs in the parser", taxonomy).type_scores["fix"] == 2.0
+    assert taxonomy.best_type(cli.ChangeAnalysis("optimized the cache lookups", taxonomy).type_scores) == "perf"
+    assert taxonomy.best_type(cli.ChangeAnalysis("more tests for the parser", taxonomy).type_scores) == "test"
+    assert taxonomy.best_type(cli.ChangeAnalysis("se ha corregido el cálculo", taxonomy).type_scores) == "fix"
+
+def test_explicit_keywords_take_precedence_over_inflections():
+    taxonomy = Taxonomy({"feat": {"add": 1.0}, "chore": {"adds": 2.0}}, {})
+    assert taxonomy.best_type(cli.ChangeAnalysis("adds", taxonomy).type_scores) == "chore"
+    assert taxonomy.best_type(cli.ChangeAnalysis("added", taxonomy).type_scores) == "feat"